@@ -1,29 +1,230 @@
 from django.contrib import admin
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
 
 from airport.models import (
     Airport,
     Route,
     AirplaneType,
     Airplane,
+    Cabin,
     Crew,
+    FareBand,
     Flight,
+    FlightChange,
+    Notification,
     Order,
     Ticket,
+    WaitlistEntry,
 )
 
+COUNT_LIMIT = 10_000
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator that never runs an unbounded COUNT(*).
+
+    Unfiltered changelists use the planner's row estimate on PostgreSQL;
+    filtered ones stop counting at COUNT_LIMIT rows.
+    """
+
+    @cached_property
+    def count(self) -> int:
+        queryset = self.object_list
+        connection = connections[queryset.db]
+        if not queryset.query.where and connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT reltuples FROM pg_class WHERE oid = %s::regclass",
+                    [queryset.model._meta.db_table],
+                )
+                estimate = int(cursor.fetchone()[0])
+            if estimate > COUNT_LIMIT:
+                return estimate
+        return queryset[:COUNT_LIMIT].count()
+
+
+class PreloadedAutocompleteSelect(AutocompleteSelect):
+    """AutocompleteSelect taking selected labels from a preloaded map.
+
+    The stock widget runs one query per inline row to label the current
+    value; the inline fills `labels` for all rows with a single query.
+    """
+
+    labels = {}
+
+    def optgroups(self, name, value, attr=None):
+        selected = [str(choice) for choice in value if choice]
+        if not all(choice in self.labels for choice in selected):
+            return super().optgroups(name, value, attr)
+        options = []
+        if not self.is_required:
+            options.append(self.create_option(name, "", "", False, 0))
+        for choice in selected:
+            options.append(
+                self.create_option(
+                    name, choice, self.labels[choice], True, len(options)
+                )
+            )
+        return [(None, options, 0)]
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+@admin.register(Airport)
+class AirportAdmin(admin.ModelAdmin):
+    list_display = ("id", "name", "closest_big_city")
+    search_fields = ("name", "closest_big_city")
+
+
+@admin.register(Route)
+class RouteAdmin(admin.ModelAdmin):
+    list_display = ("id", "source", "destination", "distance")
+    list_select_related = ("source", "destination")
+    search_fields = (
+        "source__name",
+        "source__closest_big_city",
+        "destination__name",
+        "destination__closest_big_city",
+    )
+    autocomplete_fields = ("source", "destination")
+
+    def get_queryset(self, request):
+        # Route.__str__ names both airports, also in autocomplete results;
+        # the changelist skips list_select_related once this is set
+        return (
+            super()
+            .get_queryset(request)
+            .select_related(*self.list_select_related)
+        )
+
+
+@admin.register(FareBand)
+class FareBandAdmin(admin.ModelAdmin):
+    list_display = ("max_distance", "base_fare")
+
+
+@admin.register(AirplaneType)
+class AirplaneTypeAdmin(admin.ModelAdmin):
+    search_fields = ("name",)
+
+
+class CabinInline(admin.TabularInline):
+    model = Cabin
+    extra = 0
+
+
+@admin.register(Airplane)
+class AirplaneAdmin(admin.ModelAdmin):
+    inlines = (CabinInline,)
+    list_display = ("id", "name", "airplane_type", "rows", "seats_in_row")
+    list_select_related = ("airplane_type",)
+    search_fields = ("name",)
+    autocomplete_fields = ("airplane_type",)
+
+
+@admin.register(Crew)
+class CrewAdmin(admin.ModelAdmin):
+    search_fields = ("first_name", "last_name")
+
+
+@admin.register(Flight)
+class FlightAdmin(LargeTableAdmin):
+    list_display = (
+        "id",
+        "route",
+        "airplane",
+        "departure_time",
+        "arrival_time",
+    )
+    list_select_related = ("route__source", "route__destination", "airplane")
+    date_hierarchy = "departure_time"
+    ordering = ("-departure_time",)
+    search_fields = ("=id", "route__source__name", "route__destination__name")
+    autocomplete_fields = ("route", "airplane", "crew")
+
+    def get_queryset(self, request):
+        # Flight.__str__ names the route, also in autocomplete results;
+        # the changelist skips list_select_related once this is set
+        return (
+            super()
+            .get_queryset(request)
+            .select_related(*self.list_select_related)
+        )
+
+
 class TicketInLine(admin.TabularInline):
     model = Ticket
     extra = 1
+    autocomplete_fields = ("flight",)
+
+    def get_queryset(self, request):
+        return (
+            super()
+            .get_queryset(request)
+            .select_related(
+                "flight__route__source", "flight__route__destination"
+            )
+        )
+
+    def get_formset(self, request, obj=None, **kwargs):
+        formset = super().get_formset(request, obj, **kwargs)
+        widget = formset.form.base_fields["flight"].widget.widget
+        if obj is not None:
+            widget.labels = {
+                str(ticket.flight_id): str(ticket.flight)
+                for ticket in self.get_queryset(request).filter(order=obj)
+            }
+        return formset
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        if db_field.name == "flight":
+            kwargs["widget"] = PreloadedAutocompleteSelect(
+                db_field, self.admin_site, using=kwargs.get("using")
+            )
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
 
 
 @admin.register(Order)
-class OrderAdmin(admin.ModelAdmin):
+class OrderAdmin(LargeTableAdmin):
     inlines = (TicketInLine,)
+    list_display = ("id", "user", "created_at")
+    list_select_related = ("user",)
+    date_hierarchy = "created_at"
+    search_fields = ("=id", "=user__email")
+    raw_id_fields = ("user",)
+
+
+@admin.register(WaitlistEntry)
+class WaitlistEntryAdmin(LargeTableAdmin):
+    list_display = ("id", "flight_id", "user", "seats", "priority", "status")
+    list_select_related = ("user",)
+    list_filter = ("status",)
+    list_editable = ("priority",)
+    raw_id_fields = ("user", "flight", "order")
+
+
+@admin.register(FlightChange)
+class FlightChangeAdmin(LargeTableAdmin):
+    list_display = (
+        "id",
+        "flight_id",
+        "old_departure_time",
+        "new_departure_time",
+        "processed_at",
+    )
+    date_hierarchy = "created_at"
+    raw_id_fields = ("flight",)
 
 
-admin.site.register(Airport)
-admin.site.register(Route)
-admin.site.register(AirplaneType)
-admin.site.register(Airplane)
-admin.site.register(Crew)
-admin.site.register(Flight)
+@admin.register(Notification)
+class NotificationAdmin(LargeTableAdmin):
+    list_display = ("id", "user", "change_id", "created_at", "sent_at")
+    list_select_related = ("user",)
+    search_fields = ("=user__email",)
+    raw_id_fields = ("user", "change")
@@ -0,0 +1,149 @@
+import threading
+
+from django.db import transaction
+from django.db.models import Count, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import ArchivedTicket, Flight, FlightLoad
+
+REFRESH_BATCH_SIZE = 1000
+
+GROUPINGS = {
+    "route": ("route", "source__name", "destination__name"),
+    "airport": ("source", "source__name"),
+    "airplane_type": ("airplane_type", "airplane_type__name"),
+    "day": ("departure_date",),
+}
+
+_pending = threading.local()
+
+
+def _build_loads(flights):
+    # Tickets of departed flights may already sit in the archive table
+    archived = (
+        ArchivedTicket.objects.filter(flight=OuterRef("pk"))
+        .order_by()
+        .values("flight")
+        .annotate(count=Count("id"))
+        .values("count")
+    )
+    rows = flights.annotate(
+        tickets_sold=Count("tickets") + Coalesce(Subquery(archived), 0)
+    ).values(
+        "id",
+        "route_id",
+        "route__source_id",
+        "route__destination_id",
+        "airplane__airplane_type_id",
+        "airplane__rows",
+        "airplane__seats_in_row",
+        "departure_time",
+        "tickets_sold",
+    )
+    return [
+        FlightLoad(
+            flight_id=row["id"],
+            route_id=row["route_id"],
+            source_id=row["route__source_id"],
+            destination_id=row["route__destination_id"],
+            airplane_type_id=row["airplane__airplane_type_id"],
+            departure_date=timezone.localtime(row["departure_time"]).date(),
+            capacity=row["airplane__rows"] * row["airplane__seats_in_row"],
+            tickets_sold=row["tickets_sold"],
+        )
+        for row in rows
+    ]
+
+
+def refresh_flight_loads(flight_ids=None, batch_size=REFRESH_BATCH_SIZE):
+    """Rebuild FlightLoad rows for the given flights (all when None)."""
+    if flight_ids is None:
+        flight_ids = Flight.objects.order_by("id").values_list("id", flat=True)
+    flight_ids = list(flight_ids)
+
+    refreshed = 0
+    for start in range(0, len(flight_ids), batch_size):
+        batch = flight_ids[start : start + batch_size]
+        loads = _build_loads(Flight.objects.filter(id__in=batch))
+        with transaction.atomic():
+            FlightLoad.objects.bulk_create(
+                loads,
+                update_conflicts=True,
+                unique_fields=["flight"],
+                update_fields=[
+                    "route",
+                    "source",
+                    "destination",
+                    "airplane_type",
+                    "departure_date",
+                    "capacity",
+                    "tickets_sold",
+                    "refreshed_at",
+                ],
+            )
+        refreshed += len(loads)
+    return refreshed
+
+
+def _flush_pending_refreshes():
+    flight_ids = getattr(_pending, "flight_ids", None) or set()
+    airplane_ids = getattr(_pending, "airplane_ids", None)
+    _pending.flight_ids = set()
+    _pending.airplane_ids = set()
+    if airplane_ids:
+        flight_ids |= set(
+            Flight.objects.filter(airplane_id__in=airplane_ids).values_list(
+                "id", flat=True
+            )
+        )
+    if flight_ids:
+        refresh_flight_loads(flight_ids)
+
+
+def _schedule(name, ids):
+    if not hasattr(_pending, name):
+        setattr(_pending, name, set())
+    getattr(_pending, name).update(ids)
+    transaction.on_commit(_flush_pending_refreshes)
+
+
+def schedule_flight_load_refresh(flight_id):
+    """Refresh the flight's load row once the current transaction commits.
+
+    Every call registers a callback, but the first one to run flushes the
+    whole pending set, so a multi-ticket order refreshes each flight once.
+    """
+    _schedule("flight_ids", [flight_id])
+
+
+def schedule_airplane_load_refresh(airplane_id):
+    """Refresh the load rows of every flight of the airplane on commit.
+
+    Capacity comes from the airplane's rows and seats; its flights are
+    looked up after the commit.
+    """
+    _schedule("airplane_ids", [airplane_id])
+
+
+def flight_load_report(queryset, group_by):
+    keys = GROUPINGS[group_by]
+    rows = (
+        queryset.values(*keys)
+        .annotate(
+            flights=Count("flight"),
+            capacity=Sum("capacity"),
+            tickets_sold=Sum("tickets_sold"),
+        )
+        .order_by(*keys)
+    )
+    report = []
+    for row in rows:
+        row["seats_available"] = row["capacity"] - row["tickets_sold"]
+        row["load_factor"] = (
+            round(row["tickets_sold"] / row["capacity"], 4)
+            if row["capacity"]
+            else 0.0
+        )
+        report.append(row)
+    return report
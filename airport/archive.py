@@ -0,0 +1,95 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import (
+    ArchivedOrder,
+    ArchivedTicket,
+    BookingJob,
+    Order,
+    Ticket,
+    WaitlistEntry,
+)
+from .trips import schedule_trips_invalidation
+
+ARCHIVE_BATCH_SIZE = 1000
+
+
+def archive_cutoff(days=None):
+    if days is None:
+        days = settings.ARCHIVE_AFTER_DAYS
+    return timezone.now() - timedelta(days=days)
+
+
+def archivable_orders(cutoff):
+    """Orders placed before cutoff with no ticket departing after it."""
+    return (
+        Order.objects.filter(created_at__lt=cutoff)
+        .exclude(tickets__flight__departure_time__gte=cutoff)
+        .order_by("id")
+    )
+
+
+def archive_batch(cutoff, batch_size=ARCHIVE_BATCH_SIZE):
+    """Move one batch of orders and their tickets to the archive tables.
+
+    Copy and delete share a transaction, so an interrupted run leaves
+    every order in exactly one place. Rows are deleted without the
+    cascade collector: its per-ticket signals would release seats to
+    waitlists and drop fare caches of long departed flights. Returns
+    (orders, tickets) moved.
+    """
+    with transaction.atomic():
+        orders = list(
+            archivable_orders(cutoff)
+            .select_for_update(skip_locked=True)
+            .values_list("id", "user_id", "created_at")[:batch_size]
+        )
+        if not orders:
+            return 0, 0
+        order_ids = [order_id for order_id, _, _ in orders]
+        tickets = list(
+            Ticket.objects.filter(order_id__in=order_ids).values_list(
+                "id", "row", "seat", "flight_id", "order_id", "price"
+            )
+        )
+        ArchivedOrder.objects.bulk_create(
+            ArchivedOrder(id=order_id, user_id=user_id, created_at=created_at)
+            for order_id, user_id, created_at in orders
+        )
+        ArchivedTicket.objects.bulk_create(
+            ArchivedTicket(
+                id=ticket_id,
+                row=row,
+                seat=seat,
+                flight_id=flight_id,
+                order_id=order_id,
+                price=price,
+            )
+            for ticket_id, row, seat, flight_id, order_id, price in tickets
+        )
+        WaitlistEntry.objects.filter(order_id__in=order_ids).update(order=None)
+        BookingJob.objects.filter(order_id__in=order_ids).update(order=None)
+        Ticket.objects.filter(order_id__in=order_ids)._raw_delete(
+            Ticket.objects.db
+        )
+        Order.objects.filter(id__in=order_ids)._raw_delete(Order.objects.db)
+        # The cached trips count the current and archived orders
+        schedule_trips_invalidation({user_id for _, user_id, _ in orders})
+    return len(orders), len(tickets)
+
+
+def archive_orders(cutoff, batch_size=ARCHIVE_BATCH_SIZE, max_batches=None):
+    """Archive batch by batch until nothing is left or max_batches ran.
+
+    Yields (orders, tickets) moved per batch.
+    """
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        moved = archive_batch(cutoff, batch_size)
+        if not moved[0]:
+            return
+        batches += 1
+        yield moved
@@ -0,0 +1,116 @@
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import DatabaseError, transaction
+from django.utils import timezone
+from rest_framework import serializers, status
+from rest_framework.response import Response
+from rest_framework.reverse import reverse
+
+from .models import BookingJob
+from .serializers import BookingJobSerializer, OrderSerializer
+
+BOOKING_BATCH_SIZE = 50
+
+
+def enqueue_booking(user, tickets) -> BookingJob:
+    """Store validated ticket data as a pending job instead of an order."""
+    tickets = [
+        {
+            "flight": ticket["flight"].id,
+            "row": ticket["row"],
+            "seat": ticket["seat"],
+        }
+        for ticket in tickets
+    ]
+    return BookingJob.objects.create(
+        user=user, flight_id=tickets[0]["flight"], tickets=tickets
+    )
+
+
+def _confirm(job):
+    serializer = OrderSerializer(data={"tickets": job.tickets})
+    if not serializer.is_valid():
+        job.status = BookingJob.Status.FAILED
+        job.errors = serializer.errors
+        return
+    try:
+        with transaction.atomic():
+            job.order = serializer.save(user=job.user)
+    except DatabaseError as error:
+        job.status = BookingJob.Status.FAILED
+        job.errors = {"non_field_errors": [str(error)]}
+        return
+    except (serializers.ValidationError, DjangoValidationError) as error:
+        # Raised while creating the tickets, e.g. by Ticket.full_clean()
+        job.status = BookingJob.Status.FAILED
+        job.errors = serializers.as_serializer_error(error)
+        return
+    job.status = BookingJob.Status.CONFIRMED
+
+
+def process_booking_batch(batch_size=BOOKING_BATCH_SIZE) -> int:
+    """Confirm up to batch_size pending jobs of one flight in one commit.
+
+    Jobs are claimed with SKIP LOCKED, so several workers can drain the
+    queue at once, each taking its own flight batch. Every job runs in a
+    savepoint; a failed job is marked as such without undoing the others.
+    """
+    pending = BookingJob.objects.filter(status=BookingJob.Status.PENDING)
+    with transaction.atomic():
+        head = (
+            pending.select_for_update(skip_locked=True)
+            .only("flight_id")
+            .first()
+        )
+        if head is None:
+            return 0
+        jobs = list(
+            pending.filter(flight_id=head.flight_id)
+            .select_for_update(skip_locked=True, of=("self",))
+            .select_related("user")[:batch_size]
+        )
+        processed_at = timezone.now()
+        for job in jobs:
+            _confirm(job)
+            job.processed_at = processed_at
+        BookingJob.objects.bulk_update(
+            jobs, ["status", "order", "errors", "processed_at"]
+        )
+    return len(jobs)
+
+
+class QueuedBookingMixin:
+    """Accept orders as booking jobs when queued booking is requested.
+
+    Enabled for every request by the QUEUED_BOOKING setting, or per request
+    with a "Prefer: respond-async" header. The response is 202 with the job
+    resource, which a process_booking_jobs worker later confirms.
+    """
+
+    def use_queued_booking(self, request) -> bool:
+        # Auto-assigned seats are picked under a flight lock, so they
+        # never collide and gain nothing from the queue
+        if "auto_assign" in request.data:
+            return False
+        return (
+            settings.QUEUED_BOOKING
+            or "respond-async" in request.headers.get("Prefer", "")
+        )
+
+    def create(self, request, *args, **kwargs):
+        if not self.use_queued_booking(request):
+            return super().create(request, *args, **kwargs)
+
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        job = enqueue_booking(
+            request.user, serializer.validated_data["tickets"]
+        )
+        location = reverse(
+            "airport:bookingjob-detail", args=[job.id], request=request
+        )
+        return Response(
+            BookingJobSerializer(job).data,
+            status=status.HTTP_202_ACCEPTED,
+            headers={"Location": location},
+        )
@@ -0,0 +1,232 @@
+import threading
+import uuid
+from collections import defaultdict
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from .models import Cabin, FareBand, Flight, Ticket
+
+FARE_VERSION_KEY = "fares:version"
+CENT = Decimal("0.01")
+
+CABIN_MULTIPLIERS = {
+    Cabin.CabinClass.ECONOMY: Decimal("1.00"),
+    Cabin.CabinClass.PREMIUM_ECONOMY: Decimal("1.60"),
+    Cabin.CabinClass.BUSINESS: Decimal("3.00"),
+    Cabin.CabinClass.FIRST: Decimal("5.00"),
+}
+# (at least this many days before departure, multiplier), first match wins
+DAYS_TO_DEPARTURE_MULTIPLIERS = (
+    (60, Decimal("0.85")),
+    (21, Decimal("1.00")),
+    (7, Decimal("1.20")),
+    (2, Decimal("1.40")),
+    (0, Decimal("1.60")),
+)
+# (at least this share of seats sold, multiplier), first match wins
+LOAD_FACTOR_MULTIPLIERS = (
+    (0.9, Decimal("1.50")),
+    (0.75, Decimal("1.25")),
+    (0.5, Decimal("1.10")),
+    (0, Decimal("1.00")),
+)
+
+_pending = threading.local()
+
+
+def step_multiplier(steps, value) -> Decimal:
+    for threshold, multiplier in steps:
+        if value >= threshold:
+            return multiplier
+    return steps[-1][1]
+
+
+def base_fare(distance, bands):
+    """Fare of the first band covering distance; the last band beyond."""
+    for max_distance, fare in bands:
+        if distance <= max_distance:
+            return fare
+    return bands[-1][1] if bands else None
+
+
+def cabin_layout(rows, cabins):
+    """Split rows 1..rows into (cabin_class, first, last) segments.
+
+    cabins are (cabin_class, first_row, last_row) sorted by first_row;
+    rows not covered by any of them are economy.
+    """
+    layout = []
+    next_row = 1
+    for cabin_class, first_row, last_row in cabins:
+        if first_row > rows:
+            break
+        if first_row > next_row:
+            layout.append((Cabin.CabinClass.ECONOMY, next_row, first_row - 1))
+        layout.append((cabin_class, first_row, min(last_row, rows)))
+        next_row = last_row + 1
+    if next_row <= rows:
+        layout.append((Cabin.CabinClass.ECONOMY, next_row, rows))
+    return layout
+
+
+def build_price_tables(flight_ids, now=None) -> dict:
+    """Price tables for the given flights in four queries, however many.
+
+    A table lists each cabin class with its rows, seats left and the
+    current price of any seat in it.
+    """
+    now = now or timezone.now()
+    flights = list(
+        Flight.objects.filter(id__in=flight_ids).values_list(
+            "id",
+            "departure_time",
+            "route__distance",
+            "airplane_id",
+            "airplane__rows",
+            "airplane__seats_in_row",
+        )
+    )
+    cabins = defaultdict(list)
+    for airplane_id, *cabin in (
+        Cabin.objects.filter(airplane_id__in={flight[3] for flight in flights})
+        .order_by("airplane_id", "first_row")
+        .values_list("airplane_id", "cabin_class", "first_row", "last_row")
+    ):
+        cabins[airplane_id].append(cabin)
+    sold = defaultdict(dict)
+    for flight_id, row, count in (
+        Ticket.objects.filter(flight_id__in=flight_ids)
+        .values_list("flight_id", "row")
+        .annotate(count=Count("id"))
+        .order_by()
+    ):
+        sold[flight_id][row] = count
+    bands = list(FareBand.objects.values_list("max_distance", "base_fare"))
+
+    tables = {}
+    for flight_id, departure, distance, airplane_id, rows, seats in flights:
+        sold_by_row = sold[flight_id]
+        capacity = rows * seats
+        load_factor = sum(sold_by_row.values()) / capacity if capacity else 1
+        days = max((departure - now).days, 0)
+        fare = base_fare(distance, bands)
+        multiplier = step_multiplier(
+            DAYS_TO_DEPARTURE_MULTIPLIERS, days
+        ) * step_multiplier(LOAD_FACTOR_MULTIPLIERS, load_factor)
+
+        by_class = {}
+        for cabin_class, first_row, last_row in cabin_layout(
+            rows, cabins[airplane_id]
+        ):
+            entry = by_class.get(cabin_class)
+            if entry is None:
+                price = None
+                if fare is not None:
+                    price = str(
+                        (
+                            fare * CABIN_MULTIPLIERS[cabin_class] * multiplier
+                        ).quantize(CENT, ROUND_HALF_UP)
+                    )
+                entry = by_class[cabin_class] = {
+                    "cabin_class": str(cabin_class),
+                    "rows": [],
+                    "seats_available": 0,
+                    "price": price,
+                }
+            entry["rows"].append([first_row, last_row])
+            entry["seats_available"] += sum(
+                seats - sold_by_row.get(row, 0)
+                for row in range(first_row, last_row + 1)
+            )
+        tables[flight_id] = {
+            "days_to_departure": days,
+            "load_factor": round(load_factor, 4),
+            "cabins": list(by_class.values()),
+        }
+    return tables
+
+
+def fare_version() -> str:
+    return cache.get_or_set(FARE_VERSION_KEY, uuid.uuid4().hex, None)
+
+
+def table_key(version, flight_id) -> str:
+    return f"fares:{version}:{flight_id}"
+
+
+def price_tables(flight_ids) -> dict:
+    """Cached price tables by flight id, building only the missing ones."""
+    flight_ids = list(flight_ids)
+    version = fare_version()
+    keys = {
+        table_key(version, flight_id): flight_id for flight_id in flight_ids
+    }
+    cached = cache.get_many(keys)
+    tables = {keys[key]: table for key, table in cached.items()}
+    missing = [
+        flight_id for flight_id in flight_ids if flight_id not in tables
+    ]
+    if missing:
+        built = build_price_tables(missing)
+        cache.set_many(
+            {
+                table_key(version, flight_id): table
+                for flight_id, table in built.items()
+            },
+            settings.FARE_CACHE_TTL,
+        )
+        tables.update(built)
+    return tables
+
+
+def invalidate_flight_fares(flight_ids):
+    version = fare_version()
+    cache.delete_many(
+        [table_key(version, flight_id) for flight_id in flight_ids]
+    )
+
+
+def _flush_pending_invalidations():
+    flight_ids = getattr(_pending, "flight_ids", None)
+    _pending.flight_ids = set()
+    if flight_ids:
+        invalidate_flight_fares(flight_ids)
+
+
+def schedule_fare_invalidation(flight_ids):
+    """Drop the flights' price tables once the transaction commits.
+
+    Every ticket saved or deleted moves its flight's load factor; the ids
+    are collected, so a cascade over thousands of tickets drops each
+    table once per commit.
+    """
+    if not hasattr(_pending, "flight_ids"):
+        _pending.flight_ids = set()
+    _pending.flight_ids.update(flight_ids)
+    transaction.on_commit(_flush_pending_invalidations)
+
+
+def invalidate_fares():
+    """Drop every cached price table, e.g. after fare bands change."""
+    cache.set(FARE_VERSION_KEY, uuid.uuid4().hex, None)
+
+
+def lowest_fare(table):
+    prices = [
+        Decimal(cabin["price"])
+        for cabin in table["cabins"]
+        if cabin["seats_available"] > 0 and cabin["price"] is not None
+    ]
+    return str(min(prices)) if prices else None
+
+
+def seat_price(table, row):
+    for cabin in table["cabins"]:
+        if any(first <= row <= last for first, last in cabin["rows"]):
+            return cabin["price"]
+    return None
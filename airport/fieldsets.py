@@ -0,0 +1,74 @@
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiParameter
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+
+FIELDS_PARAM = "fields"
+EXPAND_PARAM = "expand"
+
+SPARSE_FIELDSET_PARAMETERS = [
+    OpenApiParameter(
+        FIELDS_PARAM,
+        type=OpenApiTypes.STR,
+        description="Return only these fields (ex. ?fields=id,departure_time)",
+    ),
+    OpenApiParameter(
+        EXPAND_PARAM,
+        type=OpenApiTypes.STR,
+        description=(
+            "Nest only these related objects, others are returned as ids "
+            "(ex. ?expand=airplane)"
+        ),
+    ),
+]
+
+
+def requested_fields(request, param):
+    """Return the set named by a comma separated query param, or None."""
+    if request is None or request.method not in SAFE_METHODS:
+        return None
+    value = request.query_params.get(param)
+    if value is None:
+        return None
+    return {name.strip() for name in value.split(",") if name.strip()}
+
+
+class SparseFieldsetsSerializerMixin:
+    """Drop fields not listed in ?fields= and collapse unexpanded nesting.
+
+    Nested serializers named in Meta.expandable_fields are rendered as
+    primary keys when ?expand= is given without them.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self._context.get("request") if self._context else None
+
+        self.requested_fields = requested_fields(request, FIELDS_PARAM)
+        if self.requested_fields is not None:
+            for name in set(self.fields) - self.requested_fields:
+                self.fields.pop(name)
+
+        expand = requested_fields(request, EXPAND_PARAM)
+        if expand is not None:
+            expandable = getattr(self.Meta, "expandable_fields", ())
+            for name in (set(expandable) & set(self.fields)) - expand:
+                self.fields[name] = serializers.PrimaryKeyRelatedField(
+                    read_only=True
+                )
+
+    def includes(self, name) -> bool:
+        """Whether the representation should carry the given key."""
+        return self.requested_fields is None or name in self.requested_fields
+
+
+class SparseFieldsetsViewMixin:
+    """Let get_queryset() skip joins for fields the client did not ask for."""
+
+    def wants_field(self, name) -> bool:
+        fields = requested_fields(self.request, FIELDS_PARAM)
+        return fields is None or name in fields
+
+    def wants_expanded(self, name) -> bool:
+        expand = requested_fields(self.request, EXPAND_PARAM)
+        return self.wants_field(name) and (expand is None or name in expand)
@@ -0,0 +1,255 @@
+import heapq
+import math
+import threading
+import uuid
+
+from django.core.cache import cache
+from django.db import transaction
+
+from .fares import invalidate_fares
+from .models import Airport, Route
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is in requirements.txt
+    np = None
+
+EARTH_RADIUS_KM = 6371
+INDEX_VERSION_KEY = "airport:geo-index-version"
+POINTS_PER_CELL = 4
+# Grid shells scanned before falling back to a full scan
+MAX_SHELLS = 3
+DISTANCE_BATCH_SIZE = 5000
+
+
+def unit_vector(latitude, longitude):
+    lat, lon = math.radians(latitude), math.radians(longitude)
+    return (
+        math.cos(lat) * math.cos(lon),
+        math.cos(lat) * math.sin(lon),
+        math.sin(lat),
+    )
+
+
+def chord_to_km(chord) -> float:
+    return 2 * EARTH_RADIUS_KM * math.asin(min(chord / 2, 1.0))
+
+
+def great_circle_km(a, b) -> int:
+    """Whole kilometres between two (latitude, longitude) points."""
+    lat1, lon1, lat2, lon2 = map(math.radians, (*a, *b))
+    h = (
+        math.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    )
+    return max(int(2 * EARTH_RADIUS_KM * math.asin(math.sqrt(h))), 1)
+
+
+def great_circle_distances(sources, destinations) -> list:
+    """great_circle_km for many point pairs at once, vectorized with NumPy."""
+    if np is None:
+        return [great_circle_km(a, b) for a, b in zip(sources, destinations)]
+    if not len(sources):
+        return []
+    lat1, lon1 = np.radians(np.asarray(sources, dtype=float)).T
+    lat2, lon2 = np.radians(np.asarray(destinations, dtype=float)).T
+    h = (
+        np.sin((lat2 - lat1) / 2) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    )
+    km = 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(h, 0, 1)))
+    return np.maximum(km.astype(int), 1).tolist()
+
+
+def recompute_route_distances(batch_size=DISTANCE_BATCH_SIZE) -> int:
+    """Set Route.distance from airport coordinates; returns rows changed.
+
+    Routes with an airport lacking coordinates keep their typed distance.
+    """
+    routes = Route.objects.filter(
+        source__latitude__isnull=False,
+        source__longitude__isnull=False,
+        destination__latitude__isnull=False,
+        destination__longitude__isnull=False,
+    ).order_by("id")
+    last_id = 0
+    updated = 0
+    while True:
+        rows = list(
+            routes.filter(id__gt=last_id).values_list(
+                "id",
+                "distance",
+                "source__latitude",
+                "source__longitude",
+                "destination__latitude",
+                "destination__longitude",
+            )[:batch_size]
+        )
+        if not rows:
+            return updated
+        last_id = rows[-1][0]
+        distances = great_circle_distances(
+            [row[2:4] for row in rows], [row[4:6] for row in rows]
+        )
+        changed = [
+            Route(id=row[0], distance=distance)
+            for row, distance in zip(rows, distances)
+            if row[1] != distance
+        ]
+        with transaction.atomic():
+            Route.objects.bulk_update(changed, ["distance"])
+        updated += len(changed)
+        if changed:
+            # bulk_update sends no signals; fares depend on the distance
+            invalidate_fares()
+
+
+class AirportIndex:
+    """In-memory nearest-neighbour index over airport coordinates.
+
+    Airports are placed on the unit sphere and bucketed into a uniform 3D
+    grid sized for about POINTS_PER_CELL airports per occupied cell. A
+    query scans grid shells outwards from its own cell and stops once
+    no unscanned cell can hold anything closer than the results so far;
+    in sparse areas, after MAX_SHELLS shells, it scans every airport.
+    """
+
+    def __init__(self, points):
+        self.ids = []
+        self.vectors = []
+        for airport_id, latitude, longitude in points:
+            self.ids.append(airport_id)
+            self.vectors.append(unit_vector(latitude, longitude))
+        # Airports lie on a surface of area 4 pi, not in the whole cube
+        self.cell = min(
+            math.sqrt(4 * math.pi * POINTS_PER_CELL / max(len(self.ids), 1)),
+            2.0,
+        )
+        self.cells = {}
+        for position, vector in enumerate(self.vectors):
+            self.cells.setdefault(self.cell_of(vector), []).append(position)
+        self.array = None
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def cell_of(self, vector):
+        return tuple(math.floor((axis + 1) / self.cell) for axis in vector)
+
+    @staticmethod
+    def shell(center, radius):
+        """Cells at Chebyshev distance `radius` from center."""
+        if radius == 0:
+            yield center
+            return
+        cx, cy, cz = center
+        full = range(-radius, radius + 1)
+        inner = range(-radius + 1, radius)
+        for dx in (-radius, radius):
+            for dy in full:
+                for dz in full:
+                    yield cx + dx, cy + dy, cz + dz
+        for dx in inner:
+            for dy in (-radius, radius):
+                for dz in full:
+                    yield cx + dx, cy + dy, cz + dz
+            for dy in inner:
+                for dz in (-radius, radius):
+                    yield cx + dx, cy + dy, cz + dz
+
+    def nearest(self, latitude, longitude, limit=5, max_km=None):
+        """Return up to `limit` (airport id, km) pairs, closest first."""
+        if not self.ids or limit < 1:
+            return []
+        query = unit_vector(latitude, longitude)
+        max_chord = (
+            2 * math.sin(min(max_km / (2 * EARTH_RADIUS_KM), math.pi / 2))
+            if max_km is not None
+            else 2.0
+        )
+        found = self.scan_shells(query, limit, max_chord)
+        if found is None:
+            found = self.scan_all(query, limit, max_chord)
+        return [
+            (self.ids[position], round(chord_to_km(chord), 1))
+            for chord, position in found
+        ]
+
+    def scan_shells(self, query, limit, max_chord):
+        """Sorted (chord, position) pairs, or None if the grid gave up."""
+        qx, qy, qz = query
+        center = self.cell_of(query)
+        # Max-heap of the best (negated) chord distances found so far
+        best = []
+        for radius in range(MAX_SHELLS + 1):
+            for cell in self.shell(center, radius):
+                for position in self.cells.get(cell, ()):
+                    x, y, z = self.vectors[position]
+                    chord = math.sqrt(
+                        (x - qx) ** 2 + (y - qy) ** 2 + (z - qz) ** 2
+                    )
+                    if chord > max_chord:
+                        continue
+                    if len(best) < limit:
+                        heapq.heappush(best, (-chord, position))
+                    elif chord < -best[0][0]:
+                        heapq.heapreplace(best, (-chord, position))
+            # Anything outside the scanned cube is at least this far away
+            reach = radius * self.cell
+            if reach >= max_chord or (
+                len(best) == limit and -best[0][0] <= reach
+            ):
+                return [
+                    (-chord, position)
+                    for chord, position in sorted(best, reverse=True)
+                ]
+        return None
+
+    def scan_all(self, query, limit, max_chord):
+        """Brute force for sparse areas where the shells grow too wide."""
+        if np is None:
+            chords = (
+                (math.dist(vector, query), position)
+                for position, vector in enumerate(self.vectors)
+            )
+            return heapq.nsmallest(
+                limit, (item for item in chords if item[0] <= max_chord)
+            )
+        if self.array is None:
+            self.array = np.asarray(self.vectors)
+        # For unit vectors |a - b|^2 == 2 - 2 a.b
+        chords = np.sqrt(np.maximum(2 - 2 * (self.array @ query), 0))
+        positions = np.flatnonzero(chords <= max_chord)
+        if len(positions) > limit:
+            positions = positions[
+                np.argpartition(chords[positions], limit - 1)[:limit]
+            ]
+        positions = positions[np.argsort(chords[positions], kind="stable")]
+        return [
+            (float(chords[position]), int(position)) for position in positions
+        ]
+
+
+_index = None
+_index_version = None
+_index_lock = threading.Lock()
+
+
+def invalidate_airport_index():
+    """Make every process rebuild its index on the next lookup."""
+    cache.set(INDEX_VERSION_KEY, uuid.uuid4().hex, None)
+
+
+def get_airport_index() -> AirportIndex:
+    global _index, _index_version
+    version = cache.get_or_set(INDEX_VERSION_KEY, uuid.uuid4().hex, None)
+    if _index is None or _index_version != version:
+        with _index_lock:
+            if _index is None or _index_version != version:
+                _index = AirportIndex(
+                    Airport.objects.filter(
+                        latitude__isnull=False, longitude__isnull=False
+                    ).values_list("id", "latitude", "longitude")
+                )
+                _index_version = version
+    return _index
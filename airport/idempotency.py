@@ -0,0 +1,108 @@
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+from rest_framework.response import Response
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+IN_FLIGHT = "in_flight"
+COMPLETED = "completed"
+POLL_INTERVAL = 0.05
+REPLAYED_HEADERS = ("Location",)
+
+
+class IdempotencyConflict(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "A request with this Idempotency-Key is still running."
+    default_code = "idempotency_conflict"
+
+
+class IdempotencyKeyReused(APIException):
+    status_code = status.HTTP_422_UNPROCESSABLE_ENTITY
+    default_detail = (
+        "This Idempotency-Key was already used with a different payload."
+    )
+    default_code = "idempotency_key_reused"
+
+
+class IdempotentCreateMixin:
+    """Replay the stored response for retried create requests.
+
+    The first request with a given Idempotency-Key claims the key in the
+    cache, runs create() and stores its response for
+    IDEMPOTENCY_KEY_TTL seconds. Duplicates arriving meanwhile wait for
+    that result instead of creating another object.
+    """
+
+    def create(self, request, *args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if not key:
+            return super().create(request, *args, **kwargs)
+        if len(key) > 255:
+            raise ValidationError(
+                {IDEMPOTENCY_HEADER: "Must be at most 255 characters."}
+            )
+
+        cache_key = self.get_idempotency_cache_key(request, key)
+        fingerprint = hashlib.sha256(
+            json.dumps(request.data, sort_keys=True, default=str).encode()
+        ).hexdigest()
+
+        claim = {"state": IN_FLIGHT, "fingerprint": fingerprint}
+        deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_TIMEOUT
+        while True:
+            if cache.add(
+                cache_key, claim, timeout=settings.IDEMPOTENCY_WAIT_TIMEOUT
+            ):
+                return self._create_once(
+                    request, cache_key, fingerprint, *args, **kwargs
+                )
+            stored = cache.get(cache_key)
+            if stored is not None and stored["state"] == COMPLETED:
+                break
+            if time.monotonic() >= deadline:
+                raise IdempotencyConflict()
+            time.sleep(POLL_INTERVAL)
+
+        if stored["fingerprint"] != fingerprint:
+            raise IdempotencyKeyReused()
+
+        response = Response(
+            stored["data"], status=stored["status"], headers=stored["headers"]
+        )
+        response["Idempotent-Replayed"] = "true"
+        return response
+
+    def get_idempotency_cache_key(self, request, key) -> str:
+        # Hashed, as cache backends like memcached limit key characters
+        # and length
+        key = hashlib.sha256(key.encode()).hexdigest()
+        return f"idempotency:{self.basename}:{request.user.pk}:{key}"
+
+    def _create_once(self, request, cache_key, fingerprint, *args, **kwargs):
+        try:
+            response = super().create(request, *args, **kwargs)
+        except Exception:
+            cache.delete(cache_key)
+            raise
+
+        if status.is_success(response.status_code):
+            stored = {
+                "state": COMPLETED,
+                "fingerprint": fingerprint,
+                "status": response.status_code,
+                "data": response.data,
+                "headers": {
+                    header: response[header]
+                    for header in REPLAYED_HEADERS
+                    if response.has_header(header)
+                },
+            }
+            cache.set(cache_key, stored, timeout=settings.IDEMPOTENCY_KEY_TTL)
+        else:
+            cache.delete(cache_key)
+        return response
@@ -0,0 +1,216 @@
+import http.client
+import json
+import random
+import threading
+import time
+from collections import defaultdict
+from urllib.parse import urlencode, urlsplit
+
+from django.utils import timezone
+
+from .models import Flight
+
+DEFAULT_MIX = {
+    "search_flights": 40,
+    "seat_map": 30,
+    "order_history": 20,
+    "book_order": 10,
+}
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(sorted_values, rank) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = max(int(round(rank / 100 * len(sorted_values))) - 1, 0)
+    return sorted_values[min(index, len(sorted_values) - 1)]
+
+
+class Client:
+    """Keep-alive JSON client, one per worker thread."""
+
+    def __init__(self, base_url, token=None):
+        parts = urlsplit(base_url)
+        self.connection = http.client.HTTPConnection(
+            parts.hostname, parts.port or 80, timeout=30
+        )
+        self.headers = {"Accept": "application/json"}
+        if token:
+            self.headers["Authorization"] = f"Bearer {token}"
+
+    def request(self, method, path, payload=None):
+        headers = dict(self.headers)
+        body = None
+        if payload is not None:
+            body = json.dumps(payload)
+            headers["Content-Type"] = "application/json"
+        try:
+            self.connection.request(method, path, body=body, headers=headers)
+            response = self.connection.getresponse()
+            content = response.read()
+        except (http.client.HTTPException, OSError):
+            self.connection.close()
+            raise
+        return response.status, content
+
+    def close(self):
+        self.connection.close()
+
+
+class Scenarios:
+    """Request builders for the user journeys we measure."""
+
+    def __init__(self, flights, rng):
+        self.flights = flights
+        self.rng = rng
+
+    def search_flights(self):
+        flight = self.rng.choice(self.flights)
+        query = urlencode(
+            {
+                "source": flight["route__source_id"],
+                "destination": flight["route__destination_id"],
+                "date": timezone.localtime(flight["departure_time"])
+                .date()
+                .isoformat(),
+            }
+        )
+        return "GET", f"/api/airport/flights/?{query}", None
+
+    def seat_map(self):
+        flight = self.rng.choice(self.flights)
+        return "GET", f"/api/airport/flights/{flight['id']}/", None
+
+    def order_history(self):
+        return "GET", "/api/airport/orders/?page_size=20", None
+
+    def book_order(self):
+        flight = self.rng.choice(self.flights)
+        payload = {
+            "tickets": [
+                {
+                    "flight": flight["id"],
+                    "row": self.rng.randint(1, flight["airplane__rows"]),
+                    "seat": self.rng.randint(
+                        1, flight["airplane__seats_in_row"]
+                    ),
+                }
+            ]
+        }
+        return "POST", "/api/airport/orders/", payload
+
+
+def sample_flights(limit=500, seed=0):
+    """Pick upcoming flights to drive the scenarios with."""
+    flights = list(
+        Flight.objects.filter(departure_time__gte=timezone.now())
+        .order_by("departure_time")
+        .values(
+            "id",
+            "departure_time",
+            "route__source_id",
+            "route__destination_id",
+            "airplane__rows",
+            "airplane__seats_in_row",
+        )[: limit * 10]
+    )
+    random.Random(seed).shuffle(flights)
+    return flights[:limit]
+
+
+def run_load(base_url, token, flights, mix, duration, concurrency, seed=0):
+    """Drive the server with weighted scenarios from concurrent workers."""
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    latencies = defaultdict(list)
+    statuses = defaultdict(lambda: defaultdict(int))
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def worker(number):
+        rng = random.Random(seed + number)
+        scenarios = Scenarios(flights, rng)
+        client = Client(base_url, token)
+        local_latencies = defaultdict(list)
+        local_statuses = defaultdict(lambda: defaultdict(int))
+        try:
+            while time.monotonic() < deadline:
+                name = rng.choices(names, weights)[0]
+                method, path, payload = getattr(scenarios, name)()
+                started = time.perf_counter()
+                try:
+                    status, _ = client.request(method, path, payload)
+                except (http.client.HTTPException, OSError):
+                    status = "connection_error"
+                    client = Client(base_url, token)
+                local_latencies[name].append(time.perf_counter() - started)
+                local_statuses[name][str(status)] += 1
+        finally:
+            client.close()
+            with lock:
+                for name, values in local_latencies.items():
+                    latencies[name].extend(values)
+                for name, counts in local_statuses.items():
+                    for status, count in counts.items():
+                        statuses[name][status] += count
+
+    started = time.monotonic()
+    threads = [
+        threading.Thread(target=worker, args=(number,))
+        for number in range(concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+
+    return summarize(latencies, statuses, elapsed)
+
+
+def summarize(latencies, statuses, elapsed):
+    def stats(values, counts):
+        values = sorted(values)
+        result = {
+            "requests": len(values),
+            "rps": round(len(values) / elapsed, 2) if elapsed else 0.0,
+            "statuses": dict(counts),
+        }
+        for rank in PERCENTILES:
+            result[f"p{rank}_ms"] = round(percentile(values, rank) * 1000, 2)
+        return result
+
+    all_values = []
+    all_statuses = defaultdict(int)
+    scenarios = {}
+    for name in sorted(latencies):
+        all_values.extend(latencies[name])
+        for status, count in statuses[name].items():
+            all_statuses[status] += count
+        scenarios[name] = stats(latencies[name], statuses[name])
+    return {
+        "elapsed_s": round(elapsed, 2),
+        "scenarios": scenarios,
+        "total": stats(all_values, all_statuses),
+    }
+
+
+def compare(baseline, current):
+    """Yield (scenario, metric, before, after, change %) rows."""
+    names = sorted(set(baseline["scenarios"]) | set(current["scenarios"]))
+    for name in names + ["total"]:
+        if name == "total":
+            before, after = baseline["total"], current["total"]
+        else:
+            before = baseline["scenarios"].get(name)
+            after = current["scenarios"].get(name)
+        if not before or not after:
+            continue
+        for metric in ("rps", "p50_ms", "p95_ms", "p99_ms"):
+            change = (
+                (after[metric] - before[metric]) / before[metric] * 100
+                if before[metric]
+                else 0.0
+            )
+            yield name, metric, before[metric], after[metric], change
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from airport.waitlist import WAITLIST_BATCH_SIZE, allocate_waitlists
+
+
+class Command(BaseCommand):
+    help = (
+        "Allocate released seats to waitlisted requests of upcoming "
+        "flights; releases are queued for process_waitlist_jobs, this "
+        "catches up."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--flight",
+            type=int,
+            action="append",
+            dest="flight_ids",
+            help="Allocate only this flight id (may be repeated).",
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=WAITLIST_BATCH_SIZE
+        )
+
+    def handle(self, *args, **options):
+        allocated = allocate_waitlists(
+            options["flight_ids"], options["batch_size"]
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f"Allocated {allocated} waitlist entries.")
+        )
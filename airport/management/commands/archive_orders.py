@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+
+from airport.archive import ARCHIVE_BATCH_SIZE, archive_cutoff, archive_orders
+
+
+class Command(BaseCommand):
+    help = (
+        "Move orders whose flights all departed more than ARCHIVE_AFTER_DAYS "
+        "ago to the archive tables, one short transaction per batch."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days", type=int, help="Override ARCHIVE_AFTER_DAYS."
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=ARCHIVE_BATCH_SIZE
+        )
+        parser.add_argument(
+            "--max-batches",
+            type=int,
+            help="Stop after this many batches; run again to continue.",
+        )
+
+    def handle(self, *args, **options):
+        cutoff = archive_cutoff(options["days"])
+        orders = tickets = 0
+        for moved_orders, moved_tickets in archive_orders(
+            cutoff, options["batch_size"], options["max_batches"]
+        ):
+            orders += moved_orders
+            tickets += moved_tickets
+            if options["verbosity"] > 1:
+                self.stdout.write(
+                    f"Archived {moved_orders} orders, {moved_tickets} tickets."
+                )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Archived {orders} orders and {tickets} tickets "
+                f"placed before {cutoff:%Y-%m-%d}."
+            )
+        )
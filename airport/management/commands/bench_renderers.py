@@ -0,0 +1,119 @@
+import io
+import random
+import timeit
+import uuid
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from airport_api_service.renderers import FastJSONParser, FastJSONRenderer
+
+
+def flight_list_payload(size, rng):
+    """A page shaped like FlightListSerializer output."""
+    departure = timezone.make_aware(datetime(2024, 1, 1, 6))
+    results = []
+    for number in range(size):
+        departure += timedelta(minutes=rng.randint(5, 90))
+        results.append(
+            {
+                "id": number + 1,
+                "route": f"Airport {number % 97} (City {number % 41}) - "
+                f"Airport {number % 89} (Місто {number % 23})",
+                "airplane_name": f"Boeing 7{number % 10}7-{number % 400}",
+                "airplane_capacity": rng.choice((120, 180, 240, 366)),
+                "tickets_available": rng.randint(0, 366),
+                "departure_time": departure.isoformat(),
+                "arrival_time": (departure + timedelta(hours=3)).isoformat(),
+                "crew": [f"Pilot {rng.randint(1, 500)}" for _ in range(3)],
+            }
+        )
+    return {
+        "count": size * 10,
+        "next": "http://testserver/api/airport/flights/?page=2",
+        "previous": None,
+        "results": results,
+    }
+
+
+def order_history_payload(size, rng):
+    """Orders with native datetimes, Decimals and UUIDs left unserialized."""
+    created = timezone.make_aware(datetime(2024, 1, 1, 12, 30, 15, 123456))
+    return [
+        {
+            "id": number + 1,
+            "reference": uuid.UUID(int=rng.getrandbits(128)),
+            "created_at": created + timedelta(hours=number),
+            "total": Decimal(rng.randint(1000, 99999)) / 100,
+            "tickets": [
+                {
+                    "id": number * 4 + seat,
+                    "row": rng.randint(1, 40),
+                    "seat": seat,
+                    "flight": rng.randint(1, 5000),
+                    "departs": (created + timedelta(days=seat)).date(),
+                }
+                for seat in range(1, 5)
+            ],
+        }
+        for number in range(size)
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare FastJSONRenderer with DRF's JSONRenderer on flight list "
+        "and order history payloads, checking both emit identical bytes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--size", type=int, default=500)
+        parser.add_argument("--repeat", type=int, default=50)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        payloads = {
+            "flight_list": flight_list_payload(options["size"], rng),
+            "order_history": order_history_payload(options["size"], rng),
+        }
+        stock, fast = JSONRenderer(), FastJSONRenderer()
+        parser = FastJSONParser()
+
+        self.stdout.write(
+            f"{'payload':<16}{'bytes':>10}{'drf ms':>10}{'fast ms':>10}"
+            f"{'speedup':>10}"
+        )
+        for name, data in payloads.items():
+            expected = stock.render(data)
+            if fast.render(data) != expected:
+                raise CommandError(f"{name}: renderers disagree.")
+            drf_s = min(
+                timeit.repeat(
+                    lambda: stock.render(data),
+                    number=1,
+                    repeat=options["repeat"],
+                )
+            )
+            fast_s = min(
+                timeit.repeat(
+                    lambda: fast.render(data),
+                    number=1,
+                    repeat=options["repeat"],
+                )
+            )
+            self.stdout.write(
+                f"{name:<16}{len(expected):>10}{drf_s * 1000:>10.2f}"
+                f"{fast_s * 1000:>10.2f}{drf_s / fast_s:>9.1f}x"
+            )
+        parse_s = min(
+            timeit.repeat(
+                lambda: parser.parse(io.BytesIO(expected)),
+                number=1,
+                repeat=options["repeat"],
+            )
+        )
+        self.stdout.write(f"parse order_history: {parse_s * 1000:.2f} ms")
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from airport_api_service.schema import (
+    generate_schema,
+    schema_version,
+    write_schema_file,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate the OpenAPI schema served at api/schema/ and store it "
+        "on disk; run once per deploy so workers start with it."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--file", help="Write here instead of SCHEMA_CACHE_FILE."
+        )
+
+    def handle(self, *args, **options):
+        version = schema_version()
+        path = write_schema_file(version, generate_schema(), options["file"])
+        self.stdout.write(
+            self.style.SUCCESS(f"Stored schema {version} in {path}.")
+        )
@@ -0,0 +1,58 @@
+from django.core.management.base import BaseCommand
+
+from airport_api_service.startup import (
+    aggregate_importtime,
+    parse_importtime,
+    run_cold_start,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Boot the WSGI application in a fresh interpreter under "
+        "`python -X importtime` and report where the import time goes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--top", type=int, default=25)
+        parser.add_argument(
+            "--depth",
+            type=int,
+            default=1,
+            help="Dotted components to group by (1 = top-level package).",
+        )
+        parser.add_argument(
+            "--modules",
+            action="store_true",
+            help="List the slowest single modules instead of packages.",
+        )
+
+    def handle(self, *args, **options):
+        report, output = run_cold_start(importtime=True)
+        rows = list(parse_importtime(output))
+        total_us = sum(self_us for _, self_us, _ in rows)
+
+        self.stdout.write(
+            f"Cold start {report['seconds'] * 1000:.1f} ms wall, "
+            f"{len(rows)} modules, {total_us / 1000:.1f} ms importing"
+        )
+        if options["modules"]:
+            self.stdout.write(f"{'self ms':>10}{'cumul ms':>10}  module")
+            rows.sort(key=lambda row: row[1], reverse=True)
+            for module, self_us, cumulative_us in rows[: options["top"]]:
+                self.stdout.write(
+                    f"{self_us / 1000:>10.1f}{cumulative_us / 1000:>10.1f}"
+                    f"  {module}"
+                )
+            return
+
+        totals = aggregate_importtime(rows, depth=options["depth"])
+        self.stdout.write(
+            f"{'self ms':>10}{'share':>8}{'modules':>9}  package"
+        )
+        ranked = sorted(totals.items(), key=lambda item: -item[1][0])
+        for package, (self_us, count) in ranked[: options["top"]]:
+            self.stdout.write(
+                f"{self_us / 1000:>10.1f}{self_us / total_us:>8.1%}"
+                f"{count:>9}  {package}"
+            )
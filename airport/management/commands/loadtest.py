@@ -0,0 +1,219 @@
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from datetime import datetime
+from http.client import HTTPException
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from airport.loadtest import (
+    DEFAULT_MIX,
+    Client,
+    compare,
+    run_load,
+    sample_flights,
+)
+
+LOADTEST_EMAIL = "loadtest@example.com"
+LOADTEST_PASSWORD = "loadtest-password"
+# Settings overridden for the local server; the query inspector walks
+# stack frames and EXPLAINs slow queries, which would skew latencies
+SERVER_ENV = {
+    "THROTTLE_RATE_ANON": "",
+    "THROTTLE_RATE_USER": "",
+    "QUERY_INSPECTOR_ENABLED": "False",
+}
+
+
+def parse_mix(value):
+    mix = {}
+    for item in value.split(","):
+        name, _, weight = item.partition("=")
+        if name not in DEFAULT_MIX:
+            raise CommandError(
+                f"Unknown scenario {name!r}, use: {', '.join(DEFAULT_MIX)}"
+            )
+        mix[name] = int(weight or 1)
+    return mix
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class Command(BaseCommand):
+    help = (
+        "Run mixed HTTP scenarios (search, seat map, booking, order "
+        "history) against a local server and report latency percentiles."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--url",
+            help="Base URL of a running server. By default a local "
+            "runserver is started with throttling disabled.",
+        )
+        parser.add_argument("--duration", type=float, default=30)
+        parser.add_argument("--concurrency", type=int, default=8)
+        parser.add_argument(
+            "--mix",
+            type=parse_mix,
+            default=DEFAULT_MIX,
+            help="Scenario weights, e.g. search_flights=5,seat_map=2",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--output", help="Write JSON results to this file."
+        )
+        parser.add_argument(
+            "--compare", help="Previous JSON results to diff against."
+        )
+
+    def handle(self, *args, **options):
+        flights = sample_flights(seed=options["seed"])
+        if not flights:
+            raise CommandError(
+                "No upcoming flights; run `manage.py seed_airport` first."
+            )
+        user_model = get_user_model()
+        if not user_model.objects.filter(email=LOADTEST_EMAIL).exists():
+            user_model.objects.create_user(LOADTEST_EMAIL, LOADTEST_PASSWORD)
+
+        server = None
+        base_url = options["url"]
+        if base_url is None:
+            server, base_url = self.start_server()
+        try:
+            token = self.obtain_token(base_url)
+            if server is not None:
+                self.stdout.write(f"Server settings: {self.server_settings()}")
+            self.stdout.write(
+                f"Running {options['duration']}s with "
+                f"{options['concurrency']} workers against {base_url}"
+            )
+            results = run_load(
+                base_url,
+                token,
+                flights,
+                options["mix"],
+                options["duration"],
+                options["concurrency"],
+                seed=options["seed"],
+            )
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait()
+
+        results["meta"] = {
+            "started_at": datetime.now().isoformat(timespec="seconds"),
+            "commit": self.git_commit(),
+            "url": base_url,
+            "database": connection.vendor,
+            "duration_s": options["duration"],
+            "concurrency": options["concurrency"],
+            "mix": options["mix"],
+            # Unknown for a server started elsewhere with --url
+            "server_settings": (
+                self.server_settings() if server is not None else None
+            ),
+        }
+        self.print_results(results)
+        if options["output"]:
+            Path(options["output"]).write_text(
+                json.dumps(results, indent=2, sort_keys=True)
+            )
+        if options["compare"]:
+            baseline = json.loads(Path(options["compare"]).read_text())
+            self.print_comparison(baseline, results)
+
+    def start_server(self):
+        port = free_port()
+        env = dict(os.environ, **SERVER_ENV)
+        server = subprocess.Popen(
+            [
+                sys.executable,
+                str(Path(settings.BASE_DIR) / "manage.py"),
+                "runserver",
+                "--noreload",
+                f"127.0.0.1:{port}",
+            ],
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        base_url = f"http://127.0.0.1:{port}"
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            try:
+                client = Client(base_url)
+                client.request("GET", "/api/")
+                client.close()
+                return server, base_url
+            except (HTTPException, OSError):
+                time.sleep(0.2)
+        server.terminate()
+        raise CommandError("Local server did not start within 30 seconds.")
+
+    @staticmethod
+    def server_settings():
+        return {"DEBUG": settings.DEBUG, **SERVER_ENV}
+
+    @staticmethod
+    def obtain_token(base_url):
+        client = Client(base_url)
+        status, content = client.request(
+            "POST",
+            "/api/user/token/",
+            {"email": LOADTEST_EMAIL, "password": LOADTEST_PASSWORD},
+        )
+        client.close()
+        if status != 200:
+            raise CommandError(f"Could not obtain a token: {status}")
+        return json.loads(content)["access"]
+
+    @staticmethod
+    def git_commit():
+        try:
+            return subprocess.run(
+                ["git", "rev-parse", "--short", "HEAD"],
+                cwd=settings.BASE_DIR,
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    def print_results(self, results):
+        self.stdout.write(
+            f"{'scenario':<16}{'requests':>10}{'rps':>10}"
+            f"{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}  statuses"
+        )
+        rows = list(results["scenarios"].items())
+        rows.append(("total", results["total"]))
+        for name, stats in rows:
+            self.stdout.write(
+                f"{name:<16}{stats['requests']:>10}{stats['rps']:>10}"
+                f"{stats['p50_ms']:>10}{stats['p95_ms']:>10}"
+                f"{stats['p99_ms']:>10}  {stats['statuses']}"
+            )
+
+    def print_comparison(self, baseline, results):
+        self.stdout.write(
+            f"\nvs {baseline['meta'].get('commit') or 'baseline'}:"
+        )
+        for name, metric, before, after, change in compare(baseline, results):
+            self.stdout.write(
+                f"{name:<16}{metric:<8}{before:>10}{after:>10}"
+                f"{change:>+9.1f}%"
+            )
@@ -0,0 +1,63 @@
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from airport.booking import BOOKING_BATCH_SIZE, process_booking_batch
+
+
+class Command(BaseCommand):
+    help = "Confirm queued booking jobs in per-flight batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=1)
+        parser.add_argument(
+            "--batch-size", type=int, default=BOOKING_BATCH_SIZE
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=1.0,
+            help="Seconds to sleep when the queue is empty.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit once the queue is drained.",
+        )
+
+    def handle(self, *args, **options):
+        stop = threading.Event()
+        processed = []
+
+        def work():
+            try:
+                while not stop.is_set():
+                    count = process_booking_batch(options["batch_size"])
+                    processed.append(count)
+                    if count:
+                        continue
+                    if options["once"]:
+                        return
+                    stop.wait(options["poll_interval"])
+            finally:
+                connection.close()
+
+        threads = [
+            threading.Thread(target=work, daemon=True)
+            for _ in range(options["workers"])
+        ]
+        for thread in threads:
+            thread.start()
+        try:
+            while any(thread.is_alive() for thread in threads):
+                time.sleep(0.2)
+        except KeyboardInterrupt:
+            stop.set()
+            for thread in threads:
+                thread.join()
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Processed {sum(processed)} booking jobs.")
+        )
@@ -0,0 +1,61 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from airport.notifications import (
+    CHANGE_BATCH_SIZE,
+    DELIVERY_BATCH_SIZE,
+    deliver_notifications,
+    process_flight_changes,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Fan flight schedule changes out to ticket holders as notifications "
+        "and deliver them through NOTIFICATION_BACKEND."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=CHANGE_BATCH_SIZE
+        )
+        parser.add_argument(
+            "--delivery-batch-size", type=int, default=DELIVERY_BATCH_SIZE
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=1.0,
+            help="Seconds to sleep when nothing is pending.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit once every pending change is delivered.",
+        )
+
+    def handle(self, *args, **options):
+        changes = sent = 0
+        try:
+            while True:
+                processed = process_flight_changes(options["batch_size"])
+                delivered = deliver_notifications(
+                    options["delivery_batch_size"]
+                )
+                changes += processed
+                sent += delivered
+                if processed or delivered:
+                    continue
+                if options["once"]:
+                    break
+                time.sleep(options["poll_interval"])
+        except KeyboardInterrupt:
+            pass
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Processed {changes} flight changes, "
+                f"sent {sent} notifications."
+            )
+        )
@@ -0,0 +1,44 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from airport.waitlist import JOB_BATCH_SIZE, process_waitlist_jobs
+
+
+class Command(BaseCommand):
+    help = (
+        "Allocate released seats of the flights queued when seats were "
+        "released or waitlist entries joined."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=JOB_BATCH_SIZE)
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=1.0,
+            help="Seconds to sleep when the queue is empty.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit once the queue is drained.",
+        )
+
+    def handle(self, *args, **options):
+        processed = 0
+        try:
+            while True:
+                count = process_waitlist_jobs(options["batch_size"])
+                processed += count
+                if count:
+                    continue
+                if options["once"]:
+                    break
+                time.sleep(options["poll_interval"])
+        except KeyboardInterrupt:
+            pass
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Processed {processed} waitlist jobs.")
+        )
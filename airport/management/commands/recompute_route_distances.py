@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from airport.geo import DISTANCE_BATCH_SIZE, recompute_route_distances
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute Route.distance as the great-circle distance between "
+        "the airports' coordinates."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=DISTANCE_BATCH_SIZE
+        )
+
+    def handle(self, *args, **options):
+        updated = recompute_route_distances(options["batch_size"])
+        self.stdout.write(
+            self.style.SUCCESS(f"Updated the distance of {updated} routes.")
+        )
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from airport.analytics import REFRESH_BATCH_SIZE, refresh_flight_loads
+
+
+class Command(BaseCommand):
+    help = "Rebuild the flight load summary table used by analytics."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--flight",
+            type=int,
+            action="append",
+            dest="flight_ids",
+            help="Refresh only this flight id (may be repeated).",
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=REFRESH_BATCH_SIZE
+        )
+
+    def handle(self, *args, **options):
+        refreshed = refresh_flight_loads(
+            options["flight_ids"], batch_size=options["batch_size"]
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f"Refreshed {refreshed} flight load rows.")
+        )
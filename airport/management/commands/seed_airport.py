@@ -0,0 +1,519 @@
+import csv
+import io
+import math
+import random
+from datetime import datetime, time, timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from airport.analytics import refresh_flight_loads
+from airport.geo import great_circle_distances, invalidate_airport_index
+from airport.models import (
+    Airplane,
+    AirplaneType,
+    Airport,
+    Crew,
+    Flight,
+    Order,
+    Route,
+    Ticket,
+)
+
+SYLLABLES = (
+    "ka",
+    "ro",
+    "mi",
+    "lan",
+    "te",
+    "vo",
+    "bar",
+    "sel",
+    "no",
+    "dri",
+    "ha",
+    "pol",
+    "un",
+    "ze",
+    "ma",
+    "tor",
+    "li",
+    "as",
+    "ven",
+    "gra",
+)
+COUNTRIES = (
+    "Ukraine",
+    "Poland",
+    "Germany",
+    "France",
+    "Spain",
+    "Italy",
+    "Portugal",
+    "Netherlands",
+    "Sweden",
+    "Norway",
+    "Finland",
+    "Greece",
+    "Turkey",
+    "Canada",
+    "USA",
+    "Mexico",
+    "Brazil",
+    "Japan",
+    "China",
+    "India",
+)
+FIRST_NAMES = (
+    "Olena",
+    "Taras",
+    "Anna",
+    "Mark",
+    "Sofia",
+    "Ivan",
+    "Emma",
+    "Lukas",
+    "Maria",
+    "Noah",
+    "Iryna",
+    "Oleh",
+    "Chloe",
+    "Mateo",
+    "Yuki",
+    "Arjun",
+)
+LAST_NAMES = (
+    "Shevchenko",
+    "Kowalski",
+    "Muller",
+    "Martin",
+    "Garcia",
+    "Rossi",
+    "Silva",
+    "Jansen",
+    "Nilsson",
+    "Tanaka",
+    "Wang",
+    "Patel",
+    "Smith",
+)
+AIRPLANE_MODELS = (
+    ("Airbus A320", 30, 6),
+    ("Airbus A321", 37, 6),
+    ("Boeing 737-800", 32, 6),
+    ("Boeing 787-9", 42, 9),
+    ("Embraer E190", 25, 4),
+    ("ATR 72", 18, 4),
+    ("Airbus A350-900", 44, 9),
+)
+CRUISE_SPEED_KMH = 800
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a deterministic, realistically shaped load dataset of "
+        "airports, routes, fleets, crews, flights, orders and tickets."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--airports", type=int, default=2000)
+        parser.add_argument(
+            "--routes-per-airport",
+            type=int,
+            default=6,
+            help="Outgoing routes per airport, mostly towards hubs.",
+        )
+        parser.add_argument("--airplanes", type=int, default=1500)
+        parser.add_argument("--crews", type=int, default=10000)
+        parser.add_argument("--users", type=int, default=200000)
+        parser.add_argument("--days", type=int, default=365)
+        parser.add_argument("--flights-per-day", type=int, default=400)
+        parser.add_argument(
+            "--load-factor",
+            type=float,
+            default=0.8,
+            help="Average share of seats sold per flight.",
+        )
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument(
+            "--start",
+            type=lambda value: datetime.strptime(value, "%Y-%m-%d").date(),
+            default=None,
+            help="First flight day, YYYY-MM-DD (default: today - days / 2).",
+        )
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options["seed"])
+        self.batch_size = options["batch_size"]
+        self.use_copy = connection.vendor == "postgresql"
+
+        airports = self.seed_airports(options["airports"])
+        routes = self.seed_routes(airports, options["routes_per_airport"])
+        airplanes = self.seed_airplanes(options["airplanes"])
+        crew_ids = self.seed_crews(options["crews"])
+        user_ids = self.seed_users(options["users"])
+
+        start = options["start"] or (
+            timezone.localdate() - timedelta(days=options["days"] // 2)
+        )
+        flights, tickets = self.seed_flights(
+            routes,
+            airplanes,
+            crew_ids,
+            user_ids,
+            start,
+            options["days"],
+            options["flights_per_day"],
+            options["load_factor"],
+        )
+        self.reset_sequences()
+        refresh_flight_loads(batch_size=self.batch_size)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Seeded {len(airports)} airports, {len(routes)} routes, "
+                f"{len(airplanes)} airplanes, {flights} flights and "
+                f"{tickets} tickets."
+            )
+        )
+
+    @staticmethod
+    def next_id(model) -> int:
+        return (model.objects.aggregate(Max("id"))["id__max"] or 0) + 1
+
+    def write(self, model, fields, rows):
+        """Insert raw rows with COPY on PostgreSQL, executemany elsewhere.
+
+        Both paths skip model save() and field pre_save(), so generated
+        values such as Order.created_at are kept as they are.
+        """
+        if not rows:
+            return
+        ops = connection.ops
+        rows = [
+            [
+                ops.adapt_datetimefield_value(value)
+                if isinstance(value, datetime)
+                else value
+                for value in row
+            ]
+            for row in rows
+        ]
+        table = connection.ops.quote_name(model._meta.db_table)
+        columns = ", ".join(
+            ops.quote_name(model._meta.get_field(field).column)
+            for field in fields
+        )
+        with connection.cursor() as cursor:
+            if self.use_copy:
+                buffer = io.StringIO()
+                csv.writer(buffer).writerows(rows)
+                buffer.seek(0)
+                cursor.copy_expert(
+                    f"COPY {table} ({columns}) FROM STDIN WITH (FORMAT csv)",
+                    buffer,
+                )
+            else:
+                placeholders = ", ".join(["%s"] * len(fields))
+                for start in range(0, len(rows), self.batch_size):
+                    cursor.executemany(
+                        f"INSERT INTO {table} ({columns}) "
+                        f"VALUES ({placeholders})",
+                        rows[start : start + self.batch_size],
+                    )
+
+    def reset_sequences(self):
+        models = [
+            Airport,
+            Route,
+            AirplaneType,
+            Airplane,
+            Crew,
+            Flight,
+            Order,
+            Ticket,
+            get_user_model(),
+        ]
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(no_style(), models):
+                cursor.execute(sql)
+
+    def city_name(self) -> str:
+        syllables = self.rng.randint(2, 3)
+        return "".join(
+            self.rng.choice(SYLLABLES) for _ in range(syllables)
+        ).capitalize()
+
+    def seed_airports(self, count):
+        first_id = self.next_id(Airport)
+        airports = []
+        rows = []
+        for offset in range(count):
+            city = self.city_name()
+            latitude = math.degrees(math.asin(self.rng.uniform(-0.85, 0.95)))
+            longitude = self.rng.uniform(-180, 180)
+            airports.append((first_id + offset, (latitude, longitude)))
+            rows.append(
+                (
+                    first_id + offset,
+                    f"{city} International",
+                    city,
+                    self.rng.choice(COUNTRIES),
+                    latitude,
+                    longitude,
+                )
+            )
+        with transaction.atomic():
+            self.write(
+                Airport,
+                (
+                    "id",
+                    "name",
+                    "closest_big_city",
+                    "country",
+                    "latitude",
+                    "longitude",
+                ),
+                rows,
+            )
+        invalidate_airport_index()
+        return airports
+
+    def seed_routes(self, airports, routes_per_airport):
+        """Connect every airport to a few hubs and random neighbours."""
+        hubs = airports[: max(len(airports) // 20, 1)]
+        hub_ids = {hub_id for hub_id, _ in hubs}
+        first_id = self.next_id(Route)
+        points = dict(airports)
+        pairs = set()
+        routes = []
+        for source_id in points:
+            for _ in range(routes_per_airport):
+                pool = hubs if self.rng.random() < 0.7 else airports
+                destination_id = self.rng.choice(pool)[0]
+                if destination_id == source_id:
+                    continue
+                for pair in (
+                    (source_id, destination_id),
+                    (destination_id, source_id),
+                ):
+                    if pair in pairs:
+                        continue
+                    pairs.add(pair)
+                    is_hub = bool(hub_ids.intersection(pair))
+                    routes.append([first_id + len(routes), *pair, 0, is_hub])
+        distances = great_circle_distances(
+            [points[route[1]] for route in routes],
+            [points[route[2]] for route in routes],
+        )
+        for route, distance in zip(routes, distances):
+            route[3] = distance
+        with transaction.atomic():
+            self.write(
+                Route,
+                ("id", "source_id", "destination_id", "distance"),
+                [route[:4] for route in routes],
+            )
+        return routes
+
+    def seed_airplanes(self, count):
+        airplane_types = [
+            (
+                AirplaneType.objects.get_or_create(name=name)[0].id,
+                name,
+                rows,
+                seats_in_row,
+            )
+            for name, rows, seats_in_row in AIRPLANE_MODELS
+        ]
+        first_id = self.next_id(Airplane)
+        airplanes = []
+        rows = []
+        for offset in range(count):
+            type_id, name, seat_rows, seats_in_row = self.rng.choice(
+                airplane_types
+            )
+            airplanes.append((first_id + offset, seat_rows, seats_in_row))
+            rows.append(
+                (
+                    first_id + offset,
+                    f"{name} #{offset + 1}",
+                    seat_rows,
+                    seats_in_row,
+                    type_id,
+                )
+            )
+        with transaction.atomic():
+            self.write(
+                Airplane,
+                ("id", "name", "rows", "seats_in_row", "airplane_type_id"),
+                rows,
+            )
+        return airplanes
+
+    def seed_crews(self, count):
+        first_id = self.next_id(Crew)
+        rows = [
+            (
+                first_id + offset,
+                self.rng.choice(FIRST_NAMES),
+                self.rng.choice(LAST_NAMES),
+            )
+            for offset in range(count)
+        ]
+        with transaction.atomic():
+            self.write(Crew, ("id", "first_name", "last_name"), rows)
+        return [row[0] for row in rows]
+
+    def seed_users(self, count):
+        user_model = get_user_model()
+        first_id = self.next_id(user_model)
+        password = make_password("traveller")
+        joined = timezone.now()
+        rows = [
+            (
+                first_id + offset,
+                f"traveller{first_id + offset}@example.com",
+                password,
+                self.rng.choice(FIRST_NAMES),
+                self.rng.choice(LAST_NAMES),
+                False,
+                False,
+                True,
+                joined,
+            )
+            for offset in range(count)
+        ]
+        with transaction.atomic():
+            self.write(
+                user_model,
+                (
+                    "id",
+                    "email",
+                    "password",
+                    "first_name",
+                    "last_name",
+                    "is_superuser",
+                    "is_staff",
+                    "is_active",
+                    "date_joined",
+                ),
+                rows,
+            )
+        return [row[0] for row in rows]
+
+    def seed_flights(
+        self,
+        routes,
+        airplanes,
+        crew_ids,
+        user_ids,
+        start,
+        days,
+        flights_per_day,
+        load_factor,
+    ):
+        route_weights = [3 if route[4] else 1 for route in routes]
+        flight_id = self.next_id(Flight)
+        order_id = self.next_id(Order)
+        ticket_id = self.next_id(Ticket)
+        tz = timezone.get_current_timezone()
+        flights_total = tickets_total = 0
+
+        for day_offset in range(days):
+            day = start + timedelta(days=day_offset)
+            midnight = timezone.make_aware(datetime.combine(day, time()), tz)
+            flights, crew_links, orders, tickets = [], [], [], []
+            day_routes = self.rng.choices(
+                routes, weights=route_weights, k=flights_per_day
+            )
+            for route_id, _, _, distance, _ in day_routes:
+                airplane_id, seat_rows, seats_in_row = self.rng.choice(
+                    airplanes
+                )
+                departure = midnight + timedelta(
+                    minutes=self.rng.randrange(5 * 60, 23 * 60, 5)
+                )
+                arrival = departure + timedelta(
+                    minutes=30 + distance * 60 // CRUISE_SPEED_KMH
+                )
+                flights.append(
+                    (
+                        flight_id,
+                        route_id,
+                        airplane_id,
+                        departure,
+                        arrival,
+                    )
+                )
+                crew_links.extend(
+                    (flight_id, crew_id)
+                    for crew_id in self.rng.sample(crew_ids, 3)
+                )
+
+                capacity = seat_rows * seats_in_row
+                share = min(max(self.rng.gauss(load_factor, 0.15), 0), 1)
+                seats = self.rng.sample(range(capacity), int(capacity * share))
+                position = 0
+                while position < len(seats):
+                    group = self.rng.choice((1, 1, 1, 2, 2, 3, 4))
+                    orders.append(
+                        (
+                            order_id,
+                            departure
+                            - timedelta(
+                                minutes=self.rng.randrange(60, 129600)
+                            ),
+                            self.rng.choice(user_ids),
+                        )
+                    )
+                    for seat_index in seats[position : position + group]:
+                        tickets.append(
+                            (
+                                ticket_id,
+                                seat_index // seats_in_row + 1,
+                                seat_index % seats_in_row + 1,
+                                flight_id,
+                                order_id,
+                            )
+                        )
+                        ticket_id += 1
+                    position += group
+                    order_id += 1
+                flight_id += 1
+
+            with transaction.atomic():
+                self.write(
+                    Flight,
+                    (
+                        "id",
+                        "route_id",
+                        "airplane_id",
+                        "departure_time",
+                        "arrival_time",
+                    ),
+                    flights,
+                )
+                self.write(
+                    Flight.crew.through, ("flight_id", "crew_id"), crew_links
+                )
+                self.write(Order, ("id", "created_at", "user_id"), orders)
+                self.write(
+                    Ticket,
+                    ("id", "row", "seat", "flight_id", "order_id"),
+                    tickets,
+                )
+            flights_total += len(flights)
+            tickets_total += len(tickets)
+            if (day_offset + 1) % 10 == 0:
+                self.stdout.write(
+                    f"{day}: {flights_total} flights, "
+                    f"{tickets_total} tickets"
+                )
+        return flights_total, tickets_total
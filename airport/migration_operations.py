@@ -0,0 +1,48 @@
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db.migrations.operations import AddIndex
+
+
+class AddIndexConcurrentlyIfSupported(AddIndexConcurrently):
+    """CREATE INDEX CONCURRENTLY on PostgreSQL, a plain AddIndex elsewhere.
+
+    An invalid index left behind by an interrupted concurrent build is
+    dropped first, so a failed migration can simply be run again.
+    """
+
+    def database_forwards(
+        self, app_label, schema_editor, from_state, to_state
+    ):
+        if schema_editor.connection.vendor != "postgresql":
+            return AddIndex.database_forwards(
+                self, app_label, schema_editor, from_state, to_state
+            )
+        self.drop_invalid_index(schema_editor)
+        return super().database_forwards(
+            app_label, schema_editor, from_state, to_state
+        )
+
+    def database_backwards(
+        self, app_label, schema_editor, from_state, to_state
+    ):
+        if schema_editor.connection.vendor != "postgresql":
+            return AddIndex.database_backwards(
+                self, app_label, schema_editor, from_state, to_state
+            )
+        return super().database_backwards(
+            app_label, schema_editor, from_state, to_state
+        )
+
+    def drop_invalid_index(self, schema_editor):
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT 1 FROM pg_index JOIN pg_class "
+                "ON pg_class.oid = pg_index.indexrelid "
+                "WHERE pg_class.relname = %s AND NOT pg_index.indisvalid",
+                [self.index.name],
+            )
+            invalid = cursor.fetchone() is not None
+        if invalid:
+            schema_editor.execute(
+                "DROP INDEX CONCURRENTLY IF EXISTS "
+                + schema_editor.quote_name(self.index.name)
+            )
@@ -0,0 +1,64 @@
+# Generated by Django 4.2.6 on 2026-10-19 10:16
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("airport", "0004_alter_ticket_options_airport_country_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FlightLoad",
+            fields=[
+                (
+                    "flight",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="load",
+                        serialize=False,
+                        to="airport.flight",
+                    ),
+                ),
+                ("departure_date", models.DateField(db_index=True)),
+                ("capacity", models.IntegerField()),
+                ("tickets_sold", models.IntegerField(default=0)),
+                ("refreshed_at", models.DateTimeField(auto_now=True)),
+                (
+                    "airplane_type",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="airport.airplanetype",
+                    ),
+                ),
+                (
+                    "destination",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="airport.airport",
+                    ),
+                ),
+                (
+                    "route",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="airport.route",
+                    ),
+                ),
+                (
+                    "source",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="airport.airport",
+                    ),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.6 on 2026-10-19 10:40
+
+from django.db import migrations, models
+
+from airport.migration_operations import AddIndexConcurrentlyIfSupported
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ("airport", "0006_bookingjob"),
+    ]
+
+    operations = [
+        AddIndexConcurrentlyIfSupported(
+            model_name="flight",
+            index=models.Index(fields=["departure_time"], name="flight_departure_idx"),
+        ),
+        AddIndexConcurrentlyIfSupported(
+            model_name="order",
+            index=models.Index(fields=["created_at"], name="order_created_idx"),
+        ),
+    ]
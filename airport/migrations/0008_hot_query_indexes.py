@@ -0,0 +1,42 @@
+# Generated by Django 4.2.6 on 2026-10-19 10:47
+
+from django.db import migrations, models
+
+from airport.migration_operations import AddIndexConcurrentlyIfSupported
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ("airport", "0007_flight_departure_order_created_indexes"),
+    ]
+
+    operations = [
+        AddIndexConcurrentlyIfSupported(
+            model_name="flight",
+            index=models.Index(
+                fields=["route", "departure_time"], name="flight_route_departure_idx"
+            ),
+        ),
+        AddIndexConcurrentlyIfSupported(
+            model_name="flight",
+            index=models.Index(
+                fields=["airplane", "departure_time"],
+                name="flight_airplane_departure_idx",
+            ),
+        ),
+        AddIndexConcurrentlyIfSupported(
+            model_name="order",
+            index=models.Index(
+                fields=["user", "-created_at"], name="order_user_created_idx"
+            ),
+        ),
+        AddIndexConcurrentlyIfSupported(
+            model_name="route",
+            index=models.Index(
+                fields=["source", "destination"], name="route_source_destination_idx"
+            ),
+        ),
+    ]
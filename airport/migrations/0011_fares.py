@@ -0,0 +1,102 @@
+# Generated by Django 4.2.6 on 2026-10-19 10:58
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+DEFAULT_FARE_BANDS = (
+    (500, "49.00"),
+    (1500, "89.00"),
+    (3000, "149.00"),
+    (6000, "299.00"),
+    (20040, "549.00"),
+)
+
+
+def create_fare_bands(apps, schema_editor):
+    FareBand = apps.get_model("airport", "FareBand")
+    FareBand.objects.bulk_create(
+        FareBand(max_distance=max_distance, base_fare=base_fare)
+        for max_distance, base_fare in DEFAULT_FARE_BANDS
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("airport", "0010_airport_coordinates"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FareBand",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("max_distance", models.PositiveIntegerField(unique=True)),
+                ("base_fare", models.DecimalField(decimal_places=2, max_digits=10)),
+            ],
+            options={
+                "ordering": ["max_distance"],
+            },
+        ),
+        migrations.AddField(
+            model_name="archivedticket",
+            name="price",
+            field=models.DecimalField(
+                blank=True, decimal_places=2, max_digits=10, null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="ticket",
+            name="price",
+            field=models.DecimalField(
+                blank=True, decimal_places=2, max_digits=10, null=True
+            ),
+        ),
+        migrations.CreateModel(
+            name="Cabin",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "cabin_class",
+                    models.CharField(
+                        choices=[
+                            ("economy", "Economy"),
+                            ("premium_economy", "Premium Economy"),
+                            ("business", "Business"),
+                            ("first", "First"),
+                        ],
+                        max_length=16,
+                    ),
+                ),
+                ("first_row", models.PositiveIntegerField()),
+                ("last_row", models.PositiveIntegerField()),
+                (
+                    "airplane",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="cabins",
+                        to="airport.airplane",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["airplane", "first_row"],
+            },
+        ),
+        migrations.RunPython(create_fare_bands, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.6 on 2026-10-19 11:08
+
+from django.db import migrations, models
+
+from airport.migration_operations import AddIndexConcurrentlyIfSupported
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ("airport", "0012_waitlist"),
+    ]
+
+    operations = [
+        AddIndexConcurrentlyIfSupported(
+            model_name="ticket",
+            index=models.Index(
+                fields=["order", "flight", "row", "seat"],
+                name="ticket_order_flight_idx",
+            ),
+        ),
+    ]
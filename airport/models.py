@@ -1,6 +1,10 @@
 from django.conf import settings
 from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
+from django.db.models import F, Value
+from django.db.models.functions import Concat
 from rest_framework.exceptions import ValidationError
 
 
@@ -8,6 +12,16 @@ class Airport(models.Model):
     name = models.CharField(max_length=255)
     closest_big_city = models.CharField(max_length=255)
     country = models.CharField(max_length=255, null=True, blank=True)
+    latitude = models.FloatField(
+        null=True,
+        blank=True,
+        validators=[MinValueValidator(-90), MaxValueValidator(90)],
+    )
+    longitude = models.FloatField(
+        null=True,
+        blank=True,
+        validators=[MinValueValidator(-180), MaxValueValidator(180)],
+    )
 
     def __str__(self) -> str:
         return f"{self.name} ({self.closest_big_city})"
@@ -26,9 +40,45 @@ class Route(models.Model):
     def route(self) -> str:
         return f"{self.source} - {self.destination}"
 
+    @staticmethod
+    def label_expression(prefix: str = "") -> Concat:
+        """Build the `route` label in SQL, for queries relative to prefix."""
+        return Concat(
+            F(f"{prefix}source__name"),
+            Value(" ("),
+            F(f"{prefix}source__closest_big_city"),
+            Value(") - "),
+            F(f"{prefix}destination__name"),
+            Value(" ("),
+            F(f"{prefix}destination__closest_big_city"),
+            Value(")"),
+            output_field=models.CharField(),
+        )
+
     def __str__(self) -> str:
         return f"{self.source} - {self.destination}. {self.distance}km."
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["source", "destination"],
+                name="route_source_destination_idx",
+            ),
+        ]
+
+
+class FareBand(models.Model):
+    """Base one-way fare for routes up to max_distance km."""
+
+    max_distance = models.PositiveIntegerField(unique=True)
+    base_fare = models.DecimalField(max_digits=10, decimal_places=2)
+
+    def __str__(self) -> str:
+        return f"Up to {self.max_distance}km: {self.base_fare}"
+
+    class Meta:
+        ordering = ["max_distance"]
+
 
 class AirplaneType(models.Model):
     name = models.CharField(max_length=255)
@@ -51,6 +101,54 @@ class Airplane(models.Model):
         return self.name
 
 
+class Cabin(models.Model):
+    """Rows first_row..last_row of an airplane sold as one cabin class.
+
+    Rows outside every cabin are economy.
+    """
+
+    class CabinClass(models.TextChoices):
+        ECONOMY = "economy"
+        PREMIUM_ECONOMY = "premium_economy"
+        BUSINESS = "business"
+        FIRST = "first"
+
+    airplane = models.ForeignKey(
+        Airplane, on_delete=models.CASCADE, related_name="cabins"
+    )
+    cabin_class = models.CharField(max_length=16, choices=CabinClass.choices)
+    first_row = models.PositiveIntegerField()
+    last_row = models.PositiveIntegerField()
+
+    def clean(self):
+        if self.first_row < 1 or self.last_row < self.first_row:
+            raise DjangoValidationError(
+                {"last_row": "Rows must satisfy 1 <= first_row <= last_row."}
+            )
+        if self.last_row > self.airplane.rows:
+            raise DjangoValidationError(
+                {"last_row": f"Airplane has only {self.airplane.rows} rows."}
+            )
+        overlapping = Cabin.objects.filter(
+            airplane_id=self.airplane_id,
+            first_row__lte=self.last_row,
+            last_row__gte=self.first_row,
+        ).exclude(pk=self.pk)
+        if overlapping.exists():
+            raise DjangoValidationError(
+                {"first_row": "Rows overlap another cabin of this airplane."}
+            )
+
+    def __str__(self) -> str:
+        return (
+            f"{self.airplane}: {self.cabin_class} "
+            f"(rows {self.first_row}-{self.last_row})"
+        )
+
+    class Meta:
+        ordering = ["airplane", "first_row"]
+
+
 class Crew(models.Model):
     first_name = models.CharField(max_length=255)
     last_name = models.CharField(max_length=255)
@@ -73,6 +171,31 @@ class Flight(models.Model):
     def __str__(self) -> str:
         return f"{self.route} arrives at {self.arrival_time}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # The stored schedule, to record a FlightChange when it is saved
+        instance.saved_schedule = (
+            instance.__dict__.get("departure_time"),
+            instance.__dict__.get("arrival_time"),
+        )
+        return instance
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["departure_time"], name="flight_departure_idx"
+            ),
+            models.Index(
+                fields=["route", "departure_time"],
+                name="flight_route_departure_idx",
+            ),
+            models.Index(
+                fields=["airplane", "departure_time"],
+                name="flight_airplane_departure_idx",
+            ),
+        ]
+
 
 class Order(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
@@ -85,6 +208,12 @@ class Order(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["created_at"], name="order_created_idx"),
+            models.Index(
+                fields=["user", "-created_at"], name="order_user_created_idx"
+            ),
+        ]
 
 
 class Ticket(models.Model):
@@ -96,6 +225,9 @@ class Ticket(models.Model):
     order = models.ForeignKey(
         Order, on_delete=models.CASCADE, related_name="tickets"
     )
+    price = models.DecimalField(
+        max_digits=10, decimal_places=2, null=True, blank=True
+    )
 
     @staticmethod
     def validate_ticket(row, rows, seat, seats_in_row, error_to_raise):
@@ -135,3 +267,263 @@ class Ticket(models.Model):
     class Meta:
         unique_together = ("flight", "row", "seat")
         ordering = ["row", "seat"]
+        indexes = [
+            models.Index(
+                fields=["order", "flight", "row", "seat"],
+                name="ticket_order_flight_idx",
+            ),
+        ]
+
+
+class ArchivedOrder(models.Model):
+    """Order whose flights have all departed, moved out of the hot tables.
+
+    Rows keep the id they had in Order; see airport.archive.
+    """
+
+    id = models.BigIntegerField(primary_key=True)
+    created_at = models.DateTimeField()
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="archived_orders",
+    )
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self) -> str:
+        return str(self.created_at)
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=["user", "-created_at"],
+                name="archived_order_user_idx",
+            ),
+        ]
+
+
+class ArchivedTicket(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    row = models.IntegerField()
+    seat = models.IntegerField()
+    flight = models.ForeignKey(
+        Flight, on_delete=models.CASCADE, related_name="archived_tickets"
+    )
+    order = models.ForeignKey(
+        ArchivedOrder, on_delete=models.CASCADE, related_name="tickets"
+    )
+    price = models.DecimalField(
+        max_digits=10, decimal_places=2, null=True, blank=True
+    )
+
+    def __str__(self) -> str:
+        return f"{self.flight} (row:{self.row}, seat:{self.seat}"
+
+    class Meta:
+        ordering = ["row", "seat"]
+
+
+class WaitlistEntry(models.Model):
+    """A request for seats on a sold-out flight, served by the allocator.
+
+    Entries are allocated by descending priority, then in arrival order.
+    """
+
+    class Status(models.TextChoices):
+        WAITING = "waiting"
+        ALLOCATED = "allocated"
+        CANCELLED = "cancelled"
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="waitlist_entries",
+    )
+    flight = models.ForeignKey(
+        Flight, on_delete=models.CASCADE, related_name="waitlist"
+    )
+    seats = models.PositiveSmallIntegerField(default=1)
+    priority = models.SmallIntegerField(default=0)
+    status = models.CharField(
+        max_length=16, choices=Status.choices, default=Status.WAITING
+    )
+    order = models.OneToOneField(
+        Order,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="waitlist_entry",
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    allocated_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self) -> str:
+        return f"Waitlist #{self.id}: {self.seats} seats ({self.status})"
+
+    class Meta:
+        ordering = ["-priority", "id"]
+        indexes = [
+            models.Index(
+                fields=["flight", "status", "-priority", "id"],
+                name="waitlist_queue_idx",
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "flight"],
+                condition=models.Q(status="waiting"),
+                name="waitlist_one_waiting_entry",
+            ),
+        ]
+
+
+class WaitlistAllocationJob(models.Model):
+    """A flight whose waitlist may be served, queued for the worker.
+
+    Queued when seats are released or an entry joins, so the allocation
+    runs outside the request that triggered it.
+    """
+
+    flight = models.ForeignKey(
+        Flight, on_delete=models.CASCADE, related_name="+"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self) -> str:
+        return f"Waitlist allocation for flight #{self.flight_id}"
+
+    class Meta:
+        ordering = ["id"]
+
+
+class FlightLoad(models.Model):
+    flight = models.OneToOneField(
+        Flight,
+        primary_key=True,
+        on_delete=models.CASCADE,
+        related_name="load",
+    )
+    route = models.ForeignKey(
+        Route, on_delete=models.CASCADE, related_name="+"
+    )
+    source = models.ForeignKey(
+        Airport, on_delete=models.CASCADE, related_name="+"
+    )
+    destination = models.ForeignKey(
+        Airport, on_delete=models.CASCADE, related_name="+"
+    )
+    airplane_type = models.ForeignKey(
+        AirplaneType, on_delete=models.CASCADE, related_name="+"
+    )
+    departure_date = models.DateField(db_index=True)
+    capacity = models.IntegerField()
+    tickets_sold = models.IntegerField(default=0)
+    refreshed_at = models.DateTimeField(auto_now=True)
+
+    @property
+    def load_factor(self) -> float:
+        if not self.capacity:
+            return 0.0
+        return self.tickets_sold / self.capacity
+
+    def __str__(self) -> str:
+        return f"{self.flight_id}: {self.tickets_sold}/{self.capacity}"
+
+
+class BookingJob(models.Model):
+    class Status(models.TextChoices):
+        PENDING = "pending"
+        CONFIRMED = "confirmed"
+        FAILED = "failed"
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="booking_jobs",
+    )
+    flight = models.ForeignKey(
+        Flight, on_delete=models.CASCADE, related_name="booking_jobs"
+    )
+    tickets = models.JSONField()
+    status = models.CharField(
+        max_length=16, choices=Status.choices, default=Status.PENDING
+    )
+    order = models.OneToOneField(
+        Order,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="booking_job",
+    )
+    errors = models.JSONField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self) -> str:
+        return f"Booking #{self.id} ({self.status})"
+
+    class Meta:
+        ordering = ["id"]
+        indexes = [models.Index(fields=["status", "flight"])]
+
+
+class FlightChange(models.Model):
+    """A schedule change of a flight, fanned out to its ticket holders."""
+
+    flight = models.ForeignKey(
+        Flight, on_delete=models.CASCADE, related_name="changes"
+    )
+    old_departure_time = models.DateTimeField()
+    new_departure_time = models.DateTimeField()
+    old_arrival_time = models.DateTimeField()
+    new_arrival_time = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self) -> str:
+        return (
+            f"Flight #{self.flight_id}: {self.old_departure_time} -> "
+            f"{self.new_departure_time}"
+        )
+
+    class Meta:
+        ordering = ["id"]
+        indexes = [
+            models.Index(
+                fields=["id"],
+                name="flight_change_pending_idx",
+                condition=models.Q(processed_at__isnull=True),
+            ),
+        ]
+
+
+class Notification(models.Model):
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="notifications",
+    )
+    change = models.ForeignKey(
+        FlightChange, on_delete=models.CASCADE, related_name="notifications"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self) -> str:
+        return f"Notification #{self.id} to user #{self.user_id}"
+
+    class Meta:
+        ordering = ["id"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["change", "user"], name="notification_once_per_user"
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["id"],
+                name="notification_unsent_idx",
+                condition=models.Q(sent_at__isnull=True),
+            ),
+        ]
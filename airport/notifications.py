@@ -0,0 +1,187 @@
+import json
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import FlightChange, Notification, Route, Ticket
+
+CHANGE_BATCH_SIZE = 500
+DELIVERY_BATCH_SIZE = 1000
+
+
+def record_flight_changes(flights) -> list:
+    """Store a FlightChange for each flight whose schedule was changed.
+
+    Flights loaded from the database remember their stored schedule (see
+    Flight.from_db), which is compared with the current one.
+    """
+    changes = []
+    for flight in flights:
+        old = getattr(flight, "saved_schedule", None)
+        new = (flight.departure_time, flight.arrival_time)
+        if old is None or None in old or old == new:
+            continue
+        changes.append(
+            FlightChange(
+                flight=flight,
+                old_departure_time=old[0],
+                new_departure_time=new[0],
+                old_arrival_time=old[1],
+                new_arrival_time=new[1],
+            )
+        )
+        flight.saved_schedule = new
+    return FlightChange.objects.bulk_create(changes)
+
+
+def process_flight_changes(batch_size=CHANGE_BATCH_SIZE) -> int:
+    """Turn up to batch_size pending changes into notifications.
+
+    The ticket holders of all the changed flights are resolved with one
+    query and the notifications written with bulk_create, so a schedule
+    change touching hundreds of flights is one pass. Changes are claimed
+    with SKIP LOCKED, so several workers can run at once. Returns the
+    number of changes processed.
+    """
+    pending = FlightChange.objects.filter(processed_at__isnull=True)
+    with transaction.atomic():
+        changes = list(
+            pending.select_for_update(skip_locked=True).only(
+                "id", "flight_id"
+            )[:batch_size]
+        )
+        if not changes:
+            return 0
+        holders = defaultdict(list)
+        for flight_id, user_id in (
+            Ticket.objects.filter(
+                flight_id__in={change.flight_id for change in changes}
+            )
+            .values_list("flight_id", "order__user_id")
+            .order_by()
+            .distinct()
+        ):
+            holders[flight_id].append(user_id)
+        Notification.objects.bulk_create(
+            (
+                Notification(user_id=user_id, change=change)
+                for change in changes
+                for user_id in holders[change.flight_id]
+            ),
+            batch_size=DELIVERY_BATCH_SIZE,
+            ignore_conflicts=True,
+        )
+        FlightChange.objects.filter(
+            id__in=[change.id for change in changes]
+        ).update(processed_at=timezone.now())
+    return len(changes)
+
+
+def format_time(value) -> str:
+    return timezone.localtime(value).strftime("%d-%m-%Y %H:%M")
+
+
+def notification_message(notification) -> dict:
+    change = notification.change
+    return {
+        "notification": notification.id,
+        "to": notification.user.email,
+        "subject": f"Flight {notification.route} has been rescheduled",
+        "body": (
+            f"Your flight #{change.flight_id} {notification.route} now "
+            f"departs at {format_time(change.new_departure_time)} instead "
+            f"of {format_time(change.old_departure_time)} and arrives at "
+            f"{format_time(change.new_arrival_time)}."
+        ),
+    }
+
+
+class BaseNotificationBackend:
+    """Delivers batches of notification messages (see notification_message).
+
+    A backend raising an exception leaves the batch unsent, to be retried
+    by the next delivery run.
+    """
+
+    def send(self, messages):
+        raise NotImplementedError
+
+
+class ConsoleBackend(BaseNotificationBackend):
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+
+    def send(self, messages):
+        for message in messages:
+            self.stream.write(
+                f"To: {message['to']}\nSubject: {message['subject']}\n\n"
+                f"{message['body']}\n{'-' * 79}\n"
+            )
+        self.stream.flush()
+
+
+class FileBackend(BaseNotificationBackend):
+    """Appends messages as JSON lines to NOTIFICATION_FILE_PATH."""
+
+    def __init__(self, path=None):
+        self.path = Path(path or settings.NOTIFICATION_FILE_PATH)
+
+    def send(self, messages):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("a", encoding="utf-8") as file:
+            for message in messages:
+                file.write(json.dumps(message, ensure_ascii=False) + "\n")
+
+
+class EmailBackend(BaseNotificationBackend):
+    """Sends each batch over one connection of Django's EMAIL_BACKEND."""
+
+    def send(self, messages):
+        get_connection().send_messages(
+            [
+                EmailMessage(
+                    message["subject"], message["body"], to=[message["to"]]
+                )
+                for message in messages
+            ]
+        )
+
+
+def get_notification_backend() -> BaseNotificationBackend:
+    return import_string(settings.NOTIFICATION_BACKEND)()
+
+
+def deliver_notifications(batch_size=DELIVERY_BATCH_SIZE, backend=None):
+    """Send up to batch_size unsent notifications in one backend call.
+
+    Returns the number sent. Delivery is at least once: a batch is marked
+    sent only after the backend accepted it.
+    """
+    backend = backend or get_notification_backend()
+    pending = Notification.objects.filter(sent_at__isnull=True)
+    with transaction.atomic():
+        notifications = list(
+            pending.select_for_update(skip_locked=True, of=("self",))
+            .select_related("user", "change")
+            .annotate(route=Route.label_expression("change__flight__route__"))[
+                :batch_size
+            ]
+        )
+        if not notifications:
+            return 0
+        backend.send(
+            [
+                notification_message(notification)
+                for notification in notifications
+            ]
+        )
+        Notification.objects.filter(
+            id__in=[notification.id for notification in notifications]
+        ).update(sent_at=timezone.now())
+    return len(notifications)
@@ -0,0 +1,143 @@
+from .models import Ticket
+
+WINDOW = "window"
+AISLE = "aisle"
+POSITIONS = (WINDOW, AISLE)
+
+
+def window_seats(seats_in_row):
+    return {1, seats_in_row}
+
+
+def aisle_seats(seats_in_row):
+    """Seats next to an aisle: one aisle up to six abreast, two above."""
+    if seats_in_row < 3:
+        return set()
+    if seats_in_row <= 6:
+        side = seats_in_row // 2
+        return {side, side + 1}
+    side = seats_in_row // 3
+    return {side, side + 1, seats_in_row - side, seats_in_row - side + 1}
+
+
+class FreeSeatMap:
+    """Free seats of one flight, one bitmask per row.
+
+    Bit `seat - 1` of rows[row] is set while the seat is free. Built from
+    a single (row, seat) query and then updated in memory, so allocating
+    many requests does not re-read the flight's tickets.
+    """
+
+    def __init__(self, rows, seats_in_row, taken=()):
+        self.seats_in_row = seats_in_row
+        full_row = (1 << seats_in_row) - 1
+        # Index 0 is unused so that rows[row] matches the row number
+        self.rows = [0] + [full_row] * rows
+        self.free = rows * seats_in_row
+        for row, seat in taken:
+            self.take_seat(row, seat)
+
+    @classmethod
+    def for_flight(cls, flight):
+        return cls(
+            flight.airplane.rows,
+            flight.airplane.seats_in_row,
+            Ticket.objects.filter(flight=flight).values_list("row", "seat"),
+        )
+
+    def is_free(self, row, seat) -> bool:
+        return bool(self.rows[row] >> (seat - 1) & 1)
+
+    def take_seat(self, row, seat):
+        if self.is_free(row, seat):
+            self.rows[row] &= ~(1 << (seat - 1))
+            self.free -= 1
+
+    def release(self, row, seat):
+        if not self.is_free(row, seat):
+            self.rows[row] |= 1 << (seat - 1)
+            self.free += 1
+
+    def free_seats(self, row):
+        mask = self.rows[row]
+        return [
+            seat
+            for seat in range(1, self.seats_in_row + 1)
+            if mask >> (seat - 1) & 1
+        ]
+
+    def position_mask(self, position) -> int:
+        """Bitmask of the seats matching a WINDOW or AISLE preference."""
+        seats = ()
+        if position == WINDOW:
+            seats = window_seats(self.seats_in_row)
+        elif position == AISLE:
+            seats = aisle_seats(self.seats_in_row)
+        mask = 0
+        for seat in seats:
+            mask |= 1 << (seat - 1)
+        return mask
+
+    def best_block(self, count, position=None, first_row=1, last_row=None):
+        """(row, first_seat) of the best block of `count` adjacent seats.
+
+        Blocks with a seat in the preferred position win, then rows nearer
+        the front. Every start seat of every row is tried once, with one
+        mask comparison each: O(rows * seats).
+        """
+        if count > self.seats_in_row:
+            return None
+        last_row = min(last_row or len(self.rows) - 1, len(self.rows) - 1)
+        block = (1 << count) - 1
+        wanted = self.position_mask(position)
+        fallback = None
+        for row in range(max(first_row, 1), last_row + 1):
+            mask = self.rows[row]
+            if mask.bit_count() < count:
+                continue
+            for shift in range(self.seats_in_row - count + 1):
+                placed = block << shift
+                if mask & placed != placed:
+                    continue
+                if not wanted or placed & wanted:
+                    return row, shift + 1
+                if fallback is None:
+                    fallback = (row, shift + 1)
+        return fallback
+
+    def pick(
+        self, count, together=True, position=None, first_row=1, last_row=None
+    ):
+        """Take `count` seats matching the preferences; None if impossible.
+
+        With together, the seats form one block in a row. Otherwise seats
+        in the preferred position come first, then the front rows.
+        """
+        if count > self.free:
+            return None
+        if together:
+            found = self.best_block(count, position, first_row, last_row)
+            if found is None:
+                return None
+            row, first_seat = found
+            seats = [
+                (row, seat) for seat in range(first_seat, first_seat + count)
+            ]
+        else:
+            last_row = min(last_row or len(self.rows) - 1, len(self.rows) - 1)
+            wanted = self.position_mask(position)
+            candidates = sorted(
+                (not wanted >> (seat - 1) & 1, row, seat)
+                for row in range(max(first_row, 1), last_row + 1)
+                for seat in self.free_seats(row)
+            )
+            if len(candidates) < count:
+                return None
+            seats = [(row, seat) for _, row, seat in candidates[:count]]
+        for row, seat in seats:
+            self.take_seat(row, seat)
+        return seats
+
+    def take(self, count):
+        """Take `count` seats, side by side when possible; None if full."""
+        return self.pick(count) or self.pick(count, together=False)
@@ -1,25 +1,44 @@
-from django.db import transaction
+from django.db import IntegrityError, transaction
+from django.db.models import Prefetch, prefetch_related_objects
 from django.utils import timezone
 from rest_framework import serializers
 
+from .analytics import schedule_flight_load_refresh
+from .fares import (
+    lowest_fare,
+    price_tables,
+    schedule_fare_invalidation,
+    seat_price,
+)
+from .fieldsets import SparseFieldsetsSerializerMixin
+from .seating import AISLE, WINDOW, FreeSeatMap
 from .models import (
     Airport,
     Route,
     AirplaneType,
     Airplane,
+    ArchivedOrder,
+    ArchivedTicket,
+    BookingJob,
     Crew,
     Flight,
     Order,
     Ticket,
+    WaitlistEntry,
 )
 
 
-class RouteSerializer(serializers.ModelSerializer):
+class RouteSerializer(
+    SparseFieldsetsSerializerMixin, serializers.ModelSerializer
+):
     def to_representation(self, instance):
         representation = super().to_representation(instance)
-        representation["source"] = instance.source.name
-        representation["destination"] = instance.destination.name
-        representation["distance"] = f"{instance.distance} km."
+        if "source" in representation:
+            representation["source"] = instance.source.name
+        if "destination" in representation:
+            representation["destination"] = instance.destination.name
+        if "distance" in representation:
+            representation["distance"] = f"{instance.distance} km."
         return representation
 
     class Meta:
@@ -36,10 +55,19 @@ class RouteSourceDestinationSerializer(serializers.ModelSerializer):
         fields = ("id", "source", "destination", "distance")
 
 
-class AirportSerializer(serializers.ModelSerializer):
+class AirportSerializer(
+    SparseFieldsetsSerializerMixin, serializers.ModelSerializer
+):
     class Meta:
         model = Airport
-        fields = ("id", "name", "closest_big_city", "country")
+        fields = (
+            "id",
+            "name",
+            "closest_big_city",
+            "country",
+            "latitude",
+            "longitude",
+        )
 
 
 class AirportListSerializer(AirportSerializer):
@@ -65,20 +93,25 @@ class AirportDetailSerializer(AirportSerializer):
         ]
 
 
-class AirplaneTypeSerializer(serializers.ModelSerializer):
+class AirplaneTypeSerializer(
+    SparseFieldsetsSerializerMixin, serializers.ModelSerializer
+):
     class Meta:
         model = AirplaneType
         fields = ("id", "name")
 
 
-class AirplaneSerializer(serializers.ModelSerializer):
+class AirplaneSerializer(
+    SparseFieldsetsSerializerMixin, serializers.ModelSerializer
+):
     airplane_type = serializers.PrimaryKeyRelatedField(
         queryset=AirplaneType.objects.all()
     )
 
     def to_representation(self, instance):
         representation = super().to_representation(instance)
-        representation["airplane_type"] = instance.airplane_type.name
+        if "airplane_type" in representation:
+            representation["airplane_type"] = instance.airplane_type.name
         return representation
 
     class Meta:
@@ -93,13 +126,17 @@ class AirplaneSerializer(serializers.ModelSerializer):
         )
 
 
-class CrewSerializer(serializers.ModelSerializer):
+class CrewSerializer(
+    SparseFieldsetsSerializerMixin, serializers.ModelSerializer
+):
     class Meta:
         model = Crew
         fields = ("id", "first_name", "last_name")
 
 
-class FlightSerializer(serializers.ModelSerializer):
+class FlightSerializer(
+    SparseFieldsetsSerializerMixin, serializers.ModelSerializer
+):
     class Meta:
         model = Flight
         fields = (
@@ -112,10 +149,33 @@ class FlightSerializer(serializers.ModelSerializer):
         )
 
 
-class FlightListSerializer(serializers.ModelSerializer):
+class FlightFareListSerializer(serializers.ListSerializer):
+    """Load the price tables of a whole page of flights at once."""
+
+    def to_representation(self, data):
+        flights = list(data.all() if hasattr(data, "all") else data)
+        if "lowest_fare" in self.child.fields:
+            self.child.price_tables = price_tables(
+                flight.id for flight in flights
+            )
+        return super().to_representation(flights)
+
+
+class FlightListSerializer(
+    SparseFieldsetsSerializerMixin, serializers.ModelSerializer
+):
     route = serializers.StringRelatedField()
     airplane = serializers.StringRelatedField()
     tickets_available = serializers.IntegerField(read_only=True)
+    lowest_fare = serializers.SerializerMethodField()
+    price_tables = None
+
+    def get_lowest_fare(self, obj) -> str:
+        tables = self.price_tables
+        if tables is None or obj.id not in tables:
+            tables = price_tables([obj.id])
+        return lowest_fare(tables[obj.id])
+
     crew = serializers.PrimaryKeyRelatedField(
         queryset=Crew.objects.all(), many=True, required=False
     )
@@ -123,17 +183,22 @@ class FlightListSerializer(serializers.ModelSerializer):
     def to_representation(self, instance):
         representation = super().to_representation(instance)
 
-        crew_representation = [crew.full_name for crew in instance.crew.all()]
-        representation["crew"] = crew_representation
-
-        departure_time_representation = timezone.localtime(
-            instance.departure_time
-        ).strftime("%d-%m-%Y %H:%M")
-        arrival_time_representation = timezone.localtime(
-            instance.arrival_time
-        ).strftime("%d-%m-%Y %H:%M")
-        representation["departure_time"] = departure_time_representation
-        representation["arrival_time"] = arrival_time_representation
+        if self.includes("crew"):
+            crew_representation = [
+                crew.full_name for crew in instance.crew.all()
+            ]
+            representation["crew"] = crew_representation
+
+        if "departure_time" in representation:
+            departure_time_representation = timezone.localtime(
+                instance.departure_time
+            ).strftime("%d-%m-%Y %H:%M")
+            representation["departure_time"] = departure_time_representation
+        if "arrival_time" in representation:
+            arrival_time_representation = timezone.localtime(
+                instance.arrival_time
+            ).strftime("%d-%m-%Y %H:%M")
+            representation["arrival_time"] = arrival_time_representation
 
         return representation
 
@@ -146,8 +211,10 @@ class FlightListSerializer(serializers.ModelSerializer):
             "departure_time",
             "arrival_time",
             "tickets_available",
+            "lowest_fare",
             "crew",
         )
+        list_serializer_class = FlightFareListSerializer
 
 
 class FlightDetailSerializer(FlightListSerializer):
@@ -165,6 +232,7 @@ class FlightDetailSerializer(FlightListSerializer):
             "arrival_time",
             "taken_seats",
         )
+        expandable_fields = ("airplane",)
 
     def get_taken_seats(self, obj) -> list:
         return [
@@ -173,7 +241,9 @@ class FlightDetailSerializer(FlightListSerializer):
         ]
 
 
-class FlightCreateSerializer(serializers.ModelSerializer):
+class FlightCreateSerializer(
+    SparseFieldsetsSerializerMixin, serializers.ModelSerializer
+):
     airplane = serializers.PrimaryKeyRelatedField(
         queryset=Airplane.objects.all()
     )
@@ -218,30 +288,339 @@ class TicketSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Ticket
-        fields = ("id", "row", "seat", "flight", "route")
+        fields = ("id", "row", "seat", "flight", "route", "price")
+        read_only_fields = ("price",)
+
+
+def format_price(price):
+    """Render a Decimal amount like DRF's DecimalField(decimal_places=2)."""
+    return None if price is None else f"{price:.2f}"
+
+
+def order_total(prices):
+    """Sum of the priced tickets; None when no ticket carries a price."""
+    prices = [price for price in prices if price is not None]
+    return format_price(sum(prices)) if prices else None
+
+
+class OrderListSerializer(serializers.ListSerializer):
+    """Render a page of orders with all their tickets in one joined query.
+
+    Produces the same JSON as OrderSerializer, but takes route labels from
+    SQL instead of walking ticket -> flight -> route -> airports in Python.
+    """
+
+    ticket_model = Ticket
+
+    def to_representation(self, data):
+        orders = list(data.all() if hasattr(data, "all") else data)
+        fields = self.child.fields
+        tickets_by_order = {order.id: [] for order in orders}
+        prices_by_order = {order.id: [] for order in orders}
+        if "tickets" in fields or "total" in fields:
+            tickets = (
+                self.ticket_model.objects.filter(order_id__in=tickets_by_order)
+                .annotate(route=Route.label_expression("flight__route__"))
+                .values_list("order_id", "id", "row", "seat", "route", "price")
+            )
+            for order_id, ticket_id, row, seat, route, price in tickets:
+                tickets_by_order[order_id].append(
+                    {
+                        "id": ticket_id,
+                        "row": row,
+                        "seat": seat,
+                        "route": route,
+                        "price": format_price(price),
+                    }
+                )
+                prices_by_order[order_id].append(price)
+
+        tz = timezone.get_current_timezone()
+        representation = []
+        for order in orders:
+            item = {
+                "id": order.id,
+                "created_at": OrderSerializer.format_created_at(
+                    order.created_at, tz
+                ),
+                "tickets": tickets_by_order[order.id],
+                "total": order_total(prices_by_order[order.id]),
+            }
+            representation.append(
+                {name: item[name] for name in fields if name in item}
+            )
+        return representation
+
+
+class SeatRequestSerializer(serializers.Serializer):
+    """Seats for the server to pick instead of exact rows and seats."""
 
+    ANY = "any"
 
-class OrderSerializer(serializers.ModelSerializer):
-    tickets = TicketSerializer(many=True, allow_empty=False)
+    flight = serializers.PrimaryKeyRelatedField(
+        queryset=Flight.objects.select_related("airplane")
+    )
+    seats = serializers.IntegerField(min_value=1)
+    together = serializers.BooleanField(default=True)
+    position = serializers.ChoiceField(
+        choices=(ANY, WINDOW, AISLE), default=ANY
+    )
+    first_row = serializers.IntegerField(min_value=1, required=False)
+    last_row = serializers.IntegerField(min_value=1, required=False)
+
+    def validate(self, attrs):
+        flight = attrs["flight"]
+        airplane = flight.airplane
+        if flight.departure_time <= timezone.now():
+            raise serializers.ValidationError(
+                {"flight": "This flight has already departed."}
+            )
+        limit = (
+            airplane.seats_in_row
+            if attrs["together"]
+            else airplane.rows * airplane.seats_in_row
+        )
+        if attrs["seats"] > limit:
+            raise serializers.ValidationError(
+                {"seats": f"Seats must be in range (1, {limit})."}
+            )
+        first_row = attrs.setdefault("first_row", 1)
+        last_row = attrs.setdefault("last_row", airplane.rows)
+        if not first_row <= last_row <= airplane.rows:
+            raise serializers.ValidationError(
+                {
+                    "last_row": "Rows must be in range "
+                    f"(1, {airplane.rows}), first_row before last_row."
+                }
+            )
+        return attrs
+
+
+class OrderSerializer(
+    SparseFieldsetsSerializerMixin, serializers.ModelSerializer
+):
+    MAX_RETRIES = 3
+
+    tickets = TicketSerializer(many=True, allow_empty=False, required=False)
+    auto_assign = SeatRequestSerializer(write_only=True, required=False)
+    total = serializers.SerializerMethodField()
 
     class Meta:
         model = Order
-        fields = ("id", "created_at", "tickets")
+        fields = ("id", "created_at", "tickets", "auto_assign", "total")
+        list_serializer_class = OrderListSerializer
+
+    def validate(self, attrs):
+        if ("tickets" in attrs) == ("auto_assign" in attrs):
+            raise serializers.ValidationError(
+                "Provide either tickets or auto_assign."
+            )
+        seats = [
+            (ticket["flight"].id, ticket["row"], ticket["seat"])
+            for ticket in attrs.get("tickets", [])
+        ]
+        if len(set(seats)) != len(seats):
+            raise serializers.ValidationError(
+                {"tickets": "The same seat is listed more than once."}
+            )
+        return attrs
+
+    def get_total(self, obj) -> str:
+        return order_total(ticket.price for ticket in obj.tickets.all())
+
+    @staticmethod
+    def format_created_at(created_at, tz=None) -> str:
+        return timezone.localtime(created_at, tz).strftime("%d-%m-%Y %H:%M")
+
+    @classmethod
+    def assign_seats(cls, order, request):
+        """Pick and book the requested seats on a locked flight.
+
+        The flight row is locked, so auto-assigning orders for one flight
+        run one at a time; its free seats are read once into a FreeSeatMap
+        and the best block is picked in memory. A collision with an order
+        that chose its seats by hand is retried on a fresh seat map.
+        """
+        flight = (
+            Flight.objects.select_for_update(of=("self",))
+            .select_related("airplane")
+            .get(id=request["flight"].id)
+        )
+        table = price_tables([flight.id])[flight.id]
+        for attempt in range(cls.MAX_RETRIES + 1):
+            picked = FreeSeatMap.for_flight(flight).pick(
+                request["seats"],
+                together=request["together"],
+                position=request["position"],
+                first_row=request["first_row"],
+                last_row=request["last_row"],
+            )
+            if picked is None:
+                raise serializers.ValidationError(
+                    {"auto_assign": "Not enough free seats match the request."}
+                )
+            try:
+                with transaction.atomic():
+                    return Ticket.objects.bulk_create(
+                        Ticket(
+                            flight=flight,
+                            order=order,
+                            row=row,
+                            seat=seat,
+                            price=seat_price(table, row),
+                        )
+                        for row, seat in picked
+                    )
+            except IntegrityError:
+                if attempt == cls.MAX_RETRIES:
+                    raise
 
     def create(self, validated_data):
         with transaction.atomic():
+            if "auto_assign" in validated_data:
+                seat_request = validated_data.pop("auto_assign")
+                order = Order.objects.create(**validated_data)
+                self.assign_seats(order, seat_request)
+                # The response lists the picked seats with their routes
+                prefetch_related_objects(
+                    [order],
+                    Prefetch(
+                        "tickets",
+                        queryset=Ticket.objects.select_related(
+                            "flight__route__source",
+                            "flight__route__destination",
+                        ),
+                    ),
+                )
+                # bulk_create skips the ticket signals
+                schedule_flight_load_refresh(seat_request["flight"].id)
+                schedule_fare_invalidation([seat_request["flight"].id])
+                return order
             tickets_data = validated_data.pop("tickets")
             order = Order.objects.create(**validated_data)
+            # Tickets are charged the fare quoted before this sale
+            tables = price_tables(
+                {ticket_data["flight"].id for ticket_data in tickets_data}
+            )
             for ticket_data in tickets_data:
-                Ticket.objects.create(order=order, **ticket_data)
+                Ticket.objects.create(
+                    order=order,
+                    price=seat_price(
+                        tables[ticket_data["flight"].id], ticket_data["row"]
+                    ),
+                    **ticket_data,
+                )
             return order
 
     def to_representation(self, instance):
         representation = super().to_representation(instance)
+        if "created_at" in representation:
+            representation["created_at"] = self.format_created_at(
+                instance.created_at
+            )
+        return representation
+
+
+class ArchivedTicketSerializer(serializers.ModelSerializer):
+    route = serializers.SerializerMethodField()
+
+    def get_route(self, obj):
+        return str(obj.flight.route.route)
+
+    class Meta:
+        model = ArchivedTicket
+        fields = ("id", "row", "seat", "route", "price")
 
-        created_at_representation = timezone.localtime(
-            instance.created_at
-        ).strftime("%d-%m-%Y %H:%M")
-        representation["created_at"] = created_at_representation
 
+class ArchivedOrderListSerializer(OrderListSerializer):
+    ticket_model = ArchivedTicket
+
+
+class ArchivedOrderSerializer(
+    SparseFieldsetsSerializerMixin, serializers.ModelSerializer
+):
+    tickets = ArchivedTicketSerializer(many=True, read_only=True)
+    total = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ArchivedOrder
+        fields = ("id", "created_at", "tickets", "total")
+        list_serializer_class = ArchivedOrderListSerializer
+
+    def get_total(self, obj) -> str:
+        return order_total(ticket.price for ticket in obj.tickets.all())
+
+    def to_representation(self, instance):
+        representation = super().to_representation(instance)
+        if "created_at" in representation:
+            representation["created_at"] = OrderSerializer.format_created_at(
+                instance.created_at
+            )
         return representation
+
+
+class BookingJobSerializer(
+    SparseFieldsetsSerializerMixin, serializers.ModelSerializer
+):
+    class Meta:
+        model = BookingJob
+        fields = (
+            "id",
+            "status",
+            "order",
+            "tickets",
+            "errors",
+            "created_at",
+            "processed_at",
+        )
+        read_only_fields = fields
+
+
+class WaitlistEntrySerializer(
+    SparseFieldsetsSerializerMixin, serializers.ModelSerializer
+):
+    flight = serializers.PrimaryKeyRelatedField(
+        queryset=Flight.objects.select_related("airplane")
+    )
+
+    class Meta:
+        model = WaitlistEntry
+        fields = (
+            "id",
+            "flight",
+            "seats",
+            "status",
+            "priority",
+            "order",
+            "created_at",
+            "allocated_at",
+        )
+        read_only_fields = (
+            "status",
+            "priority",
+            "order",
+            "created_at",
+            "allocated_at",
+        )
+
+    def validate(self, attrs):
+        flight = attrs["flight"]
+        if flight.departure_time <= timezone.now():
+            raise serializers.ValidationError(
+                {"flight": "This flight has already departed."}
+            )
+        if not 1 <= attrs.get("seats", 1) <= flight.airplane.seats_in_row:
+            raise serializers.ValidationError(
+                {
+                    "seats": "Seats must be in range "
+                    f"(1, {flight.airplane.seats_in_row})."
+                }
+            )
+        user = self.context["request"].user
+        if WaitlistEntry.objects.filter(
+            user=user, flight=flight, status=WaitlistEntry.Status.WAITING
+        ).exists():
+            raise serializers.ValidationError(
+                {"flight": "You are already on this flight's waitlist."}
+            )
+        return attrs
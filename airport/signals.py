@@ -0,0 +1,102 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .analytics import (
+    schedule_airplane_load_refresh,
+    schedule_flight_load_refresh,
+)
+from .fares import invalidate_fares, schedule_fare_invalidation
+from .geo import invalidate_airport_index
+from .models import (
+    Airplane,
+    Airport,
+    Cabin,
+    FareBand,
+    Flight,
+    Order,
+    Route,
+    Ticket,
+    WaitlistEntry,
+)
+from .notifications import record_flight_changes
+from .trips import (
+    schedule_flight_trips_invalidation,
+    schedule_order_trips_invalidation,
+    schedule_trips_invalidation,
+)
+from .waitlist import schedule_waitlist_allocation
+
+
+@receiver(post_save, sender=Airport)
+@receiver(post_delete, sender=Airport)
+def airport_changed(sender, instance, **kwargs):
+    transaction.on_commit(invalidate_airport_index)
+
+
+@receiver(post_save, sender=Airplane)
+def airplane_saved(sender, instance, created, **kwargs):
+    # Rows, seats or type may have changed for all of its flights
+    if not created:
+        schedule_airplane_load_refresh(instance.id)
+
+
+@receiver(post_save, sender=Route)
+@receiver(post_save, sender=Cabin)
+@receiver(post_delete, sender=Cabin)
+@receiver(post_save, sender=FareBand)
+@receiver(post_delete, sender=FareBand)
+def fare_inputs_changed(sender, instance, **kwargs):
+    transaction.on_commit(invalidate_fares)
+
+
+@receiver(post_save, sender=Flight)
+def flight_saved(sender, instance, created, **kwargs):
+    if not created:
+        record_flight_changes([instance])
+    schedule_flight_load_refresh(instance.id)
+    schedule_fare_invalidation([instance.id])
+    schedule_flight_trips_invalidation([instance.id])
+
+
+@receiver(pre_delete, sender=Flight)
+def flight_deleted(sender, instance, **kwargs):
+    # The tickets are gone by the time the transaction commits
+    schedule_trips_invalidation(
+        Order.objects.filter(tickets__flight=instance)
+        .order_by()
+        .values_list("user_id", flat=True)
+        .distinct()
+    )
+
+
+@receiver(post_save, sender=Order)
+@receiver(post_delete, sender=Order)
+def order_changed(sender, instance, **kwargs):
+    schedule_trips_invalidation([instance.user_id])
+
+
+@receiver(post_save, sender=Ticket)
+@receiver(post_delete, sender=Ticket)
+def ticket_changed(sender, instance, **kwargs):
+    schedule_flight_load_refresh(instance.flight_id)
+    # A sale changes the load factor, so the flight's prices move
+    schedule_fare_invalidation([instance.flight_id])
+    if Ticket.order.is_cached(instance):
+        schedule_trips_invalidation([instance.order.user_id])
+    else:
+        # Cascades from Order and Flight deletes are covered by their
+        # own receivers, as the order may be gone after the commit
+        schedule_order_trips_invalidation([instance.order_id])
+
+
+@receiver(post_delete, sender=Ticket)
+def seat_released(sender, instance, **kwargs):
+    schedule_waitlist_allocation(instance.flight_id)
+
+
+@receiver(post_save, sender=WaitlistEntry)
+def waitlist_joined(sender, instance, created, **kwargs):
+    # Seats may have been released since the user saw the flight sold out
+    if created:
+        schedule_waitlist_allocation(instance.flight_id)
@@ -0,0 +1,57 @@
+from itertools import chain, islice
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+
+def chunked(rows, size):
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class StreamingListMixin:
+    """Stream unpaginated list responses as a chunked JSON array.
+
+    Rows are read with QuerySet.iterator() and serialized
+    STREAMING_CHUNK_SIZE at a time, so memory stays flat however many
+    objects match. Lists that fit in one chunk, paginated requests and
+    non-JSON renderers such as the browsable API get a regular Response.
+    """
+
+    def list(self, request, *args, **kwargs):
+        renderer = request.accepted_renderer
+        if not isinstance(renderer, JSONRenderer):
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+
+        chunk_size = settings.STREAMING_CHUNK_SIZE
+        rows = queryset.iterator(chunk_size=chunk_size)
+        first = list(islice(rows, chunk_size))
+        if len(first) < chunk_size:
+            return Response(self.get_serializer(first, many=True).data)
+
+        chunks = chain([first], chunked(rows, chunk_size))
+        return StreamingHttpResponse(
+            self.stream_json_array(chunks, renderer),
+            content_type=renderer.media_type,
+        )
+
+    def stream_json_array(self, chunks, renderer):
+        yield b"["
+        separator = b""
+        for chunk in chunks:
+            data = renderer.render(self.get_serializer(chunk, many=True).data)
+            # Drop the brackets around each rendered chunk
+            yield separator + data[1:-1]
+            separator = b","
+        yield b"]"
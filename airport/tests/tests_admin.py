@@ -0,0 +1,80 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from airport.admin import EstimatedCountPaginator
+from airport.models import Flight
+from airport.tests.tests_orders import OrderTestMixin
+
+
+class AdminQueryTests(OrderTestMixin, TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        admin_user = get_user_model().objects.create_superuser(
+            email="admin@test.com", password="testpass"
+        )
+        self.client.force_login(admin_user)
+
+    def count_queries(self, url, **params):
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(url, params)
+        self.assertEqual(res.status_code, 200)
+        return len(queries)
+
+    def test_flight_changelist_queries_do_not_grow_with_rows(self):
+        url = reverse("admin:airport_flight_changelist")
+        self.count_queries(url)  # the first request fills per-process caches
+        before = self.count_queries(url)
+
+        for days in range(8, 15):
+            self.create_flight(days=days)
+
+        self.assertEqual(self.count_queries(url), before)
+
+    def test_order_change_page_queries_do_not_grow_with_tickets(self):
+        small = self.create_order((1, 1))
+        large = self.create_order(
+            *[(2, seat) for seat in range(1, 6)],
+        )
+        for ticket, days in zip(large.tickets.all(), range(8, 13)):
+            ticket.flight = self.create_flight(days=days)
+            ticket.save()
+
+        small_url = reverse("admin:airport_order_change", args=[small.id])
+        self.count_queries(
+            small_url
+        )  # the first request fills per-process caches
+        small_queries = self.count_queries(small_url)
+
+        self.assertEqual(
+            self.count_queries(
+                reverse("admin:airport_order_change", args=[large.id])
+            ),
+            small_queries,
+        )
+
+    def test_order_search_by_email(self):
+        self.create_order((1, 1))
+
+        res = self.client.get(
+            reverse("admin:airport_order_changelist"),
+            {"q": "traveller@test.com"},
+        )
+
+        self.assertContains(res, "traveller@test.com")
+
+
+class EstimatedCountPaginatorTests(OrderTestMixin, TestCase):
+    @mock.patch("airport.admin.COUNT_LIMIT", 3)
+    def test_count_is_capped(self):
+        for days in range(8, 12):
+            self.create_flight(days=days)
+
+        paginator = EstimatedCountPaginator(Flight.objects.order_by("id"), 2)
+
+        self.assertEqual(paginator.count, 3)
+        self.assertEqual(paginator.num_pages, 2)
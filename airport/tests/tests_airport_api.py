@@ -334,6 +334,30 @@ class AuthenticatedAirportTests(TestCase):
 
         self.assertEqual(serializer.data["capacity"], expected_capacity)
 
+    def test_flight_filter_by_source_and_date(self):
+        flight = sample_flight()
+        other_route = route_create(
+            airport_create("Airport3", "DDD", "City3"),
+            flight.route.destination,
+            300,
+        )
+        sample_flight(route=other_route)
+
+        res = self.client.get(
+            FLIGHT_URL,
+            {
+                "source": flight.route.source_id,
+                "date": flight.departure_time.date(),
+            },
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([item["id"] for item in res.data], [flight.id])
+
+    def test_flight_filter_invalid(self):
+        res = self.client.get(FLIGHT_URL, {"source": "abc"})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
     def test_flight_create_forbidden(self):
         payload = {
             "route": sample_route().id,
@@ -0,0 +1,115 @@
+from datetime import datetime, timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.analytics import refresh_flight_loads
+from airport.models import (
+    Airplane,
+    AirplaneType,
+    Airport,
+    Flight,
+    FlightLoad,
+    Order,
+    Route,
+    Ticket,
+)
+
+ANALYTICS_URL = reverse("airport:analytics-flight-load")
+
+
+class FlightLoadAnalyticsTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.admin = get_user_model().objects.create_user(
+            email="admin@test.com", password="testpass", is_staff=True
+        )
+        self.client.force_authenticate(self.admin)
+
+        kyiv = Airport.objects.create(name="Boryspil", closest_big_city="Kyiv")
+        lviv = Airport.objects.create(name="Danylo", closest_big_city="Lviv")
+        self.route = Route.objects.create(
+            source=kyiv, destination=lviv, distance=470
+        )
+        airplane_type = AirplaneType.objects.create(name="Boeing")
+        self.airplane = Airplane.objects.create(
+            name="B737", rows=10, seats_in_row=4, airplane_type=airplane_type
+        )
+        departure = timezone.make_aware(datetime(2023, 11, 1, 10, 0))
+        self.flight = Flight.objects.create(
+            route=self.route,
+            airplane=self.airplane,
+            departure_time=departure,
+            arrival_time=departure + timedelta(hours=1),
+        )
+        order = Order.objects.create(user=self.admin)
+        for seat in range(1, 5):
+            Ticket.objects.create(
+                row=1, seat=seat, flight=self.flight, order=order
+            )
+
+    def test_refresh_builds_summary_rows(self):
+        refresh_flight_loads()
+
+        load = FlightLoad.objects.get(flight=self.flight)
+        self.assertEqual(load.capacity, 40)
+        self.assertEqual(load.tickets_sold, 4)
+        self.assertEqual(load.load_factor, 0.1)
+
+    def test_report_reads_summary_table_only(self):
+        refresh_flight_loads()
+
+        with self.assertNumQueries(1):
+            res = self.client.get(ANALYTICS_URL, {"group_by": "route"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data[0]["route"], self.route.id)
+        self.assertEqual(res.data[0]["tickets_sold"], 4)
+        self.assertEqual(res.data[0]["load_factor"], 0.1)
+
+    def test_invalid_group_by(self):
+        res = self.client.get(ANALYTICS_URL, {"group_by": "crew"})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_load_follows_bookings_on_commit(self):
+        refresh_flight_loads()
+        order = Order.objects.create(user=self.admin)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Ticket.objects.create(
+                row=2, seat=1, flight=self.flight, order=order
+            )
+            Ticket.objects.create(
+                row=2, seat=2, flight=self.flight, order=order
+            )
+        load = FlightLoad.objects.get(flight=self.flight)
+        self.assertEqual(load.tickets_sold, 6)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            order.delete()
+        load.refresh_from_db()
+        self.assertEqual(load.tickets_sold, 4)
+
+    def test_airplane_change_refreshes_its_flights(self):
+        refresh_flight_loads()
+
+        self.airplane.rows = 20
+        with self.captureOnCommitCallbacks(execute=True):
+            self.airplane.save()
+
+        load = FlightLoad.objects.get(flight=self.flight)
+        self.assertEqual(load.capacity, 80)
+        self.assertEqual(load.load_factor, 0.05)
+
+    def test_analytics_staff_only(self):
+        user = get_user_model().objects.create_user(
+            email="user@test.com", password="testpass"
+        )
+        self.client.force_authenticate(user)
+
+        res = self.client.get(ANALYTICS_URL)
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,139 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from airport import fares, waitlist
+
+from airport.analytics import refresh_flight_loads
+from airport.archive import archive_batch, archive_cutoff
+from airport.models import (
+    ArchivedOrder,
+    ArchivedTicket,
+    BookingJob,
+    FlightLoad,
+    Order,
+    Ticket,
+)
+from airport.serializers import OrderSerializer
+from airport.tests.tests_orders import ORDER_URL, OrderTestMixin
+
+ARCHIVED_ORDER_URL = reverse("airport:order-archived")
+
+
+class ArchiveTests(OrderTestMixin, TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.past_flight = self.create_flight(days=-200)
+
+    def create_old_order(self, *seats, flight=None):
+        order = self.create_order(*seats, flight=flight or self.past_flight)
+        Order.objects.filter(id=order.id).update(
+            created_at=timezone.now() - timedelta(days=210)
+        )
+        order.refresh_from_db()
+        return order
+
+    def test_only_fully_departed_orders_move(self):
+        departed = self.create_old_order((1, 1), (1, 2))
+        mixed = self.create_old_order((2, 1))
+        Ticket.objects.create(row=2, seat=2, flight=self.flight, order=mixed)
+        recent = self.create_order((3, 1))
+
+        moved = archive_batch(archive_cutoff(180))
+
+        self.assertEqual(moved, (1, 2))
+        self.assertEqual(
+            set(Order.objects.values_list("id", flat=True)),
+            {mixed.id, recent.id},
+        )
+        archived = ArchivedOrder.objects.get()
+        self.assertEqual(archived.id, departed.id)
+        self.assertEqual(archived.created_at, departed.created_at)
+        self.assertEqual(
+            list(archived.tickets.values_list("row", "seat")),
+            [(1, 1), (1, 2)],
+        )
+
+    def test_archiving_skips_ticket_signals(self):
+        order = self.create_old_order((1, 1), (1, 2))
+        job = BookingJob.objects.create(
+            user=self.user, flight=self.past_flight, tickets=[], order=order
+        )
+
+        with mock.patch.object(
+            waitlist, "allocate_waitlist"
+        ) as allocate, mock.patch.object(
+            fares, "invalidate_flight_fares"
+        ) as invalidate:
+            with self.captureOnCommitCallbacks(execute=True):
+                archive_batch(archive_cutoff(180))
+
+        allocate.assert_not_called()
+        invalidate.assert_not_called()
+        self.assertFalse(Ticket.objects.exists())
+        job.refresh_from_db()
+        self.assertIsNone(job.order)
+
+    def test_command_archives_in_batches(self):
+        for row in range(1, 6):
+            self.create_old_order((row, 1))
+        out = StringIO()
+
+        call_command("archive_orders", batch_size=2, max_batches=2, stdout=out)
+
+        self.assertEqual(Order.objects.count(), 1)
+        self.assertEqual(ArchivedTicket.objects.count(), 4)
+        self.assertIn("Archived 4 orders and 4 tickets", out.getvalue())
+
+        call_command("archive_orders", batch_size=2, stdout=out)
+        self.assertFalse(Order.objects.exists())
+
+    def test_flight_load_keeps_archived_tickets(self):
+        self.create_old_order((1, 1), (1, 2))
+        archive_batch(archive_cutoff(180))
+
+        refresh_flight_loads([self.past_flight.id])
+
+        load = FlightLoad.objects.get(flight=self.past_flight)
+        self.assertEqual(load.tickets_sold, 2)
+
+    def test_archived_history_endpoint(self):
+        order = self.create_old_order((1, 1), (1, 2))
+        expected = OrderSerializer(order).data
+        archive_batch(archive_cutoff(180))
+
+        res = self.client.get(ARCHIVED_ORDER_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json()["results"], [expected])
+        self.assertEqual(self.client.get(ORDER_URL).json()["count"], 0)
+
+    def test_archived_history_is_always_paginated(self):
+        for row in range(1, 6):
+            self.create_old_order((row, 1))
+        archive_batch(archive_cutoff(180))
+
+        res = self.client.get(ARCHIVED_ORDER_URL, {"page_size": "all"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json()["count"], 5)
+        self.assertEqual(len(res.json()["results"]), 3)
+
+    def test_archived_history_is_per_user(self):
+        self.create_old_order((1, 1))
+        archive_batch(archive_cutoff(180))
+        other = get_user_model().objects.create_user(
+            email="other@test.com", password="testpass"
+        )
+        ArchivedOrder.objects.update(user=other)
+
+        res = self.client.get(ARCHIVED_ORDER_URL)
+
+        self.assertEqual(res.json()["count"], 0)
@@ -0,0 +1,161 @@
+import tempfile
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from user import bulk
+from user.bulk import hash_pool, import_users
+
+BULK_URL = reverse("user:bulk_import")
+REGISTER_URL = reverse("user:create")
+
+
+@override_settings(PASSWORD_HASH_ITERATIONS=1000, BULK_IMPORT_HASH_WORKERS=2)
+class BulkUserImportTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.admin = get_user_model().objects.create_superuser(
+            email="admin@test.com", password="testpass"
+        )
+        self.client.force_authenticate(self.admin)
+
+    def test_import_reports_row_errors(self):
+        rows = [
+            {"email": "one@Corp.com", "password": "secret1"},
+            {"email": "not-an-email", "password": "secret1"},
+            {"email": "admin@test.com", "password": "secret1"},
+            {"email": "one@corp.com", "password": "secret2"},
+            {"email": "two@corp.com", "password": "123"},
+            {"email": "three@corp.com", "first_name": "Three"},
+        ]
+
+        res = self.client.post(BULK_URL, {"users": rows}, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["created"], 2)
+        self.assertEqual(
+            [error["row"] for error in res.data["errors"]], [2, 3, 4, 5]
+        )
+        self.assertIn("email", res.data["errors"][0]["errors"])
+        self.assertIn("password", res.data["errors"][3]["errors"])
+        one = get_user_model().objects.get(email="one@corp.com")
+        self.assertTrue(one.check_password("secret1"))
+        three = get_user_model().objects.get(email="three@corp.com")
+        self.assertEqual(three.first_name, "Three")
+        self.assertFalse(three.has_usable_password())
+
+    def test_endpoint_hashes_on_threads_with_row_cap(self):
+        with mock.patch.object(bulk, "hash_pool") as process_pool:
+            res = self.client.post(
+                BULK_URL,
+                {"users": [{"email": "a@corp.com", "password": "secret1"}]},
+                format="json",
+            )
+
+        process_pool.assert_not_called()
+        self.assertEqual(res.data["created"], 1)
+
+        rows = [
+            {"email": f"traveller{number}@corp.com"}
+            for number in range(settings.BULK_USER_IMPORT_MAX_ROWS + 1)
+        ]
+        res = self.client.post(BULK_URL, {"users": rows}, format="json")
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_hash_pool_spawns_workers(self):
+        pool = hash_pool(2)
+        self.addCleanup(pool.shutdown)
+
+        self.assertEqual(pool._mp_context.get_start_method(), "spawn")
+
+    def test_queries_per_batch(self):
+        rows = [
+            {"email": f"traveller{number}@corp.com", "password": "secret1"}
+            for number in range(40)
+        ]
+
+        # Existing-email check, insert and the check of what went in
+        with self.assertNumQueries(3):
+            report = import_users(rows, workers=1)
+
+        self.assertEqual(report, {"created": 40, "errors": []})
+
+    def test_email_taken_during_import(self):
+        rows = [
+            {"email": "one@corp.com", "password": "secret1"},
+            {"email": "two@corp.com", "password": "secret2"},
+        ]
+        existing_emails = bulk.existing_emails
+
+        def register_meanwhile(emails):
+            taken = existing_emails(emails)
+            get_user_model().objects.create_user(
+                email="two@corp.com", password="theirs"
+            )
+            return taken
+
+        with mock.patch.object(
+            bulk, "existing_emails", side_effect=register_meanwhile
+        ):
+            report = import_users(rows, workers=1)
+
+        self.assertEqual(report["created"], 1)
+        self.assertEqual(
+            report["errors"],
+            [bulk.row_error(2, "two@corp.com", bulk.ALREADY_EXISTS_MESSAGE)],
+        )
+        two = get_user_model().objects.get(email="two@corp.com")
+        self.assertTrue(two.check_password("theirs"))
+
+    def test_staff_only(self):
+        self.client.force_authenticate(
+            get_user_model().objects.create_user(
+                email="user@test.com", password="testpass"
+            )
+        )
+
+        res = self.client.post(
+            BULK_URL, {"users": [{"email": "a@corp.com"}]}, format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_command(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = Path(directory.name, "users.csv")
+        path.write_text(
+            "email,password,first_name,last_name\n"
+            "a@corp.com,secret1,Ann,Lee\n"
+            "a@corp.com,secret1,Ann,Lee\n"
+            "b@corp.com,,Bob,\n"
+        )
+        out, err = StringIO(), StringIO()
+
+        call_command("import_users", str(path), stdout=out, stderr=err)
+
+        self.assertIn("Created 2 users, skipped 1 rows.", out.getvalue())
+        self.assertIn("line 3 (a@corp.com)", err.getvalue())
+        self.assertEqual(
+            get_user_model().objects.get(email="a@corp.com").last_name, "Lee"
+        )
+
+    def test_registration(self):
+        self.client.force_authenticate(None)
+
+        res = self.client.post(
+            REGISTER_URL, {"email": "new@Corp.com", "password": "secret1"}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        user = get_user_model().objects.get(email="new@corp.com")
+        self.assertTrue(user.check_password("secret1"))
+        self.assertFalse(user.is_staff or user.is_superuser)
@@ -0,0 +1,39 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from airport.models import Airport, Flight, FlightLoad, Ticket
+
+SEED_OPTIONS = {
+    "airports": 20,
+    "airplanes": 5,
+    "crews": 10,
+    "users": 20,
+    "days": 2,
+    "flights_per_day": 5,
+    "start": None,
+    "stdout": StringIO(),
+}
+
+
+class SeedAirportCommandTests(TestCase):
+    def test_seed_is_deterministic(self):
+        call_command("seed_airport", seed=7, **SEED_OPTIONS)
+        first = list(Ticket.objects.values_list("flight_id", "row", "seat"))
+
+        Airport.objects.all().delete()
+        call_command("seed_airport", seed=7, **SEED_OPTIONS)
+        second = list(Ticket.objects.values_list("flight_id", "row", "seat"))
+
+        self.assertTrue(first)
+        self.assertEqual(
+            [(row, seat) for _, row, seat in first],
+            [(row, seat) for _, row, seat in second],
+        )
+
+    def test_seed_builds_load_summary(self):
+        call_command("seed_airport", **SEED_OPTIONS)
+
+        self.assertEqual(Flight.objects.count(), 10)
+        self.assertEqual(FlightLoad.objects.count(), 10)
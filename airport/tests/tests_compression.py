@@ -0,0 +1,97 @@
+import gzip
+import json
+
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+
+from airport.models import Flight
+from airport.serializers import OrderSerializer
+from airport.tests.tests_orders import ORDER_URL, OrderTestMixin
+from airport_api_service.compression import (
+    GzipCodec,
+    negotiate,
+    parse_accept_encoding,
+)
+
+FLIGHT_URL = reverse("airport:flight-list")
+
+
+class NegotiationTests(SimpleTestCase):
+    def test_parse_quality_values(self):
+        self.assertEqual(
+            parse_accept_encoding("gzip;q=0.5, br, zstd;q=0"),
+            {"gzip": 0.5, "br": 1.0, "zstd": 0.0},
+        )
+
+    def test_negotiate(self):
+        gzip_codec = GzipCodec()
+        codecs = {"gzip": gzip_codec}
+
+        self.assertIs(negotiate("br, gzip;q=0.2", codecs), gzip_codec)
+        self.assertIs(negotiate("*", codecs), gzip_codec)
+        self.assertIsNone(negotiate("gzip;q=0", codecs))
+        self.assertIsNone(negotiate("", codecs))
+
+    def test_gzip_stream_round_trip(self):
+        chunks = [b'{"a": 1}', b"", b'{"b": 2}']
+
+        data = b"".join(GzipCodec().stream(iter(chunks)))
+
+        self.assertEqual(gzip.decompress(data), b"".join(chunks))
+
+
+@override_settings(STREAMING_CHUNK_SIZE=2, COMPRESSION_MIN_SIZE=10)
+class StreamedListTests(OrderTestMixin, TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        for days in range(8, 12):
+            self.create_flight(days=days)
+
+    def test_large_flight_list_streams(self):
+        res = self.client.get(FLIGHT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.streaming)
+        flights = json.loads(b"".join(res.streaming_content))
+        self.assertEqual(
+            sorted(flight["id"] for flight in flights),
+            list(Flight.objects.order_by("id").values_list("id", flat=True)),
+        )
+        self.assertEqual(flights[0]["tickets_available"], 60)
+
+    def test_streamed_list_is_compressed(self):
+        res = self.client.get(FLIGHT_URL, HTTP_ACCEPT_ENCODING="gzip")
+
+        self.assertEqual(res["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", res["Vary"])
+        flights = json.loads(gzip.decompress(b"".join(res.streaming_content)))
+        self.assertEqual(len(flights), 5)
+
+    def test_short_list_is_not_streamed(self):
+        with self.settings(STREAMING_CHUNK_SIZE=10):
+            res = self.client.get(FLIGHT_URL)
+
+        self.assertFalse(res.streaming)
+        self.assertEqual(len(res.data), 5)
+
+    def test_order_history_streams_with_page_size_all(self):
+        orders = [self.create_order((row, 1)) for row in range(1, 4)]
+
+        res = self.client.get(ORDER_URL, {"page_size": "all"})
+
+        self.assertTrue(res.streaming)
+        self.assertEqual(
+            json.loads(b"".join(res.streaming_content)),
+            json.loads(
+                json.dumps(
+                    [OrderSerializer(order).data for order in reversed(orders)]
+                )
+            ),
+        )
+
+    def test_small_response_is_not_compressed(self):
+        with self.settings(COMPRESSION_MIN_SIZE=10_000):
+            res = self.client.get(ORDER_URL, HTTP_ACCEPT_ENCODING="gzip")
+
+        self.assertFalse(res.has_header("Content-Encoding"))
@@ -0,0 +1,198 @@
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+
+from airport import fares
+from airport.fares import (
+    build_price_tables,
+    cabin_layout,
+    lowest_fare,
+    price_tables,
+)
+from airport.models import Cabin, Ticket
+from airport.tests.tests_orders import ORDER_URL, OrderTestMixin
+
+FLIGHT_URL = reverse("airport:flight-list")
+
+
+def fares_url(flight):
+    return reverse("airport:flight-fares", args=[flight.id])
+
+
+class FareEngineTests(OrderTestMixin, TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        cache.clear()
+        # Route is 2100km: the 3000km band, 149.00 base fare
+        Cabin.objects.create(
+            airplane=self.airplane,
+            cabin_class=Cabin.CabinClass.BUSINESS,
+            first_row=1,
+            last_row=2,
+        )
+        self.now = self.flight.departure_time - timedelta(days=30)
+
+    def table(self):
+        return build_price_tables([self.flight.id], now=self.now)[
+            self.flight.id
+        ]
+
+    def test_cabin_layout_fills_gaps_with_economy(self):
+        self.assertEqual(
+            cabin_layout(10, [("first", 1, 1), ("business", 3, 4)]),
+            [
+                ("first", 1, 1),
+                ("economy", 2, 2),
+                ("business", 3, 4),
+                ("economy", 5, 10),
+            ],
+        )
+
+    def test_price_table(self):
+        table = self.table()
+
+        self.assertEqual(table["days_to_departure"], 30)
+        self.assertEqual(
+            table["cabins"],
+            [
+                {
+                    "cabin_class": "business",
+                    "rows": [[1, 2]],
+                    "seats_available": 12,
+                    "price": "447.00",
+                },
+                {
+                    "cabin_class": "economy",
+                    "rows": [[3, 10]],
+                    "seats_available": 48,
+                    "price": "149.00",
+                },
+            ],
+        )
+
+    def test_load_and_days_multipliers(self):
+        self.create_order(*[(row, seat) for row in (1, 2) for seat in (1, 2)])
+        for row in range(3, 9):
+            self.create_order(*[(row, seat) for seat in range(1, 7)])
+
+        table = build_price_tables(
+            [self.flight.id], now=self.flight.departure_time
+        )[self.flight.id]
+
+        # 40 of 60 seats sold, departing today: 1.10 * 1.60
+        self.assertEqual(table["load_factor"], 0.6667)
+        self.assertEqual(table["cabins"][1]["price"], "262.24")
+        self.assertEqual(table["cabins"][1]["seats_available"], 12)
+
+    def test_lowest_fare_skips_sold_out_cabins(self):
+        table = self.table()
+        table["cabins"][1]["seats_available"] = 0
+
+        self.assertEqual(lowest_fare(table), "447.00")
+
+        table["cabins"][0]["seats_available"] = 0
+        self.assertIsNone(lowest_fare(table))
+
+    def test_table_is_cached_until_a_seat_sells(self):
+        first = price_tables([self.flight.id])[self.flight.id]
+        with self.assertNumQueries(0):
+            price_tables([self.flight.id])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_order((5, 1))
+
+        table = price_tables([self.flight.id])[self.flight.id]
+        self.assertEqual(
+            table["cabins"][1]["seats_available"],
+            first["cabins"][1]["seats_available"] - 1,
+        )
+
+    def test_cascade_invalidates_each_flight_once(self):
+        other = self.create_flight(days=9)
+        order = self.create_order(
+            *[(row, seat) for row in range(1, 11) for seat in range(1, 7)]
+        )
+        for seat in range(1, 7):
+            Ticket.objects.create(row=1, seat=seat, flight=other, order=order)
+
+        with mock.patch.object(
+            fares,
+            "invalidate_flight_fares",
+            wraps=fares.invalidate_flight_fares,
+        ) as invalidate:
+            with self.captureOnCommitCallbacks(execute=True):
+                order.delete()
+
+        invalidate.assert_called_once()
+        self.assertLessEqual(
+            {self.flight.id, other.id}, set(invalidate.call_args.args[0])
+        )
+
+    def test_order_charges_quoted_fare(self):
+        quoted = price_tables([self.flight.id])[self.flight.id]
+
+        res = self.client.post(
+            ORDER_URL,
+            {
+                "tickets": [
+                    {"row": 1, "seat": 1, "flight": self.flight.id},
+                    {"row": 5, "seat": 1, "flight": self.flight.id},
+                ]
+            },
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        prices = [ticket["price"] for ticket in res.data["tickets"]]
+        self.assertEqual(
+            prices, [cabin["price"] for cabin in quoted["cabins"]]
+        )
+        self.assertEqual(
+            res.data["total"], str(sum(Decimal(price) for price in prices))
+        )
+        self.assertEqual(Ticket.objects.get(row=1).price, Decimal(prices[0]))
+        listed = self.client.get(ORDER_URL).json()["results"][0]
+        self.assertEqual(listed["total"], res.data["total"])
+
+    def test_flight_list_lowest_fare_in_bulk(self):
+        def list_queries():
+            with CaptureQueriesContext(connection) as queries:
+                res = self.client.get(FLIGHT_URL)
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            return len(queries), res.data
+
+        cache.clear()
+        few, data = list_queries()
+        self.assertEqual(
+            data[0]["lowest_fare"],
+            lowest_fare(price_tables([self.flight.id])[self.flight.id]),
+        )
+        for days in range(10, 16):
+            self.create_flight(days=days)
+        cache.clear()
+
+        self.assertEqual(list_queries()[0], few)
+
+    def test_fares_endpoint(self):
+        res = self.client.get(fares_url(self.flight))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [cabin["cabin_class"] for cabin in res.data["cabins"]],
+            ["business", "economy"],
+        )
+
+    def test_departure_in_the_past_is_priced_as_today(self):
+        table = build_price_tables(
+            [self.flight.id],
+            now=self.flight.departure_time + timedelta(days=3),
+        )[self.flight.id]
+
+        self.assertEqual(table["days_to_departure"], 0)
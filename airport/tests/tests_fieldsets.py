@@ -0,0 +1,98 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.models import (
+    Airplane,
+    AirplaneType,
+    Airport,
+    Crew,
+    Flight,
+    Route,
+)
+
+FLIGHT_URL = reverse("airport:flight-list")
+ROUTE_URL = reverse("airport:route-list")
+
+
+def detail_flight_url(flight):
+    return reverse("airport:flight-detail", args=[flight.id])
+
+
+class SparseFieldsetsTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@test.com", password="testpass"
+        )
+        self.client.force_authenticate(self.user)
+
+        source = Airport.objects.create(
+            name="Boryspil", closest_big_city="Kyiv"
+        )
+        destination = Airport.objects.create(
+            name="Heathrow", closest_big_city="London"
+        )
+        route = Route.objects.create(
+            source=source, destination=destination, distance=2100
+        )
+        airplane_type = AirplaneType.objects.create(name="Airbus")
+        airplane = Airplane.objects.create(
+            name="A320", rows=10, seats_in_row=6, airplane_type=airplane_type
+        )
+        departure = timezone.now() + timedelta(days=1)
+        for _ in range(3):
+            flight = Flight.objects.create(
+                route=route,
+                airplane=airplane,
+                departure_time=departure,
+                arrival_time=departure + timedelta(hours=3),
+            )
+            flight.crew.add(Crew.objects.create(first_name="J", last_name="D"))
+        self.flight = flight
+
+    def test_fields_prunes_flight_list(self):
+        with self.assertNumQueries(1):
+            res = self.client.get(FLIGHT_URL, {"fields": "id,departure_time"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(set(res.data[0]), {"id", "departure_time"})
+
+    def test_full_flight_list_unchanged(self):
+        res = self.client.get(FLIGHT_URL)
+
+        self.assertEqual(
+            set(res.data[0]),
+            {
+                "id",
+                "route",
+                "airplane",
+                "departure_time",
+                "arrival_time",
+                "tickets_available",
+                "lowest_fare",
+                "crew",
+            },
+        )
+        self.assertEqual(res.data[0]["tickets_available"], 60)
+
+    def test_expand_collapses_nested_airplane(self):
+        res = self.client.get(
+            detail_flight_url(self.flight), {"expand": "none"}
+        )
+
+        self.assertEqual(res.data["airplane"], self.flight.airplane_id)
+
+        res = self.client.get(detail_flight_url(self.flight))
+        self.assertEqual(res.data["airplane"]["airplane_type"], "Airbus")
+
+    def test_route_fields_skip_airport_join(self):
+        with self.assertNumQueries(1):
+            res = self.client.get(ROUTE_URL, {"fields": "id,distance"})
+
+        self.assertEqual(res.data[0], {"id": 1, "distance": "2100 km."})
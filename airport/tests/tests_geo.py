@@ -0,0 +1,179 @@
+import math
+import os
+import random
+import statistics
+import time
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.geo import (
+    AirportIndex,
+    great_circle_distances,
+    great_circle_km,
+    unit_vector,
+)
+from airport.models import Airport, Route
+
+NEAREST_URL = reverse("airport:airport-nearest")
+
+# The local median is under 0.1ms; leave room for a loaded CI box
+NEAREST_BUDGET_MS = float(os.environ.get("NEAREST_BUDGET_MS", 1.0))
+
+KYIV = (50.345, 30.894)
+LONDON = (51.47, -0.4543)
+
+
+def random_points(count, rng):
+    return [
+        (
+            number,
+            math.degrees(math.asin(rng.uniform(-0.85, 0.95))),
+            rng.uniform(-180, 180),
+        )
+        for number in range(count)
+    ]
+
+
+class GreatCircleTests(SimpleTestCase):
+    def test_known_distance(self):
+        self.assertEqual(great_circle_km(KYIV, LONDON), 2184)
+
+    def test_vectorized_matches_scalar(self):
+        rng = random.Random(3)
+        points = [point[1:] for point in random_points(200, rng)]
+        sources, destinations = points[:100], points[100:]
+
+        self.assertEqual(
+            great_circle_distances(sources, destinations),
+            [great_circle_km(a, b) for a, b in zip(sources, destinations)],
+        )
+
+
+class AirportIndexTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        rng = random.Random(7)
+        cls.points = random_points(20000, rng)
+        cls.index = AirportIndex(cls.points)
+        cls.queries = [point[1:] for point in random_points(300, rng)]
+
+    def brute_force(self, latitude, longitude, limit):
+        query = unit_vector(latitude, longitude)
+        return [
+            airport_id
+            for _, airport_id in sorted(
+                (math.dist(unit_vector(lat, lon), query), airport_id)
+                for airport_id, lat, lon in self.points
+            )[:limit]
+        ]
+
+    def test_matches_brute_force(self):
+        # Includes polar queries where the grid falls back to a full scan
+        for latitude, longitude in self.queries[:40] + [(89.0, 10.0)]:
+            found = self.index.nearest(latitude, longitude, limit=5)
+            self.assertEqual(
+                [airport_id for airport_id, _ in found],
+                self.brute_force(latitude, longitude, 5),
+            )
+
+    def test_max_km(self):
+        found = self.index.nearest(*self.queries[0], limit=50, max_km=150)
+
+        self.assertTrue(found)
+        self.assertTrue(all(km <= 150 for _, km in found))
+        self.assertEqual(
+            [km for _, km in found], sorted(km for _, km in found)
+        )
+
+    def test_lookup_within_budget(self):
+        timings = []
+        for latitude, longitude in self.queries:
+            started = time.perf_counter()
+            self.index.nearest(latitude, longitude, limit=5)
+            timings.append(time.perf_counter() - started)
+
+        self.assertLess(statistics.median(timings) * 1000, NEAREST_BUDGET_MS)
+
+
+class NearestAirportApiTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_user(
+                email="traveller@test.com", password="testpass"
+            )
+        )
+        self.boryspil = Airport.objects.create(
+            name="Boryspil",
+            closest_big_city="Kyiv",
+            latitude=KYIV[0],
+            longitude=KYIV[1],
+        )
+        self.heathrow = Airport.objects.create(
+            name="Heathrow",
+            closest_big_city="London",
+            latitude=LONDON[0],
+            longitude=LONDON[1],
+        )
+        Airport.objects.create(name="Unknown", closest_big_city="Nowhere")
+
+    def test_nearest_airports(self):
+        res = self.client.get(NEAREST_URL, {"lat": 50.45, "lon": 30.52})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [airport["id"] for airport in res.data],
+            [self.boryspil.id, self.heathrow.id],
+        )
+        self.assertLess(res.data[0]["distance_km"], 30)
+
+    def test_limit_and_max_km(self):
+        res = self.client.get(
+            NEAREST_URL, {"lat": 51.5, "lon": -0.12, "limit": 1}
+        )
+        self.assertEqual([a["id"] for a in res.data], [self.heathrow.id])
+
+        res = self.client.get(NEAREST_URL, {"lat": 0, "lon": 0, "max_km": 100})
+        self.assertEqual(res.data, [])
+
+    def test_invalid_point(self):
+        for params in (
+            {"lat": 50},
+            {"lat": "x", "lon": 1},
+            {"lat": 91, "lon": 0},
+        ):
+            res = self.client.get(NEAREST_URL, params)
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_index_follows_airport_changes(self):
+        self.client.get(NEAREST_URL, {"lat": 0, "lon": 0})
+        with self.captureOnCommitCallbacks(execute=True):
+            airport = Airport.objects.create(
+                name="Kotoka",
+                closest_big_city="Accra",
+                latitude=5.6,
+                longitude=-0.17,
+            )
+
+        res = self.client.get(NEAREST_URL, {"lat": 0, "lon": 0, "limit": 1})
+
+        self.assertEqual(res.data[0]["id"], airport.id)
+
+    def test_recompute_route_distances(self):
+        route = Route.objects.create(
+            source=self.boryspil, destination=self.heathrow, distance=1
+        )
+
+        call_command("recompute_route_distances", stdout=StringIO())
+
+        route.refresh_from_db()
+        self.assertEqual(route.distance, great_circle_km(KYIV, LONDON))
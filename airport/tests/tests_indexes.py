@@ -0,0 +1,81 @@
+from datetime import timedelta
+
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+
+from airport.models import Flight, Order, Route, Ticket
+from airport.tests.tests_orders import OrderTestMixin
+
+
+class HotQueryIndexTests(OrderTestMixin, TestCase):
+    """The hot query shapes are planned on their dedicated indexes."""
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.create_order((1, 1), (1, 2))
+        if connection.vendor == "postgresql":
+            # Test tables are tiny; keep the planner off sequential scans
+            with connection.cursor() as cursor:
+                cursor.execute("SET enable_seqscan = off")
+
+    def assertPlanUses(self, queryset, *fragments):
+        plan = queryset.explain()
+        for fragment in fragments:
+            self.assertIn(fragment, plan)
+
+    def test_order_history(self):
+        self.assertPlanUses(
+            Order.objects.filter(user=self.user).order_by("-created_at"),
+            "order_user_created_idx",
+        )
+
+    def test_route_lookup(self):
+        self.assertPlanUses(
+            Route.objects.filter(
+                source=self.route.source_id,
+                destination=self.route.destination_id,
+            ),
+            "route_source_destination_idx",
+        )
+
+    def test_upcoming_flights_on_route(self):
+        now = timezone.now()
+        self.assertPlanUses(
+            Flight.objects.filter(
+                route=self.route,
+                departure_time__range=(now, now + timedelta(days=30)),
+            ),
+            "flight_route_departure_idx",
+        )
+
+    def test_airplane_schedule(self):
+        self.assertPlanUses(
+            Flight.objects.filter(
+                airplane=self.airplane, departure_time__gte=timezone.now()
+            ),
+            "flight_airplane_departure_idx",
+        )
+
+    def test_taken_seats_read_from_unique_index_only(self):
+        covering = {
+            "postgresql": "Index Only Scan",
+            "sqlite": "COVERING INDEX",
+        }.get(connection.vendor)
+        if covering is None:
+            self.skipTest(f"No plan check for {connection.vendor}")
+        self.assertPlanUses(
+            Ticket.objects.filter(flight=self.flight).values_list(
+                "row", "seat"
+            ),
+            covering,
+        )
+
+    def test_trips_read_tickets_from_index_only(self):
+        self.assertPlanUses(
+            Ticket.objects.filter(
+                order__user=self.user,
+                flight__departure_time__gt=timezone.now(),
+            ).values_list("order_id", "flight_id", "row", "seat"),
+            "ticket_order_flight_idx",
+        )
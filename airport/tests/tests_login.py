@@ -0,0 +1,124 @@
+import threading
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from user import login
+
+TOKEN_URL = reverse("user:token_obtain_pair")
+
+
+@override_settings(
+    PASSWORD_HASH_ITERATIONS=1000,
+    LOGIN_MAX_ACCOUNT_FAILURES=3,
+    LOGIN_MAX_IP_FAILURES=5,
+)
+class LoginTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="traveller@test.com", password="testpass"
+        )
+
+    def login(self, email="traveller@test.com", password="testpass", **extra):
+        return self.client.post(
+            TOKEN_URL, {"email": email, "password": password}, **extra
+        )
+
+    def test_login(self):
+        res = self.login()
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn("access", res.data)
+
+    def test_hash_upgraded_on_login(self):
+        self.assertIn("$1000$", self.user.password)
+
+        with override_settings(PASSWORD_HASH_ITERATIONS=1200):
+            res = self.login()
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith("pbkdf2_sha256$1200$"))
+        self.assertTrue(self.user.check_password("testpass"))
+
+    @override_settings(LOGIN_HASH_WAIT=0)
+    def test_busy_when_no_hashing_slot_frees(self):
+        with mock.patch.object(login, "_slots", threading.BoundedSemaphore(1)):
+            login._slots.acquire()
+            busy = self.login()
+            login._slots.release()
+            res = self.login()
+
+        self.assertEqual(busy.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_unknown_account(self):
+        res = self.login(email="nobody@test.com")
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_account_blocked_after_failures(self):
+        for _ in range(3):
+            res = self.login(password="wrong")
+            self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        res = self.login(REMOTE_ADDR="10.0.0.2")
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn("Retry-After", res)
+
+    def test_success_resets_account_failures(self):
+        for _ in range(2):
+            self.login(password="wrong")
+        self.login()
+
+        for _ in range(2):
+            self.login(password="wrong")
+
+        self.assertEqual(self.login().status_code, status.HTTP_200_OK)
+
+    def test_address_blocked_after_failures(self):
+        for number in range(5):
+            self.login(email=f"guess{number}@test.com")
+
+        res = self.login()
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+        res = self.login(REMOTE_ADDR="10.0.0.2")
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_forwarded_for_not_trusted_without_proxies(self):
+        for number in range(5):
+            self.login(
+                email=f"guess{number}@test.com",
+                HTTP_X_FORWARDED_FOR=f"203.0.113.{number}",
+            )
+
+        res = self.login(HTTP_X_FORWARDED_FOR="203.0.113.99")
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_forwarded_for_read_behind_proxy(self):
+        rest_framework = {**settings.REST_FRAMEWORK, "NUM_PROXIES": 1}
+        with override_settings(REST_FRAMEWORK=rest_framework):
+            for number in range(5):
+                self.login(
+                    email=f"guess{number}@test.com",
+                    HTTP_X_FORWARDED_FOR="198.51.100.7",
+                )
+
+            blocked = self.login(HTTP_X_FORWARDED_FOR="198.51.100.7")
+            other = self.login(HTTP_X_FORWARDED_FOR="198.51.100.8")
+
+        self.assertEqual(
+            blocked.status_code, status.HTTP_429_TOO_MANY_REQUESTS
+        )
+        self.assertEqual(other.status_code, status.HTTP_200_OK)
@@ -0,0 +1,80 @@
+import time
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport_api_service.compression import CompressionMiddleware
+from airport_api_service.metrics import registry
+
+METRICS_URL = reverse("metrics")
+CREW_URL = reverse("airport:crew-list")
+
+
+class RequestMetricsTests(TestCase):
+    def setUp(self) -> None:
+        registry.reset()
+        self.client = APIClient()
+        self.admin = get_user_model().objects.create_user(
+            email="admin@test.com", password="testpass", is_staff=True
+        )
+        self.client.force_authenticate(self.admin)
+
+    def test_metrics_record_endpoint(self):
+        self.client.get(CREW_URL)
+
+        res = self.client.get(METRICS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        body = res.content.decode()
+        self.assertIn(
+            "airport_request_duration_seconds_count"
+            '{view="CrewViewSet",action="list"} 1',
+            body,
+        )
+        self.assertIn(
+            'airport_db_queries_total{view="CrewViewSet",action="list"} 1',
+            body,
+        )
+
+    def test_render_time_excludes_outer_middleware(self):
+        def slow_check(response):
+            time.sleep(0.1)
+            return False
+
+        with mock.patch.object(
+            CompressionMiddleware, "should_compress", side_effect=slow_check
+        ):
+            self.client.get(CREW_URL)
+
+        stats = registry._stats[("CrewViewSet", "list")]
+        self.assertGreaterEqual(stats.duration, 0.1)
+        self.assertGreater(stats.render_duration, 0)
+        self.assertLess(stats.render_duration, 0.1)
+
+    def test_metrics_staff_only(self):
+        user = get_user_model().objects.create_user(
+            email="user@test.com", password="testpass"
+        )
+        self.client.force_authenticate(user)
+
+        res = self.client.get(METRICS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    @override_settings(REQUEST_PROFILING_ENABLED=True)
+    def test_staff_profile_capture(self):
+        token = self.client.post(
+            reverse("user:token_obtain_pair"),
+            {"email": "admin@test.com", "password": "testpass"},
+        ).data["access"]
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+        res = client.get(CREW_URL, {"_profile": "1"})
+
+        self.assertEqual(res["Content-Type"], "text/plain")
+        self.assertIn("function calls", res.content.decode())
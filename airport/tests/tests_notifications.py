@@ -0,0 +1,182 @@
+import json
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+
+from airport.models import Flight, FlightChange, Notification
+from airport.notifications import (
+    ConsoleBackend,
+    EmailBackend,
+    FileBackend,
+    deliver_notifications,
+    process_flight_changes,
+    record_flight_changes,
+)
+from airport.tests.tests_orders import OrderTestMixin
+
+
+class FlightChangeTests(OrderTestMixin, TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.other = get_user_model().objects.create_user(
+            email="other@test.com", password="testpass"
+        )
+
+    def reschedule(self, flight, hours=2):
+        flight = Flight.objects.get(id=flight.id)
+        flight.departure_time += timedelta(hours=hours)
+        flight.arrival_time += timedelta(hours=hours)
+        flight.save()
+        return flight
+
+    def test_schedule_change_recorded_once(self):
+        flight = self.reschedule(self.flight)
+        flight.save()
+
+        change = FlightChange.objects.get()
+        self.assertEqual(
+            change.new_departure_time - change.old_departure_time,
+            timedelta(hours=2),
+        )
+
+    def test_other_edits_not_recorded(self):
+        flight = Flight.objects.get(id=self.flight.id)
+        flight.save()
+        self.create_flight()
+
+        self.assertFalse(FlightChange.objects.exists())
+
+    def test_staff_update_via_api(self):
+        self.user.is_staff = True
+        self.user.save()
+        departure = self.flight.departure_time + timedelta(days=1)
+
+        res = self.client.patch(
+            reverse("airport:flight-detail", args=[self.flight.id]),
+            {"departure_time": departure.isoformat()},
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            FlightChange.objects.get().new_departure_time, departure
+        )
+
+    def test_fan_out_to_ticket_holders(self):
+        self.create_order((1, 1), (1, 2))
+        self.create_order((2, 1))
+        other_order = self.create_order((3, 1))
+        other_order.user = self.other
+        other_order.save()
+        untouched = self.create_flight(days=8)
+        self.create_order((1, 1), flight=untouched)
+        self.reschedule(self.flight)
+
+        self.assertEqual(process_flight_changes(), 1)
+
+        self.assertEqual(
+            sorted(Notification.objects.values_list("user_id", flat=True)),
+            sorted([self.user.id, self.other.id]),
+        )
+        self.assertEqual(process_flight_changes(), 0)
+
+    def test_many_flights_in_one_pass(self):
+        flights = Flight.objects.bulk_create(
+            Flight(
+                route=self.route,
+                airplane=self.airplane,
+                departure_time=self.flight.departure_time
+                + timedelta(hours=number),
+                arrival_time=self.flight.arrival_time
+                + timedelta(hours=number),
+            )
+            for number in range(500)
+        )
+        for flight in flights[:250]:
+            self.create_order((1, 1), flight=flight)
+        flights = list(Flight.objects.filter(id__in=[f.id for f in flights]))
+        for flight in flights:
+            flight.departure_time += timedelta(minutes=30)
+        Flight.objects.bulk_update(flights, ["departure_time"])
+        record_flight_changes(flights)
+
+        # Claim, holders, notifications, mark processed, savepoint
+        with CaptureQueriesContext(connection) as context:
+            self.assertEqual(process_flight_changes(500), 500)
+
+        # Claim, holders, mark processed and the savepoint; the insert is
+        # split only by the database's bound-parameter limit
+        self.assertEqual(
+            sum(
+                not query["sql"].startswith("INSERT")
+                for query in context.captured_queries
+            ),
+            5,
+        )
+        self.assertEqual(Notification.objects.count(), 250)
+
+    def test_delivery_backends(self):
+        self.create_order((1, 1))
+        self.reschedule(self.flight)
+        process_flight_changes()
+        stream = StringIO()
+
+        self.assertEqual(
+            deliver_notifications(backend=ConsoleBackend(stream)), 1
+        )
+
+        self.assertIn("To: traveller@test.com", stream.getvalue())
+        self.assertIn("Boryspil (Kyiv) - Heathrow (London)", stream.getvalue())
+        self.assertEqual(
+            deliver_notifications(backend=ConsoleBackend(stream)), 0
+        )
+
+        Notification.objects.update(sent_at=None)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = Path(directory.name, "notifications.jsonl")
+        deliver_notifications(backend=FileBackend(path))
+        message = json.loads(path.read_text())
+        self.assertEqual(message["to"], "traveller@test.com")
+
+        Notification.objects.update(sent_at=None)
+        deliver_notifications(backend=EmailBackend())
+        self.assertEqual(mail.outbox[0].to, ["traveller@test.com"])
+
+    def test_failed_delivery_retried(self):
+        class FailingBackend(ConsoleBackend):
+            def send(self, messages):
+                raise ConnectionError
+
+        self.create_order((1, 1))
+        self.reschedule(self.flight)
+        process_flight_changes()
+
+        with self.assertRaises(ConnectionError):
+            deliver_notifications(backend=FailingBackend())
+
+        self.assertTrue(Notification.objects.filter(sent_at=None).exists())
+
+    @override_settings(
+        NOTIFICATION_BACKEND="airport.notifications.EmailBackend"
+    )
+    def test_command(self):
+        self.create_order((1, 1))
+        self.reschedule(self.flight)
+        out = StringIO()
+
+        call_command("process_flight_changes", "--once", stdout=out)
+
+        self.assertIn(
+            "Processed 1 flight changes, sent 1 notifications.", out.getvalue()
+        )
+        self.assertEqual(len(mail.outbox), 1)
@@ -0,0 +1,274 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.booking import process_booking_batch
+from airport.models import (
+    Airplane,
+    AirplaneType,
+    Airport,
+    BookingJob,
+    Flight,
+    Order,
+    Route,
+    Ticket,
+)
+from airport.serializers import OrderSerializer
+
+ORDER_URL = reverse("airport:order-list")
+
+
+def detail_order_url(order):
+    return reverse("airport:order-detail", args=[order.id])
+
+
+class OrderTestMixin:
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="traveller@test.com", password="testpass"
+        )
+        self.client.force_authenticate(self.user)
+
+        source = Airport.objects.create(
+            name="Boryspil", closest_big_city="Kyiv"
+        )
+        destination = Airport.objects.create(
+            name="Heathrow", closest_big_city="London"
+        )
+        self.route = Route.objects.create(
+            source=source, destination=destination, distance=2100
+        )
+        airplane_type = AirplaneType.objects.create(name="Airbus")
+        self.airplane = Airplane.objects.create(
+            name="A320", rows=10, seats_in_row=6, airplane_type=airplane_type
+        )
+        self.flight = self.create_flight()
+
+    def create_flight(self, days=7):
+        departure = timezone.now() + timedelta(days=days)
+        return Flight.objects.create(
+            route=self.route,
+            airplane=self.airplane,
+            departure_time=departure,
+            arrival_time=departure + timedelta(hours=3),
+        )
+
+    def create_order(self, *seats, flight=None):
+        order = Order.objects.create(user=self.user)
+        for row, seat in seats:
+            Ticket.objects.create(
+                row=row, seat=seat, flight=flight or self.flight, order=order
+            )
+        return order
+
+
+class OrderHistoryTests(OrderTestMixin, TestCase):
+    def test_list_matches_detail_representation(self):
+        order = self.create_order((1, 1), (1, 2))
+
+        res = self.client.get(ORDER_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json()["results"], [OrderSerializer(order).data])
+        self.assertEqual(
+            res.json()["results"][0]["tickets"][0]["route"],
+            "Boryspil (Kyiv) - Heathrow (London)",
+        )
+
+    def test_list_query_count_is_flat(self):
+        for row in range(1, 11):
+            self.create_order((row, 1), (row, 2), (row, 3))
+
+        with self.assertNumQueries(3):
+            res = self.client.get(ORDER_URL, {"page_size": 10})
+
+        self.assertEqual(len(res.data["results"]), 10)
+
+    def test_list_shows_only_own_orders(self):
+        self.create_order((1, 1))
+        other = get_user_model().objects.create_user(
+            email="other@test.com", password="testpass"
+        )
+        Order.objects.create(user=other)
+
+        res = self.client.get(ORDER_URL)
+
+        self.assertEqual(res.data["count"], 1)
+
+
+class IdempotentOrderCreateTests(OrderTestMixin, TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        cache.clear()
+
+    def post_order(self, seat, key="retry-1"):
+        payload = {
+            "tickets": [{"row": 1, "seat": seat, "flight": self.flight.id}]
+        }
+        return self.client.post(
+            ORDER_URL, payload, format="json", HTTP_IDEMPOTENCY_KEY=key
+        )
+
+    def test_retry_replays_first_response(self):
+        first = self.post_order(seat=1)
+        retry = self.post_order(seat=1)
+
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry.data, first.data)
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_long_key_hashed_for_cache(self):
+        key = "retry " * 42
+
+        with mock.patch.object(cache, "add", wraps=cache.add) as add:
+            self.post_order(seat=1, key=key)
+        retry = self.post_order(seat=1, key=key)
+
+        (cache_key,) = (
+            call.args[0]
+            for call in add.call_args_list
+            if call.args[0].startswith("idempotency:")
+        )
+        self.assertLessEqual(len(cache_key), 250)
+        self.assertNotIn(" ", cache_key)
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+
+    def test_key_reused_with_other_payload(self):
+        self.post_order(seat=1)
+        res = self.post_order(seat=2)
+
+        self.assertEqual(res.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_failed_request_is_not_stored(self):
+        taken = self.create_order((1, 1))
+
+        res = self.post_order(seat=1)
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        taken.delete()
+        res = self.post_order(seat=1)
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+    def test_without_key_creates_every_time(self):
+        payload = {
+            "tickets": [{"row": 1, "seat": 1, "flight": self.flight.id}]
+        }
+        self.client.post(ORDER_URL, payload, format="json")
+        payload["tickets"][0]["seat"] = 2
+        self.client.post(ORDER_URL, payload, format="json")
+
+        self.assertEqual(Order.objects.count(), 2)
+
+
+class QueuedBookingTests(OrderTestMixin, TestCase):
+    def post_queued(self, *seats):
+        payload = {
+            "tickets": [
+                {"row": row, "seat": seat, "flight": self.flight.id}
+                for row, seat in seats
+            ]
+        }
+        return self.client.post(
+            ORDER_URL, payload, format="json", HTTP_PREFER="respond-async"
+        )
+
+    def test_queued_order_is_accepted(self):
+        res = self.post_queued((1, 1))
+
+        self.assertEqual(res.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(res.data["status"], BookingJob.Status.PENDING)
+        self.assertFalse(Order.objects.exists())
+
+        status_res = self.client.get(res["Location"])
+        self.assertEqual(status_res.data["id"], res.data["id"])
+
+    def test_worker_confirms_batch(self):
+        self.post_queued((1, 1))
+        self.post_queued((1, 2), (1, 3))
+
+        self.assertEqual(process_booking_batch(), 2)
+
+        jobs = BookingJob.objects.all()
+        self.assertTrue(
+            all(job.status == BookingJob.Status.CONFIRMED for job in jobs)
+        )
+        self.assertEqual(Ticket.objects.count(), 3)
+        self.assertEqual(process_booking_batch(), 0)
+
+    def test_conflicting_job_fails_alone(self):
+        self.post_queued((1, 1))
+        self.post_queued((1, 1))
+
+        process_booking_batch()
+
+        first, second = BookingJob.objects.all()
+        self.assertEqual(first.status, BookingJob.Status.CONFIRMED)
+        self.assertEqual(second.status, BookingJob.Status.FAILED)
+        self.assertIsNone(second.order)
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_duplicate_seat_refused_up_front(self):
+        res = self.post_queued((1, 1), (1, 1))
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("tickets", res.data)
+        self.assertFalse(BookingJob.objects.exists())
+
+        res = self.client.post(
+            ORDER_URL,
+            {
+                "tickets": [
+                    {"row": 1, "seat": 1, "flight": self.flight.id},
+                    {"row": 1, "seat": 1, "flight": self.flight.id},
+                ]
+            },
+            format="json",
+        )
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Order.objects.exists())
+
+    def test_job_with_duplicate_seat_fails_alone(self):
+        self.post_queued((2, 1))
+        seat = {"flight": self.flight.id, "row": 1, "seat": 1}
+        BookingJob.objects.create(
+            user=self.user, flight=self.flight, tickets=[seat, seat]
+        )
+
+        self.assertEqual(process_booking_batch(), 2)
+
+        valid, duplicate = BookingJob.objects.all()
+        self.assertEqual(valid.status, BookingJob.Status.CONFIRMED)
+        self.assertEqual(duplicate.status, BookingJob.Status.FAILED)
+        self.assertIn("tickets", duplicate.errors)
+
+    def test_validation_error_on_save_fails_job(self):
+        self.post_queued((1, 1))
+        self.post_queued((1, 2))
+        create = OrderSerializer.create
+        calls = []
+
+        def fail_first(serializer, validated_data):
+            calls.append(validated_data)
+            if len(calls) == 1:
+                raise ValidationError({"seat": "Seat is not available."})
+            return create(serializer, validated_data)
+
+        with mock.patch.object(OrderSerializer, "create", fail_first):
+            process_booking_batch()
+
+        first, second = BookingJob.objects.all()
+        self.assertEqual(first.status, BookingJob.Status.FAILED)
+        self.assertEqual(first.errors, {"seat": ["Seat is not available."]})
+        self.assertEqual(second.status, BookingJob.Status.CONFIRMED)
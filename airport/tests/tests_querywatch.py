@@ -0,0 +1,60 @@
+from django.test import TestCase
+from django.utils.functional import SimpleLazyObject, empty
+
+from airport.models import Airplane, AirplaneType
+from airport.serializers import AirplaneSerializer
+from airport_api_service.querywatch import (
+    NPlusOneError,
+    inspect_queries,
+    query_shape,
+)
+
+
+class QueryInspectorTests(TestCase):
+    def setUp(self) -> None:
+        for number in range(6):
+            Airplane.objects.create(
+                name=f"Plane {number}",
+                rows=10,
+                seats_in_row=6,
+                airplane_type=AirplaneType.objects.create(
+                    name=f"Type {number}"
+                ),
+            )
+
+    def test_in_lists_share_a_shape(self):
+        self.assertEqual(
+            query_shape("SELECT 1 WHERE id IN (%s, %s, %s)"),
+            query_shape("SELECT 1 WHERE id IN (%s)"),
+        )
+
+    def test_detects_n_plus_one(self):
+        with self.assertRaises(NPlusOneError) as error, self.assertLogs(
+            "airport.querywatch", "WARNING"
+        ):
+            with inspect_queries(raise_on_n_plus_one=True):
+                AirplaneSerializer(Airplane.objects.all(), many=True).data
+
+        self.assertIn("6 x", str(error.exception))
+        self.assertIn("airport_airplanetype", str(error.exception))
+        self.assertIn("serializers.py", str(error.exception))
+
+    def test_select_related_passes(self):
+        queryset = Airplane.objects.select_related("airplane_type")
+
+        with inspect_queries(raise_on_n_plus_one=True) as inspector:
+            AirplaneSerializer(queryset, many=True).data
+
+        self.assertEqual(inspector.n_plus_one(), [])
+
+    def test_lazy_objects_in_frames_are_not_evaluated(self):
+        lazy = SimpleLazyObject(lambda: list(AirplaneType.objects.all()))
+
+        def run_query(self):
+            return Airplane.objects.count()
+
+        with inspect_queries(raise_on_n_plus_one=False) as inspector:
+            run_query(lazy)
+
+        self.assertEqual(len(inspector.shapes), 1)
+        self.assertIs(lazy._wrapped, empty)
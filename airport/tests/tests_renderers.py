@@ -0,0 +1,76 @@
+import io
+import random
+import uuid
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+from django.test import SimpleTestCase
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+
+from airport.management.commands.bench_renderers import (
+    flight_list_payload,
+    order_history_payload,
+)
+from airport_api_service.renderers import FastJSONParser, FastJSONRenderer
+
+
+class FastJSONRendererTests(SimpleTestCase):
+    def assertSameOutput(self, data, **kwargs):
+        self.assertEqual(
+            FastJSONRenderer().render(data, **kwargs),
+            JSONRenderer().render(data, **kwargs),
+        )
+
+    def test_matches_drf_for_special_types(self):
+        self.assertSameOutput(
+            {
+                "aware": timezone.make_aware(
+                    datetime(2024, 5, 1, 10, 30, 15, 123456)
+                ),
+                "naive": datetime(2024, 5, 1, 10, 30),
+                "date": date(2024, 5, 1),
+                "time": time(10, 30, 15, 500),
+                "duration": timedelta(hours=2, minutes=5),
+                "price": Decimal("123.40"),
+                "reference": uuid.UUID(int=42),
+                "lazy": gettext_lazy("Flight"),
+                "separators": "line\u2028paragraph\u2029",
+                "unicode": "Київ",
+                1: ("tuple", None, True, 1.5),
+            }
+        )
+
+    def test_matches_drf_for_payloads(self):
+        rng = random.Random(0)
+        self.assertSameOutput(flight_list_payload(20, rng))
+        self.assertSameOutput(order_history_payload(20, rng))
+
+    def test_indent_falls_back_to_drf(self):
+        self.assertSameOutput({"id": 1}, renderer_context={"indent": 4})
+
+    def test_non_finite_floats_render_as_null(self):
+        for value in (float("nan"), float("inf"), -float("inf")):
+            data = [{"route": 1, "load_factor": value}]
+            with self.assertRaises(ValueError):
+                JSONRenderer().render(data)
+            self.assertEqual(
+                FastJSONRenderer().render(data),
+                b'[{"route":1,"load_factor":null}]',
+            )
+
+    def test_none_renders_empty(self):
+        self.assertEqual(FastJSONRenderer().render(None), b"")
+
+
+class FastJSONParserTests(SimpleTestCase):
+    def test_parse(self):
+        data = FastJSONParser().parse(io.BytesIO('{"city": "Київ"}'.encode()))
+
+        self.assertEqual(data, {"city": "Київ"})
+
+    def test_invalid_json(self):
+        with self.assertRaises(ParseError):
+            FastJSONParser().parse(io.BytesIO(b"{"))
@@ -0,0 +1,105 @@
+import json
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+
+from airport_api_service import schema
+from airport_api_service.schema import read_schema_file, schema_cache
+
+SCHEMA_URL = reverse("schema")
+
+
+class CachedSchemaTests(TestCase):
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.schema_file = Path(directory.name, "openapi-schema.json")
+        settings_override = override_settings(
+            SCHEMA_CACHE_FILE=self.schema_file
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        schema_cache.clear()
+        self.addCleanup(schema_cache.clear)
+
+    def get_schema(self, **headers):
+        return self.client.get(
+            SCHEMA_URL, HTTP_ACCEPT="application/json", **headers
+        )
+
+    def test_schema_generated_once_and_stored(self):
+        with mock.patch.object(
+            schema, "generate_schema", wraps=schema.generate_schema
+        ) as generate:
+            first = self.get_schema()
+            second = self.get_schema()
+
+        self.assertEqual(generate.call_count, 1)
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual(first.content, second.content)
+        self.assertIn(
+            "/api/airport/flights/", json.loads(first.content)["paths"]
+        )
+        self.assertEqual(
+            read_schema_file(schema_cache.version, self.schema_file),
+            json.loads(first.content),
+        )
+
+    def test_stored_schema_reused_by_new_process(self):
+        self.get_schema()
+        schema_cache.clear()
+
+        with mock.patch.object(schema, "generate_schema") as generate:
+            res = self.get_schema()
+
+        generate.assert_not_called()
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_stale_schema_file_ignored(self):
+        self.schema_file.write_text(
+            json.dumps({"version": "old", "schema": {"paths": {}}})
+        )
+
+        res = self.get_schema()
+
+        self.assertNotEqual(json.loads(res.content)["paths"], {})
+
+    def test_etag_revalidation(self):
+        etag = self.get_schema()["ETag"]
+
+        res = self.get_schema(HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res["ETag"], etag)
+
+    def test_analytics_response_is_array(self):
+        paths = json.loads(self.get_schema().content)["paths"]
+
+        response = paths["/api/airport/analytics/flight-load/"]["get"][
+            "responses"
+        ]["200"]
+        self.assertEqual(
+            response["content"]["application/json"]["schema"]["type"],
+            "array",
+        )
+
+    def test_metrics_endpoint_excluded(self):
+        paths = json.loads(self.get_schema().content)["paths"]
+
+        self.assertNotIn("/api/metrics/", paths)
+
+    def test_jwt_security_scheme(self):
+        content = json.loads(self.get_schema().content)
+
+        self.assertEqual(
+            content["components"]["securitySchemes"]["jwtAuth"]["scheme"],
+            "bearer",
+        )
+        self.assertIn(
+            {"jwtAuth": []},
+            content["paths"]["/api/airport/orders/"]["get"]["security"],
+        )
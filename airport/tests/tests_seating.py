@@ -0,0 +1,123 @@
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+from rest_framework import status
+
+from airport.models import Ticket
+from airport.seating import AISLE, WINDOW, FreeSeatMap, aisle_seats
+from airport.tests.tests_orders import ORDER_URL, OrderTestMixin
+
+
+class SeatPreferenceTests(SimpleTestCase):
+    def test_aisle_seats(self):
+        self.assertEqual(aisle_seats(6), {3, 4})
+        self.assertEqual(aisle_seats(9), {3, 4, 6, 7})
+        self.assertEqual(aisle_seats(2), set())
+
+    def test_window_block_preferred_over_front_row(self):
+        seats = FreeSeatMap(3, 6, taken=[(1, 1), (1, 6)])
+
+        self.assertEqual(seats.pick(2, position=WINDOW), [(2, 1), (2, 2)])
+
+    def test_aisle_block(self):
+        seats = FreeSeatMap(2, 6, taken=[(1, 3)])
+
+        self.assertEqual(seats.pick(2, position=AISLE), [(1, 4), (1, 5)])
+
+    def test_falls_back_to_any_block(self):
+        seats = FreeSeatMap(1, 6, taken=[(1, 1), (1, 6)])
+
+        self.assertEqual(
+            seats.pick(3, position=WINDOW), [(1, 2), (1, 3), (1, 4)]
+        )
+
+    def test_row_range(self):
+        seats = FreeSeatMap(10, 6)
+
+        self.assertEqual(
+            seats.pick(2, first_row=5, last_row=6), [(5, 1), (5, 2)]
+        )
+        self.assertIsNone(seats.pick(7, first_row=5, last_row=6))
+
+    def test_apart_prefers_position(self):
+        seats = FreeSeatMap(2, 4, taken=[(1, 1)])
+
+        self.assertEqual(
+            seats.pick(3, together=False, position=WINDOW),
+            [(1, 4), (2, 1), (2, 4)],
+        )
+
+
+class AutoAssignOrderTests(OrderTestMixin, TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        cache.clear()
+
+    def auto_assign(self, **request):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(
+                ORDER_URL,
+                {"auto_assign": {"flight": self.flight.id, **request}},
+                format="json",
+            )
+
+    def test_group_seated_together(self):
+        self.create_order((1, 1), (1, 4))
+
+        res = self.auto_assign(seats=3)
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            [
+                (ticket["row"], ticket["seat"])
+                for ticket in res.data["tickets"]
+            ],
+            [(2, 1), (2, 2), (2, 3)],
+        )
+        self.assertTrue(all(ticket["price"] for ticket in res.data["tickets"]))
+
+    def test_window_in_row_range(self):
+        res = self.auto_assign(
+            seats=1, position="window", first_row=4, last_row=5
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            (res.data["tickets"][0]["row"], res.data["tickets"][0]["seat"]),
+            (4, 1),
+        )
+
+    def test_no_block_left(self):
+        self.create_order(*((row, 3) for row in range(1, 11)))
+
+        res = self.auto_assign(seats=3, first_row=1, last_row=10)
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+        res = self.auto_assign(seats=4)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("auto_assign", res.data)
+        self.assertEqual(Ticket.objects.count(), 13)
+
+    def test_tickets_or_auto_assign(self):
+        res = self.client.post(ORDER_URL, {}, format="json")
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        res = self.client.post(
+            ORDER_URL,
+            {
+                "tickets": [{"row": 1, "seat": 1, "flight": self.flight.id}],
+                "auto_assign": {"flight": self.flight.id, "seats": 1},
+            },
+            format="json",
+        )
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_group_larger_than_row_rejected(self):
+        res = self.auto_assign(seats=7)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        res = self.auto_assign(seats=7, together=False)
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(res.data["tickets"]), 7)
@@ -0,0 +1,44 @@
+import os
+
+from django.test import SimpleTestCase
+
+from airport_api_service.startup import (
+    aggregate_importtime,
+    parse_importtime,
+    run_cold_start,
+)
+
+# Generous enough for a loaded CI box; the local figure is around 0.7s
+COLD_START_BUDGET = float(os.environ.get("COLD_START_BUDGET", 3.0))
+
+
+class ColdStartTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.report, _ = run_cold_start()
+
+    def test_cold_start_within_budget(self):
+        self.assertLess(self.report["seconds"], COLD_START_BUDGET)
+
+    def test_docs_and_debug_modules_not_imported(self):
+        for module in ("drf_spectacular.views", "debug_toolbar"):
+            self.assertNotIn(module, self.report["modules"])
+
+
+class ImportTimeParsingTests(SimpleTestCase):
+    def test_aggregate_by_package(self):
+        output = (
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       100 |        100 |     yaml.nodes\n"
+            "import time:       300 |        400 |   yaml\n"
+            "import time:        50 |         50 | airport.views\n"
+        )
+
+        rows = list(parse_importtime(output))
+
+        self.assertEqual(rows[1], ("yaml", 300, 400))
+        self.assertEqual(
+            aggregate_importtime(rows),
+            {"yaml": [400, 2], "airport": [50, 1]},
+        )
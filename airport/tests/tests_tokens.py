@@ -0,0 +1,139 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from user.checks import check_shared_cache
+from user.revocation import BloomFilter, RevocationStore
+
+REFRESH_URL = reverse("user:token_refresh")
+REVOKE_URL = reverse("user:token_revoke")
+VERIFY_URL = reverse("user:token_verify")
+ME_URL = reverse("user:manage")
+
+
+class BloomFilterTests(SimpleTestCase):
+    def test_no_false_negatives(self):
+        bloom = BloomFilter(bits=2**12, hashes=5)
+        items = [f"jti-{number}" for number in range(200)]
+        for item in items:
+            bloom.add(item)
+
+        self.assertTrue(all(item in bloom for item in items))
+        false_positives = sum(
+            f"other-{number}" in bloom for number in range(1000)
+        )
+        self.assertLess(false_positives, 50)
+
+
+@override_settings(JWT_REVOCATION_SYNC_SECONDS=60)
+class RevocationStoreTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.token = AccessToken()
+
+    def test_other_process_sees_revocation_after_sync(self):
+        revoking, other = RevocationStore(), RevocationStore()
+        self.assertFalse(
+            other.is_revoked(self.token["jti"], self.token["exp"])
+        )
+
+        revoking.revoke(self.token["jti"], self.token["exp"])
+
+        self.assertTrue(
+            revoking.is_revoked(self.token["jti"], self.token["exp"])
+        )
+        other.sync(force=True)
+        self.assertTrue(other.is_revoked(self.token["jti"], self.token["exp"]))
+
+    def test_unrevoked_token_checked_in_memory(self):
+        store = RevocationStore()
+        store.sync(force=True)
+        store.revoke("some-other-jti", self.token["exp"])
+
+        with mock.patch.object(cache, "get", wraps=cache.get) as get:
+            revoked = store.is_revoked(self.token["jti"], self.token["exp"])
+
+        self.assertFalse(revoked)
+        get.assert_not_called()
+
+    def test_revoke_once(self):
+        store = RevocationStore()
+
+        self.assertTrue(store.revoke("jti", self.token["exp"]))
+        self.assertFalse(store.revoke("jti", self.token["exp"]))
+
+
+class SharedCacheCheckTests(SimpleTestCase):
+    def caches(self, backend):
+        return {"default": {"BACKEND": backend}}
+
+    def test_local_cache_fails_outside_debug(self):
+        locmem = "django.core.cache.backends.locmem.LocMemCache"
+        with override_settings(DEBUG=False, CACHES=self.caches(locmem)):
+            errors = check_shared_cache(None)
+        with override_settings(DEBUG=True, CACHES=self.caches(locmem)):
+            debug_errors = check_shared_cache(None)
+
+        self.assertEqual([error.id for error in errors], ["user.E001"])
+        self.assertEqual(debug_errors, [])
+
+    def test_shared_cache_passes(self):
+        redis = "django.core.cache.backends.redis.RedisCache"
+        with override_settings(DEBUG=False, CACHES=self.caches(redis)):
+            self.assertEqual(check_shared_cache(None), [])
+
+
+class TokenRotationTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="traveller@test.com", password="testpass"
+        )
+        self.refresh = RefreshToken.for_user(self.user)
+
+    def test_refresh_rotates_and_is_single_use(self):
+        res = self.client.post(REFRESH_URL, {"refresh": str(self.refresh)})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res.data["refresh"], str(self.refresh))
+
+        replay = self.client.post(REFRESH_URL, {"refresh": str(self.refresh)})
+        self.assertEqual(replay.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        res = self.client.post(REFRESH_URL, {"refresh": res.data["refresh"]})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_revoke(self):
+        access = str(self.refresh.access_token)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+        self.assertEqual(
+            self.client.get(ME_URL).status_code, status.HTTP_200_OK
+        )
+
+        res = self.client.post(
+            REVOKE_URL, {"refresh": str(self.refresh), "access": access}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        res = self.client.get(ME_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+        res = self.client.post(REFRESH_URL, {"refresh": str(self.refresh)})
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+        res = self.client.post(VERIFY_URL, {"token": access})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bad_access_token_revokes_nothing(self):
+        res = self.client.post(
+            REVOKE_URL, {"refresh": str(self.refresh), "access": "garbage"}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+        res = self.client.post(REFRESH_URL, {"refresh": str(self.refresh)})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
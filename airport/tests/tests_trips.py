@@ -0,0 +1,106 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+
+from airport.models import Ticket
+from airport.tests.tests_orders import ORDER_URL, OrderTestMixin
+
+TRIPS_URL = reverse("user:trips")
+
+
+class MyTripsTests(OrderTestMixin, TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        cache.clear()
+
+    def get_trips(self):
+        res = self.client.get(TRIPS_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res.json()
+
+    def test_upcoming_trips_soonest_first(self):
+        later = self.create_flight(days=20)
+        self.create_order((2, 1), (2, 2), flight=later)
+        order = self.create_order((1, 1))
+        self.create_order((1, 1), flight=self.create_flight(days=-3))
+
+        data = self.get_trips()
+
+        self.assertEqual(
+            data["counts"],
+            {"orders": 3, "upcoming_flights": 2, "upcoming_tickets": 3},
+        )
+        self.assertEqual(
+            [trip["flight"] for trip in data["trips"]],
+            [self.flight.id, later.id],
+        )
+        self.assertEqual(
+            data["trips"][0]["route"], "Boryspil (Kyiv) - Heathrow (London)"
+        )
+        self.assertEqual(data["trips"][0]["orders"], [order.id])
+        self.assertEqual(
+            data["trips"][1]["seats"],
+            [{"row": 2, "seat": 1}, {"row": 2, "seat": 2}],
+        )
+
+    def test_served_from_cache(self):
+        self.create_order((1, 1))
+        self.get_trips()
+
+        with self.assertNumQueries(0):
+            self.get_trips()
+
+    def test_order_creation_invalidates(self):
+        self.get_trips()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            res = self.client.post(
+                ORDER_URL,
+                {"tickets": [{"row": 3, "seat": 3, "flight": self.flight.id}]},
+                format="json",
+            )
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+        self.assertEqual(self.get_trips()["counts"]["upcoming_tickets"], 1)
+
+    def test_flight_change_invalidates(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_order((1, 1))
+        self.get_trips()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.flight.departure_time -= timedelta(days=10)
+            self.flight.arrival_time -= timedelta(days=10)
+            self.flight.save()
+
+        self.assertEqual(self.get_trips()["trips"], [])
+
+    def test_flight_deletion_invalidates(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_order((1, 1))
+        self.get_trips()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.flight.delete()
+
+        self.assertEqual(self.get_trips()["counts"]["upcoming_flights"], 0)
+
+    def test_ticket_deletion_invalidates(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            order = self.create_order((1, 1), (1, 2))
+        self.get_trips()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Ticket.objects.filter(order=order, seat=2).first().delete()
+
+        self.assertEqual(self.get_trips()["counts"]["upcoming_tickets"], 1)
+
+    def test_requires_authentication(self):
+        self.client.force_authenticate(None)
+
+        res = self.client.get(TRIPS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
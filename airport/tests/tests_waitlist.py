@@ -0,0 +1,236 @@
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import IntegrityError, connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+
+from airport.models import (
+    Order,
+    Ticket,
+    WaitlistAllocationJob,
+    WaitlistEntry,
+)
+from airport.seating import FreeSeatMap
+from airport.tests.tests_orders import OrderTestMixin
+from airport import waitlist
+from airport.waitlist import allocate_waitlist, process_waitlist_jobs
+
+WAITLIST_URL = reverse("airport:waitlistentry-list")
+
+
+def detail_waitlist_url(entry):
+    return reverse("airport:waitlistentry-detail", args=[entry.id])
+
+
+class FreeSeatMapTests(SimpleTestCase):
+    def test_party_sits_together(self):
+        seats = FreeSeatMap(3, 4, taken=[(1, 2), (2, 1)])
+
+        self.assertEqual(seats.take(3), [(2, 2), (2, 3), (2, 4)])
+        self.assertEqual(seats.free, 7)
+
+    def test_party_split_when_no_row_fits(self):
+        seats = FreeSeatMap(2, 3, taken=[(1, 2), (2, 2)])
+
+        self.assertEqual(seats.take(3), [(1, 1), (1, 3), (2, 1)])
+        self.assertIsNone(seats.take(2))
+
+    def test_release(self):
+        seats = FreeSeatMap(1, 2, taken=[(1, 1), (1, 2)])
+        seats.release(1, 2)
+        seats.release(1, 2)
+
+        self.assertEqual(seats.free, 1)
+        self.assertEqual(seats.take(1), [(1, 2)])
+
+
+class WaitlistTests(OrderTestMixin, TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        cache.clear()
+        self.sold_out_order = self.fill_flight()
+
+    def fill_flight(self):
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.bulk_create(
+            Ticket(row=row, seat=seat, flight=self.flight, order=order)
+            for row in range(1, 11)
+            for seat in range(1, 7)
+        )
+        return order
+
+    def create_entries(self, count, seats=1, priority=0):
+        users = get_user_model().objects.bulk_create(
+            get_user_model()(email=f"waiting{number}-{priority}@test.com")
+            for number in range(count)
+        )
+        return WaitlistEntry.objects.bulk_create(
+            WaitlistEntry(
+                user=user, flight=self.flight, seats=seats, priority=priority
+            )
+            for user in users
+        )
+
+    def release(self, *seats):
+        with self.captureOnCommitCallbacks(execute=True):
+            for row, seat in seats:
+                Ticket.objects.get(
+                    flight=self.flight, row=row, seat=seat
+                ).delete()
+        process_waitlist_jobs()
+
+    def test_join_sold_out_flight(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            res = self.client.post(
+                WAITLIST_URL, {"flight": self.flight.id, "seats": 2}
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            WaitlistEntry.objects.get().status, WaitlistEntry.Status.WAITING
+        )
+
+        res = self.client.post(WAITLIST_URL, {"flight": self.flight.id})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_released_seats_follow_priority_then_fifo(self):
+        first, second = self.create_entries(2)
+        (party,) = self.create_entries(1, seats=3, priority=1)
+        (vip,) = self.create_entries(1, priority=2)
+
+        self.release((4, 1), (4, 2))
+
+        statuses = dict(WaitlistEntry.objects.values_list("id", "status"))
+        self.assertEqual(statuses[vip.id], WaitlistEntry.Status.ALLOCATED)
+        self.assertEqual(statuses[party.id], WaitlistEntry.Status.WAITING)
+        self.assertEqual(statuses[first.id], WaitlistEntry.Status.ALLOCATED)
+        self.assertEqual(statuses[second.id], WaitlistEntry.Status.WAITING)
+
+        vip.refresh_from_db()
+        self.assertEqual(vip.order.user, vip.user)
+        self.assertEqual(
+            list(vip.order.tickets.values_list("row", "seat")), [(4, 1)]
+        )
+
+    def test_party_gets_adjacent_seats(self):
+        (party,) = self.create_entries(1, seats=2)
+
+        self.release((3, 1), (5, 4), (5, 5))
+
+        party.refresh_from_db()
+        self.assertEqual(
+            list(party.order.tickets.values_list("row", "seat")),
+            [(5, 4), (5, 5)],
+        )
+
+    def test_query_count_independent_of_queue_length(self):
+        def allocation_queries():
+            Ticket.objects.filter(flight=self.flight, row__in=(1, 2)).delete()
+            cache.clear()
+            with CaptureQueriesContext(connection) as queries:
+                allocated = allocate_waitlist(self.flight.id)
+            self.assertEqual(allocated, 12)
+            return len(queries)
+
+        self.create_entries(100)
+        short_queue = allocation_queries()
+        self.create_entries(2000, priority=1)
+
+        self.assertEqual(allocation_queries(), short_queue)
+        self.assertEqual(
+            WaitlistEntry.objects.filter(
+                status=WaitlistEntry.Status.WAITING
+            ).count(),
+            2076,
+        )
+
+    def test_cancelled_entry_is_skipped(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(WAITLIST_URL, {"flight": self.flight.id})
+        entry = WaitlistEntry.objects.get()
+
+        res = self.client.delete(detail_waitlist_url(entry))
+        self.release((1, 1))
+
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        entry.refresh_from_db()
+        self.assertEqual(entry.status, WaitlistEntry.Status.CANCELLED)
+        self.assertIsNone(entry.order)
+
+    def test_departed_flight_rejected(self):
+        past = self.create_flight(days=-1)
+
+        res = self.client.post(WAITLIST_URL, {"flight": past.id})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_command_catches_up(self):
+        self.create_entries(3)
+        self.sold_out_order.tickets.filter(row=1, seat__lte=2).delete()
+        out = StringIO()
+
+        call_command("allocate_waitlists", stdout=out)
+
+        self.assertIn("Allocated 2 waitlist entries", out.getvalue())
+
+    def test_release_queues_allocation_for_the_worker(self):
+        (entry,) = self.create_entries(1)
+
+        with mock.patch.object(waitlist, "allocate_waitlist") as allocate:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.sold_out_order.tickets.filter(row=1, seat__lte=2).delete()
+        allocate.assert_not_called()
+        # One job per flight and transaction, whatever the seats released
+        self.assertEqual(
+            list(WaitlistAllocationJob.objects.values_list("flight_id")),
+            [(self.flight.id,)],
+        )
+
+        self.assertEqual(process_waitlist_jobs(), 1)
+
+        entry.refresh_from_db()
+        self.assertEqual(entry.status, WaitlistEntry.Status.ALLOCATED)
+        self.assertFalse(WaitlistAllocationJob.objects.exists())
+
+    def test_release_without_waiting_entries_queues_nothing(self):
+        self.release((1, 1))
+
+        self.assertFalse(WaitlistAllocationJob.objects.exists())
+
+    def test_failed_allocation_is_logged_and_dropped(self):
+        (entry,) = self.create_entries(1)
+        with self.captureOnCommitCallbacks(execute=True):
+            Ticket.objects.filter(flight=self.flight, row=1, seat=1).delete()
+
+        with mock.patch.object(
+            waitlist, "allocate_waitlist", side_effect=IntegrityError
+        ), self.assertLogs("airport.waitlist", "ERROR"):
+            self.assertEqual(process_waitlist_jobs(), 1)
+
+        entry.refresh_from_db()
+        self.assertEqual(entry.status, WaitlistEntry.Status.WAITING)
+        call_command("allocate_waitlists", stdout=StringIO())
+        entry.refresh_from_db()
+        self.assertEqual(entry.status, WaitlistEntry.Status.ALLOCATED)
+
+    def test_worker_command(self):
+        self.create_entries(2)
+        with self.captureOnCommitCallbacks(execute=True):
+            Ticket.objects.filter(flight=self.flight, row=1, seat=1).delete()
+        out = StringIO()
+
+        call_command("process_waitlist_jobs", "--once", stdout=out)
+
+        self.assertIn("Processed 1 waitlist jobs.", out.getvalue())
+        self.assertEqual(
+            WaitlistEntry.objects.filter(
+                status=WaitlistEntry.Status.ALLOCATED
+            ).count(),
+            1,
+        )
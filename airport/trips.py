@@ -0,0 +1,140 @@
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.fields import DateTimeField
+
+from .models import ArchivedOrder, Order, Route, Ticket
+
+_pending = threading.local()
+
+
+def trips_key(user_id) -> str:
+    return f"trips:{user_id}"
+
+
+def build_trips(user_id, now=None) -> dict:
+    """Upcoming flights of a user with their seats, plus order counts.
+
+    One query walks order -> ticket -> flight, reading the tickets from
+    the covering (order, flight, row, seat) index; two more count the
+    current and archived orders.
+    """
+    now = now or timezone.now()
+    tickets = (
+        Ticket.objects.filter(
+            order__user_id=user_id, flight__departure_time__gt=now
+        )
+        .annotate(route=Route.label_expression("flight__route__"))
+        .order_by("flight__departure_time", "flight_id", "row", "seat")
+        .values_list(
+            "flight_id",
+            "flight__departure_time",
+            "flight__arrival_time",
+            "route",
+            "order_id",
+            "row",
+            "seat",
+        )
+    )
+    date_field = DateTimeField()
+    trips = []
+    by_flight = {}
+    for flight_id, departure, arrival, route, order_id, row, seat in tickets:
+        trip = by_flight.get(flight_id)
+        if trip is None:
+            trip = by_flight[flight_id] = {
+                "flight": flight_id,
+                "route": route,
+                "departure_time": date_field.to_representation(departure),
+                "arrival_time": date_field.to_representation(arrival),
+                "orders": [],
+                "seats": [],
+            }
+            trips.append(trip)
+        if order_id not in trip["orders"]:
+            trip["orders"].append(order_id)
+        trip["seats"].append({"row": row, "seat": seat})
+
+    return {
+        "counts": {
+            "orders": Order.objects.filter(user_id=user_id).count()
+            + ArchivedOrder.objects.filter(user_id=user_id).count(),
+            "upcoming_flights": len(trips),
+            "upcoming_tickets": sum(len(trip["seats"]) for trip in trips),
+        },
+        "trips": trips,
+    }
+
+
+def get_trips(user_id) -> dict:
+    """Cached build_trips, kept no longer than the next departure."""
+    trips = cache.get(trips_key(user_id))
+    if trips is None:
+        now = timezone.now()
+        trips = build_trips(user_id, now)
+        timeout = settings.TRIPS_CACHE_TTL
+        if trips["trips"]:
+            # The first trip stops being upcoming once it departs
+            departure = parse_datetime(trips["trips"][0]["departure_time"])
+            timeout = min(
+                timeout, max(int((departure - now).total_seconds()), 1)
+            )
+        cache.set(trips_key(user_id), trips, timeout)
+    return trips
+
+
+def invalidate_trips(user_ids):
+    cache.delete_many([trips_key(user_id) for user_id in user_ids])
+
+
+def _flush_pending_invalidations():
+    user_ids = getattr(_pending, "user_ids", None) or set()
+    flight_ids = getattr(_pending, "flight_ids", None)
+    order_ids = getattr(_pending, "order_ids", None)
+    _pending.user_ids = set()
+    _pending.flight_ids = set()
+    _pending.order_ids = set()
+    if order_ids:
+        user_ids |= set(
+            Order.objects.filter(id__in=order_ids).values_list(
+                "user_id", flat=True
+            )
+        )
+    if flight_ids:
+        user_ids |= set(
+            Ticket.objects.filter(flight_id__in=flight_ids)
+            .order_by()
+            .values_list("order__user_id", flat=True)
+            .distinct()
+        )
+    if user_ids:
+        invalidate_trips(user_ids)
+
+
+def _schedule(name, ids):
+    if not hasattr(_pending, name):
+        setattr(_pending, name, set())
+    getattr(_pending, name).update(ids)
+    transaction.on_commit(_flush_pending_invalidations)
+
+
+def schedule_trips_invalidation(user_ids):
+    """Drop the users' cached trips once the current transaction commits."""
+    _schedule("user_ids", user_ids)
+
+
+def schedule_flight_trips_invalidation(flight_ids):
+    """Drop the cached trips of everyone holding a ticket on the flights.
+
+    The holders are looked up after the commit, once per transaction.
+    """
+    _schedule("flight_ids", flight_ids)
+
+
+def schedule_order_trips_invalidation(order_ids):
+    """Like schedule_trips_invalidation, for the owners of the orders."""
+    _schedule("order_ids", order_ids)
@@ -8,6 +8,9 @@ from .views import (
     CrewViewSet,
     FlightViewSet,
     OrderViewSet,
+    BookingJobViewSet,
+    WaitlistViewSet,
+    FlightLoadAnalyticsView,
 )
 
 router = DefaultRouter()
@@ -18,9 +21,16 @@ router.register("airplanes", AirplaneViewSet)
 router.register("crews", CrewViewSet)
 router.register("flights", FlightViewSet)
 router.register("orders", OrderViewSet)
+router.register("booking_jobs", BookingJobViewSet)
+router.register("waitlist", WaitlistViewSet)
 
 urlpatterns = [
     path('', include(router.urls)),
+    path(
+        "analytics/flight-load/",
+        FlightLoadAnalyticsView.as_view(),
+        name="analytics-flight-load",
+    ),
 ]
 
 app_name = "airport"
@@ -1,22 +1,40 @@
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
 from django.db.models import F, Count, Q, Prefetch
 from drf_spectacular.types import OpenApiTypes
-from drf_spectacular.utils import extend_schema, OpenApiParameter
-from rest_framework import viewsets
+from drf_spectacular.utils import (
+    extend_schema,
+    extend_schema_view,
+    inline_serializer,
+    OpenApiParameter,
+)
+from rest_framework import mixins, serializers, viewsets
+from rest_framework.decorators import action
 from rest_framework.pagination import PageNumberPagination
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.reverse import reverse
 from rest_framework.views import APIView
 
-
+from .analytics import GROUPINGS, flight_load_report
+from .booking import QueuedBookingMixin
+from .fares import price_tables
+from .fieldsets import SPARSE_FIELDSET_PARAMETERS, SparseFieldsetsViewMixin
+from .geo import get_airport_index
+from .idempotency import IDEMPOTENCY_HEADER, IdempotentCreateMixin
 from .models import (
     Airport,
     Route,
     Airplane,
     AirplaneType,
+    ArchivedOrder,
+    BookingJob,
     Crew,
     Flight,
+    FlightLoad,
     Order,
+    WaitlistEntry,
 )
 from .permissions import IsAdminOrIfAuthenticatedReadOnly
 from .serializers import (
@@ -26,22 +44,45 @@ from .serializers import (
     RouteSerializer,
     AirplaneSerializer,
     AirplaneTypeSerializer,
+    ArchivedOrderSerializer,
+    BookingJobSerializer,
     CrewSerializer,
     FlightSerializer,
     FlightListSerializer,
     FlightDetailSerializer,
     FlightCreateSerializer,
     OrderSerializer,
+    WaitlistEntrySerializer,
+)
+from .streaming import StreamingListMixin
+
+
+sparse_fieldsets_schema = extend_schema_view(
+    list=extend_schema(parameters=SPARSE_FIELDSET_PARAMETERS),
+    retrieve=extend_schema(parameters=SPARSE_FIELDSET_PARAMETERS),
 )
 
 
+MAX_NEAREST = 50
+
+
 class Pagination(PageNumberPagination):
     page_size = 3
     page_size_query_param = "page_size"
     max_page_size = 100
 
 
-class AirportViewSet(viewsets.ModelViewSet):
+class OrderPagination(Pagination):
+    """Pagination where ?page_size=all streams the whole order history."""
+
+    def get_page_size(self, request):
+        if request.query_params.get(self.page_size_query_param) == "all":
+            return None
+        return super().get_page_size(request)
+
+
+@sparse_fieldsets_schema
+class AirportViewSet(SparseFieldsetsViewMixin, viewsets.ModelViewSet):
     queryset = Airport.objects.all()
     serializer_class = AirportSerializer
     pagination_class = Pagination
@@ -63,17 +104,12 @@ class AirportViewSet(viewsets.ModelViewSet):
         queryset = queryset.filter(query).distinct()
 
         if self.action == "retrieve":
-            departure_routes = Route.objects.select_related(
-                "source", "destination"
-            )
-            arrival_routes = Route.objects.select_related(
-                "source", "destination"
-            )
-
-            queryset = queryset.prefetch_related(
-                Prefetch("departure_routes", queryset=departure_routes),
-                Prefetch("arrival_routes", queryset=arrival_routes),
-            )
+            routes = Route.objects.select_related("source", "destination")
+            for related_name in ("departure_routes", "arrival_routes"):
+                if self.wants_field(related_name):
+                    queryset = queryset.prefetch_related(
+                        Prefetch(related_name, queryset=routes)
+                    )
         return queryset
 
     @extend_schema(
@@ -100,48 +136,152 @@ class AirportViewSet(viewsets.ModelViewSet):
     def list(self, request, *args, **kwargs):
         return super().list(request, *args, **kwargs)
 
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "lat",
+                type=OpenApiTypes.FLOAT,
+                required=True,
+                description="Latitude of the point (ex. ?lat=50.45)",
+            ),
+            OpenApiParameter(
+                "lon",
+                type=OpenApiTypes.FLOAT,
+                required=True,
+                description="Longitude of the point (ex. ?lon=30.52)",
+            ),
+            OpenApiParameter(
+                "limit",
+                type=OpenApiTypes.INT,
+                description=f"Airports to return, 1 to {MAX_NEAREST}",
+            ),
+            OpenApiParameter(
+                "max_km",
+                type=OpenApiTypes.FLOAT,
+                description="Ignore airports further away (ex. ?max_km=300)",
+            ),
+        ]
+    )
+    @action(detail=False, methods=["get"])
+    def nearest(self, request):
+        """Airports closest to a point, each with `distance_km`."""
+        params = request.query_params
+        try:
+            latitude = float(params["lat"])
+            longitude = float(params["lon"])
+            limit = int(params.get("limit", 5))
+            max_km = params.get("max_km")
+            max_km = float(max_km) if max_km is not None else None
+        except (KeyError, ValueError):
+            raise ValidationError(
+                "lat and lon are required numbers, limit an integer."
+            )
+        if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+            raise ValidationError("lat or lon out of range.")
+        if not 1 <= limit <= MAX_NEAREST:
+            raise ValidationError(
+                f"limit must be in range (1, {MAX_NEAREST})."
+            )
+
+        found = get_airport_index().nearest(latitude, longitude, limit, max_km)
+        airports = Airport.objects.in_bulk([pk for pk, _ in found])
+        nearest = [(airports[pk], km) for pk, km in found if pk in airports]
+        serializer = self.get_serializer(
+            [airport for airport, _ in nearest], many=True
+        )
+        data = serializer.data
+        for item, (_, km) in zip(data, nearest):
+            item["distance_km"] = km
+        return Response(data)
+
     def get_serializer_class(self):
-        if self.action == "list":
+        if self.action in ("list", "nearest"):
             return AirportListSerializer
         if self.action == "retrieve":
             return AirportDetailSerializer
         return self.serializer_class
 
 
-class RouteViewSet(viewsets.ModelViewSet):
-    queryset = Route.objects.select_related("source", "destination")
+@sparse_fieldsets_schema
+class RouteViewSet(SparseFieldsetsViewMixin, viewsets.ModelViewSet):
+    queryset = Route.objects.all()
     serializer_class = RouteSerializer
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
 
+    def get_queryset(self):
+        queryset = self.queryset
+        for related_name in ("source", "destination"):
+            if self.wants_field(related_name):
+                queryset = queryset.select_related(related_name)
+        return queryset
+
 
-class AirplaneViewSet(viewsets.ModelViewSet):
-    queryset = Airplane.objects.select_related("airplane_type")
+@sparse_fieldsets_schema
+class AirplaneViewSet(SparseFieldsetsViewMixin, viewsets.ModelViewSet):
+    queryset = Airplane.objects.all()
     serializer_class = AirplaneSerializer
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
 
+    def get_queryset(self):
+        queryset = self.queryset
+        if self.wants_field("airplane_type"):
+            queryset = queryset.select_related("airplane_type")
+        return queryset
+
 
+@sparse_fieldsets_schema
 class AirplaneTypeViewSet(viewsets.ModelViewSet):
     queryset = AirplaneType.objects.all()
     serializer_class = AirplaneTypeSerializer
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
 
 
+@sparse_fieldsets_schema
 class CrewViewSet(viewsets.ModelViewSet):
     queryset = Crew.objects.all()
     serializer_class = CrewSerializer
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
 
 
-class FlightViewSet(viewsets.ModelViewSet):
-    queryset = Flight.objects.select_related(
-        "route",
-        "airplane",
-        "route__source",
-        "route__destination",
-    ).prefetch_related("crew", "tickets")
+@sparse_fieldsets_schema
+class FlightViewSet(
+    StreamingListMixin, SparseFieldsetsViewMixin, viewsets.ModelViewSet
+):
+    queryset = Flight.objects.all()
     serializer_class = FlightSerializer
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
 
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "source",
+                type=OpenApiTypes.INT,
+                description="Filter by departure airport id (ex. ?source=1)",
+            ),
+            OpenApiParameter(
+                "destination",
+                type=OpenApiTypes.INT,
+                description=(
+                    "Filter by arrival airport id (ex. ?destination=2)"
+                ),
+            ),
+            OpenApiParameter(
+                "date",
+                type=OpenApiTypes.DATE,
+                description="Filter by departure day (ex. ?date=2023-11-01)",
+            ),
+        ]
+    )
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @extend_schema(responses={200: OpenApiTypes.OBJECT})
+    @action(detail=True, methods=["get"])
+    def fares(self, request, pk=None):
+        """Current price and seats left per cabin class."""
+        flight = self.get_object()
+        return Response(price_tables([flight.id])[flight.id])
+
     def get_serializer_class(self):
         if self.action == "list":
             return FlightListSerializer
@@ -153,16 +293,56 @@ class FlightViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         queryset = self.queryset
-        if self.action == "list":
-            queryset = queryset.annotate(
-                tickets_available=F("airplane__rows")
-                * F("airplane__seats_in_row")
-                - Count("tickets")
+        source = self.request.query_params.get("source")
+        destination = self.request.query_params.get("destination")
+        date = self.request.query_params.get("date")
+        try:
+            if source:
+                queryset = queryset.filter(route__source_id=source)
+            if destination:
+                queryset = queryset.filter(route__destination_id=destination)
+            if date:
+                queryset = queryset.filter(departure_time__date=date)
+        except (ValueError, DjangoValidationError):
+            raise ValidationError(
+                "source and destination must be ids, date YYYY-MM-DD."
             )
+
+        if self.wants_field("route"):
+            queryset = queryset.select_related(
+                "route__source", "route__destination"
+            )
+        if self.action == "retrieve":
+            if self.wants_expanded("airplane"):
+                queryset = queryset.select_related("airplane__airplane_type")
+        elif self.wants_field("airplane"):
+            queryset = queryset.select_related("airplane")
+
+        if self.action == "list":
+            if self.wants_field("crew"):
+                queryset = queryset.prefetch_related("crew")
+            if self.wants_field("tickets_available"):
+                queryset = queryset.annotate(
+                    tickets_available=F("airplane__rows")
+                    * F("airplane__seats_in_row")
+                    - Count("tickets")
+                )
+        elif self.action == "retrieve":
+            if self.wants_field("crew"):
+                queryset = queryset.prefetch_related("crew")
+            if self.wants_field("taken_seats"):
+                queryset = queryset.prefetch_related("tickets")
         return queryset
 
 
-class OrderViewSet(viewsets.ModelViewSet):
+@sparse_fieldsets_schema
+class OrderViewSet(
+    IdempotentCreateMixin,
+    QueuedBookingMixin,
+    StreamingListMixin,
+    SparseFieldsetsViewMixin,
+    viewsets.ModelViewSet,
+):
     flight_prefetch = Prefetch(
         "tickets__flight",
         queryset=Flight.objects.select_related(
@@ -173,6 +353,71 @@ class OrderViewSet(viewsets.ModelViewSet):
 
     serializer_class = OrderSerializer
     permission_classes = (IsAuthenticated,)
+    pagination_class = OrderPagination
+
+    def get_queryset(self):
+        if self.action == "archived":
+            return ArchivedOrder.objects.filter(user=self.request.user)
+        queryset = self.queryset
+        if self.action == "list" or not self.wants_field("tickets"):
+            queryset = Order.objects.all()
+        return queryset.filter(user=self.request.user)
+
+    def get_serializer_class(self):
+        if self.action == "archived":
+            return ArchivedOrderSerializer
+        return self.serializer_class
+
+    # The archive is not streamed, so ?page_size=all falls back to pages
+    @action(detail=False, methods=["get"], pagination_class=Pagination)
+    def archived(self, request):
+        """Orders moved to the archive by `manage.py archive_orders`."""
+        page = self.paginate_queryset(self.get_queryset())
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                IDEMPOTENCY_HEADER,
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.HEADER,
+                description=(
+                    "Client-generated key; retries with the same key "
+                    "return the first response instead of a new order"
+                ),
+            ),
+        ]
+    )
+    def create(self, request, *args, **kwargs):
+        return super().create(request, *args, **kwargs)
+
+    def perform_create(self, serializer):
+        serializer.save(user=self.request.user)
+
+
+@sparse_fieldsets_schema
+class BookingJobViewSet(viewsets.ReadOnlyModelViewSet):
+    queryset = BookingJob.objects.all()
+    serializer_class = BookingJobSerializer
+    permission_classes = (IsAuthenticated,)
+    pagination_class = Pagination
+
+    def get_queryset(self):
+        return self.queryset.filter(user=self.request.user)
+
+
+@sparse_fieldsets_schema
+class WaitlistViewSet(
+    mixins.CreateModelMixin,
+    mixins.DestroyModelMixin,
+    viewsets.ReadOnlyModelViewSet,
+):
+    """Queue for seats on sold-out flights; deleting an entry cancels it."""
+
+    queryset = WaitlistEntry.objects.all()
+    serializer_class = WaitlistEntrySerializer
+    permission_classes = (IsAuthenticated,)
     pagination_class = Pagination
 
     def get_queryset(self):
@@ -181,17 +426,93 @@ class OrderViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
+    def perform_destroy(self, instance):
+        if instance.status == WaitlistEntry.Status.WAITING:
+            instance.status = WaitlistEntry.Status.CANCELLED
+            instance.save(update_fields=["status"])
+
+
+class FlightLoadAnalyticsView(APIView):
+    permission_classes = (IsAdminUser,)
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "group_by",
+                type=OpenApiTypes.STR,
+                enum=list(GROUPINGS),
+                description="Group load figures (ex. ?group_by=airport)",
+            ),
+            OpenApiParameter(
+                "date_from",
+                type=OpenApiTypes.DATE,
+                description="First departure day (ex. ?date_from=2023-11-01)",
+            ),
+            OpenApiParameter(
+                "date_to",
+                type=OpenApiTypes.DATE,
+                description="Last departure day (ex. ?date_to=2023-11-30)",
+            ),
+        ],
+        responses={
+            200: inline_serializer(
+                name="FlightLoadReportRow",
+                fields={
+                    # Only the keys of the chosen grouping are present
+                    "route": serializers.IntegerField(required=False),
+                    "source": serializers.IntegerField(required=False),
+                    "source__name": serializers.CharField(required=False),
+                    "destination__name": serializers.CharField(required=False),
+                    "airplane_type": serializers.IntegerField(required=False),
+                    "airplane_type__name": serializers.CharField(
+                        required=False
+                    ),
+                    "departure_date": serializers.DateField(required=False),
+                    "flights": serializers.IntegerField(),
+                    "capacity": serializers.IntegerField(),
+                    "tickets_sold": serializers.IntegerField(),
+                    "seats_available": serializers.IntegerField(),
+                    "load_factor": serializers.FloatField(),
+                },
+                many=True,
+            )
+        },
+    )
+    def get(self, request):
+        group_by = request.query_params.get("group_by", "route")
+        if group_by not in GROUPINGS:
+            raise ValidationError(
+                {"group_by": f"Must be one of: {', '.join(GROUPINGS)}."}
+            )
+
+        queryset = FlightLoad.objects.all()
+        date_from = request.query_params.get("date_from")
+        date_to = request.query_params.get("date_to")
+        try:
+            if date_from:
+                queryset = queryset.filter(departure_date__gte=date_from)
+            if date_to:
+                queryset = queryset.filter(departure_date__lte=date_to)
+            report = flight_load_report(queryset, group_by)
+        except DjangoValidationError as error:
+            raise ValidationError({"date": error.messages})
+
+        return Response(report)
+
 
 class CustomAPIRootView(APIView):
     def get_user_api(self, request):
         return {
             "user_register": reverse("user:create", request=request),
+            "user_bulk_import": reverse("user:bulk_import", request=request),
             "token_obtain_pair": reverse(
                 "user:token_obtain_pair", request=request
             ),
             "token_refresh": reverse("user:token_refresh", request=request),
             "token_verify": reverse("user:token_verify", request=request),
+            "token_revoke": reverse("user:token_revoke", request=request),
             "manage_user": reverse("user:manage", request=request),
+            "my_trips": reverse("user:trips", request=request),
         }
 
     def get_documentation(self, request):
@@ -212,13 +533,18 @@ class CustomAPIRootView(APIView):
             "crews": reverse("airport:crew-list", request=request),
             "flights": reverse("airport:flight-list", request=request),
             "orders": reverse("airport:order-list", request=request),
+            "booking_jobs": reverse(
+                "airport:bookingjob-list", request=request
+            ),
+            "waitlist": reverse("airport:waitlistentry-list", request=request),
         }
 
     def get(self, request):
         data = {
             "User-API": self.get_user_api(request),
-            "Documentation": self.get_documentation(request),
         }
+        if settings.ENABLE_API_DOCS:
+            data["Documentation"] = self.get_documentation(request)
 
         if request.user.is_authenticated:
             data["Airport-API"] = self.get_airport_api(request)
@@ -0,0 +1,209 @@
+import logging
+import threading
+
+from django.db import DatabaseError, IntegrityError, transaction
+from django.utils import timezone
+
+from .analytics import schedule_flight_load_refresh
+from .fares import price_tables, schedule_fare_invalidation, seat_price
+from .models import (
+    Flight,
+    Order,
+    Ticket,
+    WaitlistAllocationJob,
+    WaitlistEntry,
+)
+from .seating import FreeSeatMap
+from .trips import schedule_trips_invalidation
+
+WAITLIST_BATCH_SIZE = 200
+JOB_BATCH_SIZE = 100
+MAX_RETRIES = 3
+
+_pending = threading.local()
+logger = logging.getLogger("airport.waitlist")
+
+
+def _allocate_batch(flight, entries, seats, table, allocated_at):
+    """Give each entry that still fits its seats; returns the served ones."""
+    served = []
+    picks = []
+    for entry in entries:
+        picked = seats.take(entry.seats)
+        if picked is None:
+            continue
+        served.append(entry)
+        picks.append(picked)
+    if not served:
+        return []
+
+    orders = Order.objects.bulk_create(
+        Order(user_id=entry.user_id) for entry in served
+    )
+    Ticket.objects.bulk_create(
+        Ticket(
+            flight=flight,
+            order=order,
+            row=row,
+            seat=seat,
+            price=seat_price(table, row),
+        )
+        for order, picked in zip(orders, picks)
+        for row, seat in picked
+    )
+    for entry, order in zip(served, orders):
+        entry.status = WaitlistEntry.Status.ALLOCATED
+        entry.order = order
+        entry.allocated_at = allocated_at
+    WaitlistEntry.objects.bulk_update(
+        served, ["status", "order", "allocated_at"]
+    )
+    return served
+
+
+def allocate_waitlist(flight_id, batch_size=WAITLIST_BATCH_SIZE) -> int:
+    """Turn waiting entries of an upcoming flight into orders.
+
+    The flight row is locked so allocators for one flight run one at a
+    time. Free seats are read once into a FreeSeatMap; entries are then
+    fetched batch_size at a time, only those asking for no more seats
+    than remain, until the flight is full or nobody fits. A batch that
+    collides with a concurrent booking is retried on a fresh seat map.
+    Returns the number of entries allocated.
+    """
+    waiting = WaitlistEntry.objects.filter(
+        flight_id=flight_id, status=WaitlistEntry.Status.WAITING
+    )
+    if not waiting.exists():
+        return 0
+
+    allocated = 0
+    with transaction.atomic():
+        flight = (
+            Flight.objects.select_for_update(of=("self",))
+            .select_related("airplane")
+            .filter(id=flight_id, departure_time__gt=timezone.now())
+            .first()
+        )
+        if flight is None:
+            return 0
+        seats = FreeSeatMap.for_flight(flight)
+        table = price_tables([flight.id])[flight.id]
+        allocated_at = timezone.now()
+        retries = 0
+        while seats.free:
+            entries = list(
+                waiting.filter(seats__lte=seats.free).only(
+                    "id", "user_id", "seats"
+                )[:batch_size]
+            )
+            if not entries:
+                break
+            try:
+                with transaction.atomic():
+                    served = _allocate_batch(
+                        flight, entries, seats, table, allocated_at
+                    )
+            except IntegrityError:
+                retries += 1
+                if retries > MAX_RETRIES:
+                    raise
+                seats = FreeSeatMap.for_flight(flight)
+                continue
+            allocated += len(served)
+            schedule_trips_invalidation(entry.user_id for entry in served)
+
+        if allocated:
+            # bulk_create skips the ticket signals
+            schedule_flight_load_refresh(flight.id)
+            schedule_fare_invalidation([flight.id])
+    return allocated
+
+
+def _flush_pending_allocations():
+    flight_ids = getattr(_pending, "flight_ids", None)
+    _pending.flight_ids = set()
+    if not flight_ids:
+        return
+    try:
+        WaitlistAllocationJob.objects.bulk_create(
+            WaitlistAllocationJob(flight_id=flight_id)
+            for flight_id in WaitlistEntry.objects.filter(
+                flight_id__in=flight_ids,
+                status=WaitlistEntry.Status.WAITING,
+            )
+            .order_by()
+            .values_list("flight_id", flat=True)
+            .distinct()
+        )
+    except Exception:
+        # Runs after the request's own commit, which must not turn into
+        # a 500; `manage.py allocate_waitlists` catches up
+        logger.exception(
+            "Could not queue waitlist allocation for flights %s",
+            sorted(flight_ids),
+        )
+
+
+def schedule_waitlist_allocation(flight_id):
+    """Queue the flight for the allocator once the transaction commits.
+
+    Only flights with waiting entries are queued, with one insert per
+    transaction; `manage.py process_waitlist_jobs` then allocates them,
+    so the request releasing the seats does not.
+    """
+    if not hasattr(_pending, "flight_ids"):
+        _pending.flight_ids = set()
+    _pending.flight_ids.add(flight_id)
+    transaction.on_commit(_flush_pending_allocations)
+
+
+def process_waitlist_jobs(batch_size=JOB_BATCH_SIZE) -> int:
+    """Allocate the flights of up to batch_size queued jobs.
+
+    Jobs are claimed with SKIP LOCKED, so several workers can run at
+    once; repeated jobs for a flight allocate it once. A flight that
+    fails is logged and left to `manage.py allocate_waitlists`. Returns
+    the number of jobs processed.
+    """
+    with transaction.atomic():
+        jobs = list(
+            WaitlistAllocationJob.objects.select_for_update(
+                skip_locked=True
+            ).values_list("id", "flight_id")[:batch_size]
+        )
+        if not jobs:
+            return 0
+        for flight_id in sorted({flight_id for _, flight_id in jobs}):
+            try:
+                with transaction.atomic():
+                    allocate_waitlist(flight_id)
+            except DatabaseError:
+                logger.exception(
+                    "Waitlist allocation failed for flight %s", flight_id
+                )
+        WaitlistAllocationJob.objects.filter(
+            id__in=[job_id for job_id, _ in jobs]
+        ).delete()
+    return len(jobs)
+
+
+def allocate_waitlists(flight_ids=None, batch_size=WAITLIST_BATCH_SIZE):
+    """Allocate every upcoming flight with waiting entries (or the given).
+
+    Returns the number of entries allocated.
+    """
+    if flight_ids is None:
+        flight_ids = (
+            WaitlistEntry.objects.filter(
+                status=WaitlistEntry.Status.WAITING,
+                flight__departure_time__gt=timezone.now(),
+            )
+            .order_by("flight_id")
+            .values_list("flight_id", flat=True)
+            .distinct()
+        )
+    return sum(
+        allocate_waitlist(flight_id, batch_size)
+        for flight_id in list(flight_ids)
+    )
@@ -0,0 +1,308 @@
+import cProfile
+import io
+import pstats
+import threading
+import time
+from bisect import bisect_left
+
+from django.conf import settings
+from django.db import connection
+from django.http import HttpResponse
+from drf_spectacular.utils import extend_schema
+from rest_framework.permissions import IsAdminUser
+from rest_framework.request import Request
+from rest_framework.views import APIView
+from rest_framework_simplejwt.exceptions import (
+    AuthenticationFailed,
+    InvalidToken,
+)
+
+from user.authentication import RevocableJWTAuthentication
+
+LATENCY_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+PROFILE_PARAM = "_profile"
+PROFILE_LINES = 60
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class EndpointStats:
+    __slots__ = (
+        "buckets",
+        "count",
+        "duration",
+        "db_queries",
+        "db_duration",
+        "view_duration",
+        "render_duration",
+        "response_bytes",
+    )
+
+    def __init__(self):
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.duration = 0.0
+        self.db_queries = 0
+        self.db_duration = 0.0
+        self.view_duration = 0.0
+        self.render_duration = 0.0
+        self.response_bytes = 0
+
+
+class MetricsRegistry:
+    """In-process per-endpoint request statistics."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def observe(self, labels, sample):
+        with self._lock:
+            stats = self._stats.get(labels)
+            if stats is None:
+                stats = self._stats[labels] = EndpointStats()
+            stats.buckets[bisect_left(LATENCY_BUCKETS, sample.duration)] += 1
+            stats.count += 1
+            stats.duration += sample.duration
+            stats.db_queries += sample.db_queries
+            stats.db_duration += sample.db_duration
+            stats.view_duration += max(
+                sample.view_duration - sample.view_db_duration, 0.0
+            )
+            stats.render_duration += sample.render_duration
+            stats.response_bytes += sample.response_bytes
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+    def render_prometheus(self) -> str:
+        with self._lock:
+            snapshot = sorted(self._stats.items())
+            lines = []
+            lines += [
+                "# HELP airport_request_duration_seconds "
+                "Request latency per view and action.",
+                "# TYPE airport_request_duration_seconds histogram",
+            ]
+            for labels, stats in snapshot:
+                label = _format_labels(labels)
+                cumulative = 0
+                for bound, count in zip(LATENCY_BUCKETS, stats.buckets):
+                    cumulative += count
+                    lines.append(
+                        "airport_request_duration_seconds_bucket"
+                        f'{{{label},le="{bound}"}} {cumulative}'
+                    )
+                lines.append(
+                    "airport_request_duration_seconds_bucket"
+                    f'{{{label},le="+Inf"}} {stats.count}'
+                )
+                lines.append(
+                    f"airport_request_duration_seconds_sum{{{label}}} "
+                    f"{stats.duration}"
+                )
+                lines.append(
+                    f"airport_request_duration_seconds_count{{{label}}} "
+                    f"{stats.count}"
+                )
+
+            counters = (
+                (
+                    "airport_db_queries_total",
+                    "Database queries executed.",
+                    "db_queries",
+                ),
+                (
+                    "airport_db_query_duration_seconds_total",
+                    "Time spent waiting for the database.",
+                    "db_duration",
+                ),
+                (
+                    "airport_serialize_duration_seconds_total",
+                    "Time spent in the view outside of database calls, "
+                    "mostly serializers.",
+                    "view_duration",
+                ),
+                (
+                    "airport_render_duration_seconds_total",
+                    "Time spent rendering responses.",
+                    "render_duration",
+                ),
+                (
+                    "airport_response_bytes_total",
+                    "Response body size.",
+                    "response_bytes",
+                ),
+            )
+            for name, help_text, attribute in counters:
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} counter")
+                for labels, stats in snapshot:
+                    lines.append(
+                        f"{name}{{{_format_labels(labels)}}} "
+                        f"{getattr(stats, attribute)}"
+                    )
+        return "\n".join(lines) + "\n"
+
+
+def _format_labels(labels) -> str:
+    view, action = labels
+    return f'view="{view}",action="{action}"'
+
+
+registry = MetricsRegistry()
+
+
+class RequestSample:
+    __slots__ = (
+        "labels",
+        "duration",
+        "db_queries",
+        "db_duration",
+        "view_started",
+        "view_db_started",
+        "view_duration",
+        "view_db_duration",
+        "render_started",
+        "render_duration",
+        "response_bytes",
+    )
+
+    def __init__(self):
+        self.labels = ("unresolved", "")
+        self.duration = 0.0
+        self.db_queries = 0
+        self.db_duration = 0.0
+        self.view_started = None
+        self.view_db_started = 0.0
+        self.view_duration = 0.0
+        self.view_db_duration = 0.0
+        self.render_started = None
+        self.render_duration = 0.0
+        self.response_bytes = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_queries += 1
+            self.db_duration += time.perf_counter() - started
+
+    def rendered(self, response):
+        self.render_duration = time.perf_counter() - self.render_started
+
+
+def view_labels(view_func, method):
+    view_class = getattr(view_func, "cls", None)
+    if view_class is None:
+        return view_func.__name__, method
+    actions = getattr(view_func, "actions", None) or {}
+    return view_class.__name__, actions.get(method.lower(), method)
+
+
+class RequestMetricsMiddleware:
+    """Record latency, DB, serializer and render time per DRF endpoint.
+
+    Staff can also ask for a cProfile capture of a single request with
+    ?_profile=1 when REQUEST_PROFILING_ENABLED is set; the response is then
+    replaced by the profile report.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if self.should_profile(request):
+            return self.profile(request)
+
+        sample = request.metrics_sample = RequestSample()
+        started = time.perf_counter()
+        with connection.execute_wrapper(sample):
+            response = self.get_response(request)
+        sample.duration = time.perf_counter() - started
+
+        if not response.streaming:
+            sample.response_bytes = len(response.content)
+        registry.observe(sample.labels, sample)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        sample = getattr(request, "metrics_sample", None)
+        if sample is not None:
+            sample.labels = view_labels(view_func, request.method)
+            sample.view_started = time.perf_counter()
+            sample.view_db_started = sample.db_duration
+
+    def process_template_response(self, request, response):
+        sample = getattr(request, "metrics_sample", None)
+        if sample is not None and sample.view_started is not None:
+            sample.render_started = time.perf_counter()
+            sample.view_duration = sample.render_started - sample.view_started
+            sample.view_db_duration = (
+                sample.db_duration - sample.view_db_started
+            )
+            # Runs as render() returns, so the middleware inside this one
+            # (e.g. compression) is not counted as render time
+            response.add_post_render_callback(sample.rendered)
+        return response
+
+    @staticmethod
+    def should_profile(request) -> bool:
+        if not settings.REQUEST_PROFILING_ENABLED:
+            return False
+        if request.GET.get(PROFILE_PARAM) != "1":
+            return False
+        return is_staff_request(request)
+
+    def profile(self, request):
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            response = self.get_response(request)
+        finally:
+            profiler.disable()
+
+        report = io.StringIO()
+        report.write(
+            f"{request.method} {request.path} -> {response.status_code}\n\n"
+        )
+        stats = pstats.Stats(profiler, stream=report)
+        stats.sort_stats("cumulative").print_stats(PROFILE_LINES)
+        return HttpResponse(report.getvalue(), content_type="text/plain")
+
+
+def is_staff_request(request) -> bool:
+    """Check staff status before DRF has authenticated the request."""
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        return user.is_staff
+    try:
+        result = RevocableJWTAuthentication().authenticate(Request(request))
+    except (InvalidToken, AuthenticationFailed):
+        return False
+    return result is not None and result[0].is_staff
+
+
+class MetricsView(APIView):
+    permission_classes = (IsAdminUser,)
+
+    # Prometheus text exposition format, not part of the JSON API
+    @extend_schema(exclude=True)
+    def get(self, request):
+        return HttpResponse(
+            registry.render_prometheus(),
+            content_type=PROMETHEUS_CONTENT_TYPE,
+        )
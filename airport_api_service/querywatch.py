@@ -0,0 +1,137 @@
+import logging
+import os
+import re
+import sys
+import sysconfig
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+import django
+import rest_framework
+from django.conf import settings
+from django.db import DatabaseError, connection
+from rest_framework.fields import Field
+
+logger = logging.getLogger("airport.querywatch")
+
+IN_LIST = re.compile(r"\(\s*%s(?:\s*,\s*%s)*\s*\)")
+FRAMEWORK_PATHS = (
+    os.path.dirname(django.__file__),
+    os.path.dirname(rest_framework.__file__),
+    sysconfig.get_paths()["stdlib"],
+    __file__,
+    os.path.join(os.path.dirname(__file__), "metrics.py"),
+)
+
+
+class NPlusOneError(AssertionError):
+    pass
+
+
+def query_shape(sql) -> str:
+    """Collapse IN lists so one query per row shares a single shape."""
+    return IN_LIST.sub("(...)", sql)
+
+
+def query_origin(frame) -> str:
+    """Name the serializer field, or else the app code line, that ran it."""
+    app_line = None
+    while frame is not None:
+        owner = frame.f_locals.get("self")
+        # type() rather than isinstance(), which would evaluate lazy
+        # objects such as request.user and recurse into this wrapper
+        if issubclass(type(owner), Field) and owner.field_name:
+            return f"{type(owner.parent).__name__}.{owner.field_name}"
+        filename = frame.f_code.co_filename
+        if app_line is None and not filename.startswith(FRAMEWORK_PATHS):
+            app_line = f"{filename}:{frame.f_lineno}"
+        frame = frame.f_back
+    return app_line or "unknown"
+
+
+class QueryInspector:
+    """Collect SELECT shapes run under connection.execute_wrapper()."""
+
+    def __init__(self, threshold=None, slow_query_ms=None):
+        options = settings.QUERY_INSPECTOR
+        self.threshold = threshold or options["N_PLUS_ONE_THRESHOLD"]
+        self.slow_query_ms = slow_query_ms or options["SLOW_QUERY_MS"]
+        self.shapes = defaultdict(list)
+        self.slow_queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            if sql.lstrip()[:6].upper() == "SELECT":
+                origin = query_origin(sys._getframe(1))
+                self.shapes[query_shape(sql)].append(origin)
+                if elapsed_ms >= self.slow_query_ms:
+                    self.slow_queries.append((sql, params, elapsed_ms))
+
+    def n_plus_one(self):
+        """Return (shape, count, origins) for each repeated query shape."""
+        return [
+            (shape, len(origins), sorted(set(origins)))
+            for shape, origins in self.shapes.items()
+            if len(origins) >= self.threshold
+        ]
+
+    def report(self, label) -> list:
+        problems = []
+        for shape, count, origins in self.n_plus_one():
+            message = (
+                f"N+1 queries in {label}: {count} x {shape} "
+                f"(from {', '.join(origins)})"
+            )
+            logger.warning(message)
+            problems.append(message)
+        for sql, params, elapsed_ms in self.slow_queries:
+            logger.warning(
+                "Slow query in %s (%.1f ms): %s\n%s",
+                label,
+                elapsed_ms,
+                sql,
+                explain(sql, params),
+            )
+        return problems
+
+
+def explain(sql, params) -> str:
+    prefix = connection.ops.explain_query_prefix()
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(f"{prefix} {sql}", params)
+            return "\n".join(
+                " ".join(str(column) for column in row)
+                for row in cursor.fetchall()
+            )
+    except DatabaseError as error:
+        return f"EXPLAIN failed: {error}"
+
+
+@contextmanager
+def inspect_queries(label="block", raise_on_n_plus_one=None):
+    """Watch queries run inside the block; usable from tests and scripts."""
+    if raise_on_n_plus_one is None:
+        raise_on_n_plus_one = settings.QUERY_INSPECTOR["RAISE"]
+    inspector = QueryInspector()
+    with connection.execute_wrapper(inspector):
+        yield inspector
+    problems = inspector.report(label)
+    if problems and raise_on_n_plus_one:
+        raise NPlusOneError("\n".join(problems))
+
+
+class QueryInspectorMiddleware:
+    """Report N+1 query patterns and slow queries for every request."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with inspect_queries(f"{request.method} {request.path}"):
+            return self.get_response(request)
@@ -0,0 +1,159 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from pathlib import Path
+
+import django
+import drf_spectacular
+import rest_framework
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from drf_spectacular.settings import spectacular_settings
+from drf_spectacular.views import SpectacularAPIView
+from rest_framework.utils.encoders import JSONEncoder
+
+logger = logging.getLogger("airport.schema")
+
+SCHEMA_PACKAGES = ("airport", "user", "airport_api_service")
+MAX_RENDERED_VARIANTS = 16
+
+
+def schema_version() -> str:
+    """Hash everything the generated schema depends on.
+
+    Any deploy changes the source files, library versions or settings
+    hashed here, so a schema stored by an older release is never served.
+    """
+    digest = hashlib.sha256(
+        repr(
+            (
+                os.environ.get("RELEASE_VERSION"),
+                django.__version__,
+                rest_framework.VERSION,
+                drf_spectacular.__version__,
+                settings.REST_FRAMEWORK,
+                settings.SPECTACULAR_SETTINGS,
+            )
+        ).encode()
+    )
+    for package in SCHEMA_PACKAGES:
+        for path in sorted(Path(settings.BASE_DIR, package).rglob("*.py")):
+            stat = path.stat()
+            digest.update(f"{path}:{stat.st_mtime_ns}:{stat.st_size}".encode())
+    return digest.hexdigest()[:16]
+
+
+def generate_schema() -> dict:
+    generator = spectacular_settings.DEFAULT_GENERATOR_CLASS(
+        urlconf=spectacular_settings.SERVE_URLCONF
+    )
+    schema = generator.get_schema(
+        request=None, public=spectacular_settings.SERVE_PUBLIC
+    )
+    # Round trip so fresh and stored schemas render identically
+    return json.loads(json.dumps(schema, cls=JSONEncoder))
+
+
+def write_schema_file(version, schema, path=None) -> Path:
+    path = Path(path or settings.SCHEMA_CACHE_FILE)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile(
+        "w", dir=path.parent, suffix=".tmp", delete=False
+    ) as file:
+        json.dump({"version": version, "schema": schema}, file)
+    os.replace(file.name, path)
+    return path
+
+
+def read_schema_file(version, path=None):
+    try:
+        stored = json.loads(
+            Path(path or settings.SCHEMA_CACHE_FILE).read_text()
+        )
+    except (OSError, ValueError):
+        return None
+    if not isinstance(stored, dict) or stored.get("version") != version:
+        return None
+    return stored.get("schema")
+
+
+class SchemaCache:
+    """Process-wide OpenAPI schema, loaded from disk or generated once."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        self.version = None
+        self.schema = None
+        self.rendered = {}
+
+    def load(self):
+        if self.schema is None:
+            with self.lock:
+                if self.schema is None:
+                    self.version, self.schema = self.load_or_generate()
+        return self.version, self.schema
+
+    @staticmethod
+    def load_or_generate():
+        version = schema_version()
+        schema = read_schema_file(version)
+        if schema is None:
+            schema = generate_schema()
+            try:
+                write_schema_file(version, schema)
+            except OSError as error:
+                logger.warning("Could not store the schema: %s", error)
+        return version, schema
+
+    def render(self, renderer, media_type):
+        """Return (body, etag) for the negotiated renderer and media type."""
+        variant = self.rendered.get(media_type)
+        if variant is None:
+            version, schema = self.load()
+            body = renderer.render(schema, media_type, {})
+            etag = f'"{version}-{hashlib.sha256(body).hexdigest()[:16]}"'
+            variant = (body, etag)
+            if len(self.rendered) < MAX_RENDERED_VARIANTS:
+                self.rendered[media_type] = variant
+        return variant
+
+
+schema_cache = SchemaCache()
+
+
+class CachedSpectacularAPIView(SpectacularAPIView):
+    """SpectacularAPIView serving pre-rendered bytes with an ETag.
+
+    Requests for a specific version or language are rare and still go
+    through the generator.
+    """
+
+    def _get_schema_response(self, request):
+        if (
+            self.api_version
+            or request.version
+            or request.GET.get("version")
+            or request.GET.get("lang")
+        ):
+            return super()._get_schema_response(request)
+
+        renderer = request.accepted_renderer
+        body, etag = schema_cache.render(renderer, request.accepted_media_type)
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            content_type = request.accepted_media_type
+            if renderer.charset:
+                content_type = f"{content_type}; charset={renderer.charset}"
+            filename = self._get_filename(request, None)
+            response = HttpResponse(body, content_type=content_type)
+            response["Content-Disposition"] = f'inline; filename="{filename}"'
+        response["ETag"] = etag
+        patch_cache_control(response, no_cache=True)
+        return response
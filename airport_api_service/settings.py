@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 import os
+import sys
 from datetime import timedelta
 from pathlib import Path
 
@@ -30,6 +31,8 @@ SECRET_KEY = os.environ.get("SECRET_KEY")
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = True
 
+TESTING = len(sys.argv) > 1 and sys.argv[1] == "test"
+
 ALLOWED_HOSTS = []
 
 
@@ -44,14 +47,14 @@ INSTALLED_APPS = [
     "django.contrib.staticfiles",
     "rest_framework",
     "drf_spectacular",
-    "debug_toolbar",
     "airport",
     "user",
 ]
 
 MIDDLEWARE = [
+    "airport_api_service.metrics.RequestMetricsMiddleware",
+    "airport_api_service.compression.CompressionMiddleware",
     "django.middleware.security.SecurityMiddleware",
-    "debug_toolbar.middleware.DebugToolbarMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -60,6 +63,48 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# API-only workers can skip the admin and the schema/doc views, which
+# are the heaviest imports at boot (see `manage.py importtime`)
+ENABLE_ADMIN = os.environ.get("ENABLE_ADMIN", "True") == "True"
+ENABLE_API_DOCS = os.environ.get("ENABLE_API_DOCS", "True") == "True"
+if not ENABLE_ADMIN:
+    INSTALLED_APPS[INSTALLED_APPS.index("django.contrib.admin")] = (
+        "django.contrib.admin.apps.SimpleAdminConfig"
+    )
+
+# The toolbar instruments every request, so it is only loaded on demand
+ENABLE_DEBUG_TOOLBAR = (
+    os.environ.get("ENABLE_DEBUG_TOOLBAR", "False") == "True"
+)
+if ENABLE_DEBUG_TOOLBAR:
+    INSTALLED_APPS.append("debug_toolbar")
+    MIDDLEWARE.insert(
+        MIDDLEWARE.index("django.middleware.security.SecurityMiddleware") + 1,
+        "debug_toolbar.middleware.DebugToolbarMiddleware",
+    )
+
+# N+1 and slow query reports, logged per request in development and tests
+QUERY_INSPECTOR = {
+    "ENABLED": os.environ.get(
+        "QUERY_INSPECTOR_ENABLED", str(DEBUG or TESTING)
+    )
+    == "True",
+    "N_PLUS_ONE_THRESHOLD": 5,
+    "SLOW_QUERY_MS": 100,
+    # Raise NPlusOneError instead of logging, failing the offending test
+    "RAISE": os.environ.get("QUERY_INSPECTOR_RAISE", str(TESTING)) == "True",
+}
+if QUERY_INSPECTOR["ENABLED"]:
+    MIDDLEWARE.insert(
+        MIDDLEWARE.index("django.middleware.security.SecurityMiddleware"),
+        "airport_api_service.querywatch.QueryInspectorMiddleware",
+    )
+
+# Staff may append ?_profile=1 to get a cProfile report instead of the response
+REQUEST_PROFILING_ENABLED = (
+    os.environ.get("REQUEST_PROFILING_ENABLED", "False") == "True"
+)
+
 ROOT_URLCONF = "airport_api_service.urls"
 
 AUTH_USER_MODEL = "user.User"
@@ -100,6 +145,17 @@ DATABASES = {
     }
 }
 
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+
+CACHES = {
+    "default": {
+        "BACKEND": os.environ.get(
+            "CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.environ.get("CACHE_LOCATION", ""),
+    }
+}
 
 
 # Password validation
@@ -120,6 +176,41 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Hashes are re-made with this work factor on each user's next login
+PASSWORD_HASH_ITERATIONS = int(
+    os.environ.get("PASSWORD_HASH_ITERATIONS", 600_000)
+)
+
+PASSWORD_HASHERS = [
+    "user.hashers.TunedPBKDF2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+    "django.contrib.auth.hashers.Argon2PasswordHasher",
+    "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+    "django.contrib.auth.hashers.ScryptPasswordHasher",
+]
+
+AUTHENTICATION_BACKENDS = ["user.login.HashLimitedModelBackend"]
+
+# Passwords hashed at once per process (0 = one per core)
+LOGIN_HASH_WORKERS = int(os.environ.get("LOGIN_HASH_WORKERS", 0))
+# Seconds a login waits for a free hashing slot before answering 429
+LOGIN_HASH_WAIT = float(os.environ.get("LOGIN_HASH_WAIT", 2))
+
+# Processes hashing passwords of bulk user imports (0 = one per core)
+BULK_IMPORT_HASH_WORKERS = int(os.environ.get("BULK_IMPORT_HASH_WORKERS", 0))
+# Rows per api/user/bulk/ request, hashed within the request; a few
+# seconds of hashing, well inside gateway timeouts
+BULK_USER_IMPORT_MAX_ROWS = 100
+
+# Failed logins per account / per client address before logins are
+# refused until the window since the first failure has passed
+LOGIN_MAX_ACCOUNT_FAILURES = int(
+    os.environ.get("LOGIN_MAX_ACCOUNT_FAILURES", 10)
+)
+LOGIN_MAX_IP_FAILURES = int(os.environ.get("LOGIN_MAX_IP_FAILURES", 100))
+LOGIN_FAILURE_WINDOW = int(os.environ.get("LOGIN_FAILURE_WINDOW", 15 * 60))
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/4.2/topics/i18n/
@@ -135,23 +226,56 @@ USE_TZ = True
 REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "user.authentication.RevocableJWTAuthentication",
     ),
     "DEFAULT_THROTTLE_CLASSES": [
         "rest_framework.throttling.AnonRateThrottle",
         "rest_framework.throttling.UserRateThrottle",
     ],
-    "DEFAULT_THROTTLE_RATES": {"anon": "100/day", "user": "1000/day"},
-
-
+    # An empty THROTTLE_RATE_* disables that throttle (used by load tests)
+    "DEFAULT_THROTTLE_RATES": {
+        "anon": os.environ.get("THROTTLE_RATE_ANON", "100/day") or None,
+        "user": os.environ.get("THROTTLE_RATE_USER", "1000/day") or None,
+    },
+    # Reverse proxies in front of the app; client addresses for throttles
+    # and login lockouts are read from X-Forwarded-For only behind them,
+    # as clients could otherwise set it (0 = use REMOTE_ADDR)
+    "NUM_PROXIES": int(os.environ.get("NUM_PROXIES", 0)),
+    "DEFAULT_RENDERER_CLASSES": [
+        "airport_api_service.renderers.FastJSONRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "airport_api_service.renderers.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
 }
 
+# The browsable API renders HTML forms for every response; keep it off
+# in production where only JSON clients talk to the service.
+if os.environ.get("ENABLE_BROWSABLE_API", str(DEBUG)) == "True":
+    REST_FRAMEWORK["DEFAULT_RENDERER_CLASSES"].append(
+        "rest_framework.renderers.BrowsableAPIRenderer"
+    )
+
+# Refresh tokens are single use and, like access tokens, revocable
+# (api/user/token/revoke/), so access tokens can be short lived
 SIMPLE_JWT = {
-    "ACCESS_TOKEN_LIFETIME": timedelta(minutes=600),
+    "ACCESS_TOKEN_LIFETIME": timedelta(
+        minutes=int(os.environ.get("ACCESS_TOKEN_MINUTES", 15))
+    ),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
-    "ROTATE_REFRESH_TOKENS": False,
+    "ROTATE_REFRESH_TOKENS": True,
+    "TOKEN_REFRESH_SERIALIZER": "user.serializers.RotatingTokenRefreshSerializer",
+    "TOKEN_VERIFY_SERIALIZER": "user.serializers.TokenVerifySerializer",
+    "TOKEN_BLACKLIST_SERIALIZER": "user.serializers.TokenRevokeSerializer",
 }
 
+# Revoked access tokens reach other processes within this many seconds
+JWT_REVOCATION_SYNC_SECONDS = int(
+    os.environ.get("JWT_REVOCATION_SYNC_SECONDS", 2)
+)
+
 SPECTACULAR_SETTINGS = {
     "TITLE": "Airport API service",
     "DESCRIPTION": "Order tickets with Airport API service for your flights",
@@ -165,6 +289,42 @@ SPECTACULAR_SETTINGS = {
     },
 }
 
+# Generated OpenAPI schema, reused until the code or settings change
+SCHEMA_CACHE_FILE = os.environ.get(
+    "SCHEMA_CACHE_FILE", BASE_DIR / "var" / "openapi-schema.json"
+)
+
+# Stored responses for retried POSTs carrying an Idempotency-Key header
+IDEMPOTENCY_KEY_TTL = int(os.environ.get("IDEMPOTENCY_KEY_TTL", 24 * 60 * 60))
+IDEMPOTENCY_WAIT_TIMEOUT = 10
+
+# Accept every order as a queued booking job (202) instead of booking inline
+QUEUED_BOOKING = os.environ.get("QUEUED_BOOKING", "False") == "True"
+
+# Smaller responses are sent uncompressed; gzip, br and zstd are negotiated
+COMPRESSION_MIN_SIZE = int(os.environ.get("COMPRESSION_MIN_SIZE", 1024))
+
+# Unpaginated lists longer than one chunk are streamed as a JSON array
+STREAMING_CHUNK_SIZE = 500
+
+# Orders whose flights all departed this long ago move to the archive
+ARCHIVE_AFTER_DAYS = int(os.environ.get("ARCHIVE_AFTER_DAYS", 180))
+
+# Per-flight price tables are rebuilt at least this often (days to departure)
+FARE_CACHE_TTL = int(os.environ.get("FARE_CACHE_TTL", 15 * 60))
+
+# Delivery of flight change notifications: ConsoleBackend, FileBackend
+# (JSON lines at NOTIFICATION_FILE_PATH) or EmailBackend (EMAIL_BACKEND)
+NOTIFICATION_BACKEND = os.environ.get(
+    "NOTIFICATION_BACKEND", "airport.notifications.ConsoleBackend"
+)
+NOTIFICATION_FILE_PATH = os.environ.get(
+    "NOTIFICATION_FILE_PATH", BASE_DIR / "var" / "notifications.jsonl"
+)
+
+# Cached "my trips" are also dropped on bookings and flight changes
+TRIPS_CACHE_TTL = int(os.environ.get("TRIPS_CACHE_TTL", 60 * 60))
+
 # Static files (CSS, JavaScript, Images)
 # https://docs.djangoproject.com/en/4.2/howto/static-files/
 
@@ -0,0 +1,82 @@
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+COLD_START_SCRIPT = """
+import json, sys, time
+started = time.perf_counter()
+from django.core.wsgi import get_wsgi_application
+application = get_wsgi_application()
+from django.urls import get_resolver
+get_resolver().url_patterns
+print(json.dumps({
+    "seconds": time.perf_counter() - started,
+    "modules": sorted(sys.modules),
+}))
+"""
+
+
+def lazy_view(dotted_path, **initkwargs):
+    """URL view importing its class on the first request instead of at boot.
+
+    Meant for rarely hit views with heavy imports such as the API docs.
+    """
+    view = None
+
+    def wrapper(request, *args, **kwargs):
+        nonlocal view
+        if view is None:
+            view = import_string(dotted_path).as_view(**initkwargs)
+        return view(request, *args, **kwargs)
+
+    wrapper.__name__ = dotted_path.rsplit(".", 1)[-1]
+    wrapper.csrf_exempt = True
+    return wrapper
+
+
+def run_cold_start(importtime=False):
+    """Boot the WSGI app and load the URLconf in a fresh interpreter.
+
+    Returns the child's report (seconds, loaded modules) and, with
+    importtime, its raw `-X importtime` output.
+    """
+    command = [sys.executable]
+    if importtime:
+        command += ["-X", "importtime"]
+    env = dict(os.environ)
+    env.setdefault("DJANGO_SETTINGS_MODULE", "airport_api_service.settings")
+    result = subprocess.run(
+        command + ["-c", COLD_START_SCRIPT],
+        cwd=settings.BASE_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.splitlines()[-1]), result.stderr
+
+
+def parse_importtime(output):
+    """Yield (module, self_us, cumulative_us) from `-X importtime` output."""
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, module = line[12:].split("|")
+        if not self_us.strip().isdigit():
+            continue
+        yield module.strip(), int(self_us), int(cumulative_us)
+
+
+def aggregate_importtime(rows, depth=1) -> dict:
+    """Sum self time per package, cut to `depth` dotted components."""
+    totals = defaultdict(lambda: [0, 0])
+    for module, self_us, _ in rows:
+        package = ".".join(module.split(".")[:depth])
+        totals[package][0] += self_us
+        totals[package][1] += 1
+    return dict(totals)
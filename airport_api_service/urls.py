@@ -1,26 +1,47 @@
-from django.contrib import admin
+from django.conf import settings
 from django.urls import path, include
-from drf_spectacular.views import (
-    SpectacularAPIView, SpectacularSwaggerView, SpectacularRedocView
-)
 
 from airport.views import CustomAPIRootView
+from airport_api_service.metrics import MetricsView
+from airport_api_service.startup import lazy_view
 
 urlpatterns = [
-    path("admin/", admin.site.urls),
     path('api/', CustomAPIRootView.as_view(), name='api-root'),
     path("api/airport/", include("airport.urls", namespace="airport")),
     path("api/user/", include("user.urls", namespace="user")),
-    path("api/schema/", SpectacularAPIView.as_view(), name="schema"),
-    path(
-        "api/doc/swagger/",
-        SpectacularSwaggerView.as_view(url_name="schema"),
-        name="swagger-ui",
-    ),
-    path(
-        "api/doc/redoc/",
-        SpectacularRedocView.as_view(url_name="schema"),
-        name="redoc",
-    ),
-    path("__debug__/", include("debug_toolbar.urls")),
+    path("api/metrics/", MetricsView.as_view(), name="metrics"),
 ]
+
+if settings.ENABLE_ADMIN:
+    from django.contrib import admin
+
+    urlpatterns.insert(0, path("admin/", admin.site.urls))
+
+# drf_spectacular.views pulls in the generator and YAML; import on first use
+if settings.ENABLE_API_DOCS:
+    urlpatterns += [
+        path(
+            "api/schema/",
+            lazy_view("airport_api_service.schema.CachedSpectacularAPIView"),
+            name="schema",
+        ),
+        path(
+            "api/doc/swagger/",
+            lazy_view(
+                "drf_spectacular.views.SpectacularSwaggerView",
+                url_name="schema",
+            ),
+            name="swagger-ui",
+        ),
+        path(
+            "api/doc/redoc/",
+            lazy_view(
+                "drf_spectacular.views.SpectacularRedocView",
+                url_name="schema",
+            ),
+            name="redoc",
+        ),
+    ]
+
+if settings.ENABLE_DEBUG_TOOLBAR:
+    urlpatterns.append(path("__debug__/", include("debug_toolbar.urls")))
@@ -0,0 +1,148 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+
+from user.hashers import init_hash_worker
+from user.serializers import BulkUserSerializer
+
+IMPORT_BATCH_SIZE = 500
+# Passwords sent to a worker at a time; a hash takes ~0.2 s at 600k rounds
+HASH_CHUNK_SIZE = 8
+ALREADY_EXISTS_MESSAGE = "user with this email address already exists."
+
+
+def hash_pool(workers=None):
+    """Process pool for hash_passwords, or None to hash in this process."""
+    workers = workers or settings.BULK_IMPORT_HASH_WORKERS or os.cpu_count()
+    if workers == 1:
+        return None
+    # Forking a multithreaded parent can copy locks held by other
+    # threads; spawned workers start clean
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=get_context("spawn"),
+        initializer=init_hash_worker,
+    )
+
+
+def hash_passwords(passwords, pool=None) -> list:
+    """make_password for many passwords, spread over the pool's workers.
+
+    A blank password gives an unusable hash, for accounts that are set up
+    through a password reset.
+    """
+    passwords = [password or None for password in passwords]
+    if pool is None:
+        return [make_password(password) for password in passwords]
+    return list(pool.map(make_password, passwords, chunksize=HASH_CHUNK_SIZE))
+
+
+def existing_emails(emails) -> set:
+    return set(
+        get_user_model()
+        .objects.filter(email__in=emails)
+        .values_list("email", flat=True)
+    )
+
+
+def row_error(number, email, message) -> dict:
+    return {"row": number, "email": email, "errors": {"email": [message]}}
+
+
+def import_users(
+    rows, batch_size=IMPORT_BATCH_SIZE, workers=None, pool=None
+) -> dict:
+    """Create users from dicts like the registration payload.
+
+    Rows are validated one by one and deduplicated; each batch is then
+    checked against existing emails with one query, hashed in a process
+    pool and inserted with one bulk_create that skips conflicting rows;
+    a row whose email a registration took in between is reported like
+    any existing email, and the rest of the import carries on. Returns
+    {"created": count, "errors": [{"row", "email", "errors"}]}, with rows
+    numbered from 1.
+
+    Passwords are hashed in the given executor, which is left running,
+    or else in a process pool of `workers` started for this import.
+    """
+    user_model = get_user_model()
+    created = 0
+    errors = []
+    seen = set()
+    fresh = []
+    for number, row in enumerate(rows, 1):
+        serializer = BulkUserSerializer(data=row)
+        if not serializer.is_valid():
+            errors.append(
+                {
+                    "row": number,
+                    "email": row.get("email"),
+                    "errors": serializer.errors,
+                }
+            )
+            continue
+        data = serializer.validated_data
+        if data["email"] in seen:
+            errors.append(
+                row_error(
+                    number, data["email"], "Duplicate email in this import."
+                )
+            )
+            continue
+        seen.add(data["email"])
+        fresh.append((number, data))
+
+    def drop_taken(pending):
+        taken = existing_emails(data["email"] for _, data in pending)
+        for number, data in pending:
+            if data["email"] in taken:
+                errors.append(
+                    row_error(number, data["email"], ALREADY_EXISTS_MESSAGE)
+                )
+        return [item for item in pending if item[1]["email"] not in taken]
+
+    own_pool = pool is None
+    if own_pool:
+        pool = hash_pool(workers)
+    try:
+        for start in range(0, len(fresh), batch_size):
+            batch = drop_taken(fresh[start : start + batch_size])
+            passwords = hash_passwords(
+                [data.get("password") for _, data in batch], pool
+            )
+            users = {
+                number: user_model.objects.build_user_with_hash(
+                    data["email"],
+                    password,
+                    first_name=data.get("first_name", ""),
+                    last_name=data.get("last_name", ""),
+                )
+                for (number, data), password in zip(batch, passwords)
+            }
+            user_model.objects.bulk_create(
+                users.values(), ignore_conflicts=True
+            )
+            # A registration may have taken an email since the check; its
+            # row was skipped. Salted hashes tell which rows went in.
+            inserted = set(
+                user_model.objects.filter(
+                    email__in=[user.email for user in users.values()],
+                    password__in=[user.password for user in users.values()],
+                ).values_list("email", flat=True)
+            )
+            for number, user in users.items():
+                if user.email not in inserted:
+                    errors.append(
+                        row_error(number, user.email, ALREADY_EXISTS_MESSAGE)
+                    )
+            created += len(inserted)
+    finally:
+        if own_pool and pool is not None:
+            pool.shutdown()
+
+    errors.sort(key=lambda error: error["row"])
+    return {"created": created, "errors": errors}
@@ -0,0 +1,28 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+LOCAL_CACHES = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    """Error outside DEBUG when the default cache is per-process.
+
+    Token revocations, login lockouts and idempotency keys live in the
+    default cache, so every process has to see the same one.
+    """
+    backend = settings.CACHES["default"]["BACKEND"]
+    if settings.DEBUG or backend not in LOCAL_CACHES:
+        return []
+    return [
+        Error(
+            f"The default cache ({backend}) is not shared between "
+            "processes, so revoked tokens, login lockouts and idempotency "
+            "keys only hold within the process that stored them.",
+            hint="Set CACHE_BACKEND and CACHE_LOCATION, e.g. to Redis.",
+            id="user.E001",
+        )
+    ]
@@ -0,0 +1,26 @@
+import django
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+
+
+class TunedPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """PBKDF2-SHA256 with the work factor taken from settings.
+
+    It keeps Django's algorithm name, so existing hashes verify as is and
+    are re-hashed at PASSWORD_HASH_ITERATIONS on the user's next login.
+    """
+
+    @property
+    def iterations(self) -> int:
+        return settings.PASSWORD_HASH_ITERATIONS
+
+
+def init_hash_worker():
+    """Set up Django in a spawned process that hashes passwords.
+
+    Kept apart from modules importing models, which a spawned worker
+    cannot load before this has run.
+    """
+    if not apps.ready:
+        django.setup()
@@ -0,0 +1,163 @@
+import hashlib
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.hashers import (
+    get_hasher,
+    identify_hasher,
+    is_password_usable,
+    make_password,
+)
+from django.core.cache import cache
+from rest_framework.exceptions import Throttled
+
+_pool = None
+_slots = None
+_lock = threading.Lock()
+
+
+class HashingBusy(Throttled):
+    default_detail = "Too many logins in progress, try again shortly."
+
+
+def get_hash_pool() -> ThreadPoolExecutor:
+    """Thread pool hashing many passwords at once, e.g. a bulk import.
+
+    hashlib releases the GIL while hashing, so LOGIN_HASH_WORKERS threads
+    use every core.
+    """
+    global _pool
+    if _pool is None:
+        with _lock:
+            if _pool is None:
+                _pool = ThreadPoolExecutor(
+                    max_workers=settings.LOGIN_HASH_WORKERS or os.cpu_count(),
+                    thread_name_prefix="password-hash",
+                )
+    return _pool
+
+
+@contextmanager
+def hashing_slot():
+    """Hold one of the LOGIN_HASH_WORKERS hashing slots of this process.
+
+    A request waits at most LOGIN_HASH_WAIT seconds for a slot, then gets
+    a 429: during a login storm, threaded workers then hash no more
+    passwords at once than there are cores, and the extra logins fail
+    fast instead of slowing down the ones already hashing.
+    """
+    global _slots
+    if _slots is None:
+        with _lock:
+            if _slots is None:
+                _slots = threading.BoundedSemaphore(
+                    settings.LOGIN_HASH_WORKERS or os.cpu_count()
+                )
+    if not _slots.acquire(timeout=settings.LOGIN_HASH_WAIT):
+        raise HashingBusy(wait=1)
+    try:
+        yield
+    finally:
+        _slots.release()
+
+
+def verify_password(password, encoded):
+    """(is_correct, must_update) for a stored hash, within a hashing slot.
+
+    Mirrors django.contrib.auth.hashers.check_password, minus the setter:
+    the upgrade is saved by the caller, on the request's DB connection.
+    """
+    if password is None or not is_password_usable(encoded):
+        return False, False
+    preferred = get_hasher("default")
+    try:
+        hasher = identify_hasher(encoded)
+    except ValueError:
+        return False, False
+    hasher_changed = hasher.algorithm != preferred.algorithm
+    must_update = hasher_changed or preferred.must_update(encoded)
+    with hashing_slot():
+        is_correct = hasher.verify(password, encoded)
+        if not is_correct and not hasher_changed and must_update:
+            hasher.harden_runtime(password, encoded)
+    return is_correct, must_update
+
+
+def hash_password(password) -> str:
+    """make_password within a hashing slot, for registrations."""
+    with hashing_slot():
+        return make_password(password)
+
+
+def check_password(user, password) -> bool:
+    """user.check_password within a hashing slot, upgrading old hashes."""
+    is_correct, must_update = verify_password(password, user.password)
+    if is_correct and must_update:
+        user.password = hash_password(password)
+        user.save(update_fields=["password"])
+    return is_correct
+
+
+class HashLimitedModelBackend(ModelBackend):
+    """ModelBackend that checks passwords within the hashing slots."""
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        user_model = get_user_model()
+        if username is None:
+            username = kwargs.get(user_model.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        try:
+            user = user_model._default_manager.get_by_natural_key(username)
+        except user_model.DoesNotExist:
+            # Hash anyway, so response times do not reveal unknown accounts
+            hash_password(password)
+            return None
+        if check_password(user, password) and self.user_can_authenticate(user):
+            return user
+        return None
+
+
+def failure_keys(username, ip) -> list:
+    # Hashed, as cache backends like memcached limit key characters
+    account = hashlib.sha256(str(username).lower().encode()).hexdigest()
+    keys = [f"login-failures:account:{account}"]
+    if ip:
+        address = hashlib.sha256(ip.encode()).hexdigest()
+        keys.append(f"login-failures:ip:{address}")
+    return keys
+
+
+def login_blocked(username, ip) -> bool:
+    """Whether the account or the address failed too often lately.
+
+    Blocked logins are refused before any hashing, which is where the
+    CPU of a credential-stuffing run would otherwise go.
+    """
+    limits = (
+        settings.LOGIN_MAX_ACCOUNT_FAILURES,
+        settings.LOGIN_MAX_IP_FAILURES,
+    )
+    keys = failure_keys(username, ip)
+    counts = cache.get_many(keys)
+    return any(counts.get(key, 0) >= limit for key, limit in zip(keys, limits))
+
+
+def record_login_failure(username, ip):
+    """Count a failed login; counters expire LOGIN_FAILURE_WINDOW later."""
+    for key in failure_keys(username, ip):
+        if not cache.add(key, 1, settings.LOGIN_FAILURE_WINDOW):
+            try:
+                cache.incr(key)
+            except ValueError:
+                # Expired between add and incr
+                cache.add(key, 1, settings.LOGIN_FAILURE_WINDOW)
+
+
+def clear_login_failures(username):
+    cache.delete(failure_keys(username, None)[0])
@@ -0,0 +1,74 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+
+from user.hashers import TunedPBKDF2PasswordHasher
+from user.login import verify_password
+
+PASSWORD = "correct horse battery staple"
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure password verifications per second, on one core and "
+        "through the login hashing slots, for the configured work factor "
+        "and any --iterations to compare."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--logins", type=int, default=50)
+        parser.add_argument(
+            "--iterations",
+            type=int,
+            nargs="*",
+            default=[],
+            help="Extra PBKDF2 work factors to compare.",
+        )
+
+    def handle(self, *args, **options):
+        logins = options["logins"]
+        workers = settings.LOGIN_HASH_WORKERS or os.cpu_count()
+        self.stdout.write(
+            f"{'iterations':>12}{'ms/login':>10}{'per core/s':>12}"
+            f"{f'slots x{workers}/s':>14}"
+        )
+        for iterations in [
+            settings.PASSWORD_HASH_ITERATIONS,
+            *options["iterations"],
+        ]:
+            # No LOGIN_HASH_WAIT, measuring throughput rather than 429s
+            with override_settings(
+                PASSWORD_HASH_ITERATIONS=iterations, LOGIN_HASH_WAIT=None
+            ):
+                encoded = TunedPBKDF2PasswordHasher().encode(
+                    PASSWORD, "benchsalt"
+                )
+                started = time.perf_counter()
+                for _ in range(logins):
+                    verify_password(PASSWORD, encoded)
+                serial_s = time.perf_counter() - started
+
+                # Concurrent requests, each waiting for a hashing slot
+                started = time.perf_counter()
+                with ThreadPoolExecutor(max_workers=workers * 2) as clients:
+                    list(
+                        clients.map(
+                            lambda _: verify_password(PASSWORD, encoded),
+                            range(logins),
+                        )
+                    )
+                pooled_s = time.perf_counter() - started
+            self.stdout.write(
+                f"{iterations:>12}{serial_s / logins * 1000:>10.2f}"
+                f"{logins / serial_s:>12.1f}{logins / pooled_s:>14.1f}"
+            )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{os.cpu_count()} cores; PASSWORD_HASH_ITERATIONS="
+                f"{settings.PASSWORD_HASH_ITERATIONS}"
+            )
+        )
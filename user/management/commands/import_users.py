@@ -0,0 +1,44 @@
+import csv
+
+from django.core.management.base import BaseCommand
+
+from user.bulk import IMPORT_BATCH_SIZE, import_users
+
+
+class Command(BaseCommand):
+    help = (
+        "Create users from a CSV file with an email,password,first_name,"
+        "last_name header, hashing passwords across worker processes. "
+        "Rows that cannot be imported are listed with their errors."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument(
+            "--batch-size", type=int, default=IMPORT_BATCH_SIZE
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            help="Hashing processes; overrides BULK_IMPORT_HASH_WORKERS.",
+        )
+
+    def handle(self, *args, **options):
+        with open(options["path"], newline="", encoding="utf-8") as file:
+            rows = [
+                {key: value for key, value in row.items() if value}
+                for row in csv.DictReader(file)
+            ]
+        report = import_users(rows, options["batch_size"], options["workers"])
+        for error in report["errors"]:
+            # The header is line 1 of the file
+            self.stderr.write(
+                f"line {error['row'] + 1} ({error['email']}): "
+                f"{dict(error['errors'])}"
+            )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Created {report['created']} users, "
+                f"skipped {len(report['errors'])} rows."
+            )
+        )
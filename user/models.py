@@ -27,6 +27,24 @@ class UserManager(BaseUserManager):
         extra_fields.setdefault("is_superuser", False)
         return self._create_user(email, password, **extra_fields)
 
+    def build_user_with_hash(self, email, password_hash, **extra_fields):
+        """Return an unsaved regular User with an already hashed password."""
+        if not email:
+            raise ValueError("The given email must be set")
+        extra_fields.setdefault("is_staff", False)
+        extra_fields.setdefault("is_superuser", False)
+        return self.model(
+            email=self.normalize_email(email),
+            password=password_hash,
+            **extra_fields,
+        )
+
+    def create_user_with_hash(self, email, password_hash, **extra_fields):
+        """Create and save a regular User with an already hashed password."""
+        user = self.build_user_with_hash(email, password_hash, **extra_fields)
+        user.save(using=self._db)
+        return user
+
     def create_superuser(self, email, password, **extra_fields):
         """Create and save a SuperUser with the given email and password."""
         extra_fields.setdefault("is_staff", True)
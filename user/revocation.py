@@ -0,0 +1,156 @@
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework_simplejwt.settings import api_settings
+
+SEQUENCE_KEY = "jwt-revoked:seq"
+# Revocations are grouped by the hour their token expires, so whole
+# filters are dropped once every token they cover has expired
+BUCKET_SECONDS = 60 * 60
+SYNC_BATCH_SIZE = 1000
+# A sequence number whose entry is not written yet is retried this long
+GAP_TIMEOUT = 30
+
+
+def revoked_key(jti) -> str:
+    return f"jwt-revoked:jti:{jti}"
+
+
+def log_key(sequence) -> str:
+    return f"jwt-revoked:log:{sequence}"
+
+
+class BloomFilter:
+    """Set membership with false positives but no false negatives.
+
+    With the default 2**18 bits and 7 hashes, about 18 000 items stay
+    below 1% false positives in 32 KiB.
+    """
+
+    def __init__(self, bits=2**18, hashes=7):
+        self.bits = bits
+        self.hashes = hashes
+        self.array = bytearray(bits // 8)
+
+    def positions(self, item):
+        digest = hashlib.blake2b(str(item).encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return (
+            (first + number * second) % self.bits
+            for number in range(self.hashes)
+        )
+
+    def add(self, item):
+        for position in self.positions(item):
+            self.array[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item) -> bool:
+        return all(
+            self.array[position >> 3] >> (position & 7) & 1
+            for position in self.positions(item)
+        )
+
+
+class RevocationStore:
+    """Denylist of token ids, answered in memory for unrevoked tokens.
+
+    The exact set lives in the shared cache, one key per jti expiring with
+    its token. Revocations are also appended to a log in the cache, which
+    every process replays at most every JWT_REVOCATION_SYNC_SECONDS into
+    local Bloom filters. Only a token the filter claims is revoked, which
+    is rare, costs a cache lookup; all others cost none.
+    """
+
+    def __init__(self):
+        self.filters = {}
+        self.sequence = 0
+        self.gaps = {}
+        self.synced_at = 0.0
+        self.lock = threading.Lock()
+
+    def add_local(self, jti, exp):
+        bucket = int(exp) // BUCKET_SECONDS
+        if bucket not in self.filters:
+            self.filters[bucket] = BloomFilter()
+        self.filters[bucket].add(jti)
+
+    def expire(self, now):
+        for bucket in list(self.filters):
+            if (bucket + 1) * BUCKET_SECONDS < now:
+                del self.filters[bucket]
+
+    def sync(self, force=False):
+        now = time.time()
+        if not force and now - self.synced_at < (
+            settings.JWT_REVOCATION_SYNC_SECONDS
+        ):
+            return
+        with self.lock:
+            self.synced_at = now
+            latest = cache.get(SEQUENCE_KEY, 0)
+            if latest < self.sequence:
+                # The cache was flushed and the log starts over
+                self.sequence = 0
+            wanted = list(self.gaps) + list(
+                range(self.sequence + 1, latest + 1)
+            )
+            self.sequence = max(self.sequence, latest)
+            for start in range(0, len(wanted), SYNC_BATCH_SIZE):
+                batch = wanted[start : start + SYNC_BATCH_SIZE]
+                entries = cache.get_many([log_key(seq) for seq in batch])
+                for sequence in batch:
+                    entry = entries.get(log_key(sequence))
+                    if entry is not None:
+                        self.add_local(*entry)
+                        self.gaps.pop(sequence, None)
+                    elif now - self.gaps.setdefault(sequence, now) > (
+                        GAP_TIMEOUT
+                    ):
+                        # Never written, or expired with its token
+                        del self.gaps[sequence]
+            self.expire(now)
+
+    def revoke(self, jti, exp, broadcast=True) -> bool:
+        """Revoke a token id until exp; False if it already was.
+
+        Adding the exact key is atomic, so of two concurrent calls for one
+        jti only one succeeds. broadcast=False skips the log, for tokens
+        that are only ever checked with is_revoked(exact=True).
+        """
+        timeout = max(int(exp - time.time()), 1)
+        if not cache.add(revoked_key(jti), True, timeout):
+            return False
+        if broadcast:
+            cache.add(SEQUENCE_KEY, 0, None)
+            sequence = cache.incr(SEQUENCE_KEY)
+            cache.set(log_key(sequence), (jti, exp), timeout)
+            with self.lock:
+                self.add_local(jti, exp)
+        return True
+
+    def is_revoked(self, jti, exp, exact=False) -> bool:
+        if not exact:
+            self.sync()
+            bloom = self.filters.get(int(exp) // BUCKET_SECONDS)
+            if bloom is None or jti not in bloom:
+                return False
+        return cache.get(revoked_key(jti)) is not None
+
+
+revocations = RevocationStore()
+
+
+def revoke_token(token, broadcast=True) -> bool:
+    return revocations.revoke(
+        token[api_settings.JTI_CLAIM], token["exp"], broadcast
+    )
+
+
+def is_token_revoked(token, exact=False) -> bool:
+    return revocations.is_revoked(
+        token[api_settings.JTI_CLAIM], token["exp"], exact
+    )
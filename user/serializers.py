@@ -1,5 +1,21 @@
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.utils.translation import gettext_lazy as _
 from rest_framework import serializers
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.serializers import (
+    TokenRefreshSerializer,
+    TokenVerifySerializer as BaseTokenVerifySerializer,
+)
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import (
+    AccessToken,
+    RefreshToken,
+    UntypedToken,
+)
+
+from user.login import hash_password
+from user.revocation import is_token_revoked, revoke_token
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -10,8 +26,10 @@ class UserSerializer(serializers.ModelSerializer):
         extra_kwargs = {"password": {"write_only": True, "min_length": 5}}
 
     def create(self, validated_data):
-        """Create a new user with encrypted password and return it"""
-        return get_user_model().objects.create_user(**validated_data)
+        """Create a new user, hashing the password within a hashing slot"""
+        return get_user_model().objects.create_user_with_hash(
+            validated_data["email"], hash_password(validated_data["password"])
+        )
 
     def update(self, instance, validated_data):
         """Update a user, set the password correctly and return it"""
@@ -22,3 +40,71 @@ class UserSerializer(serializers.ModelSerializer):
             user.save()
 
         return user
+
+
+class BulkUserSerializer(serializers.Serializer):
+    """One row of a bulk import; a blank password leaves it unusable."""
+
+    email = serializers.EmailField()
+    password = serializers.CharField(
+        min_length=5, required=False, allow_blank=True, write_only=True
+    )
+    first_name = serializers.CharField(
+        max_length=150, required=False, allow_blank=True
+    )
+    last_name = serializers.CharField(
+        max_length=150, required=False, allow_blank=True
+    )
+
+    def validate_email(self, value):
+        return get_user_model().objects.normalize_email(value)
+
+
+class BulkUserImportSerializer(serializers.Serializer):
+    users = serializers.ListField(
+        child=serializers.DictField(),
+        allow_empty=False,
+        max_length=settings.BULK_USER_IMPORT_MAX_ROWS,
+    )
+
+
+class RotatingTokenRefreshSerializer(TokenRefreshSerializer):
+    """Refresh serializer that accepts each refresh token only once.
+
+    With ROTATE_REFRESH_TOKENS a new refresh token is issued and the used
+    one revoked; a replayed or concurrent second use is refused.
+    """
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs["refresh"])
+        if api_settings.ROTATE_REFRESH_TOKENS and not revoke_token(
+            refresh, broadcast=False
+        ):
+            raise TokenError(_("Token is revoked"))
+        return super().validate(attrs)
+
+
+class TokenRevokeSerializer(serializers.Serializer):
+    """Revoke a refresh token and, optionally, its current access token."""
+
+    refresh = serializers.CharField(write_only=True)
+    access = serializers.CharField(write_only=True, required=False)
+
+    def validate(self, attrs):
+        # Parse both first, so a bad access token revokes nothing
+        refresh = RefreshToken(attrs["refresh"])
+        access = AccessToken(attrs["access"]) if "access" in attrs else None
+        revoke_token(refresh, broadcast=False)
+        if access is not None:
+            revoke_token(access)
+        return {}
+
+
+class TokenVerifySerializer(BaseTokenVerifySerializer):
+    def validate(self, attrs):
+        token = UntypedToken(attrs["token"])
+        if api_settings.JTI_CLAIM in token and is_token_revoked(
+            token, exact=True
+        ):
+            raise serializers.ValidationError(_("Token is revoked"))
+        return {}
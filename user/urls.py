@@ -1,18 +1,27 @@
 from django.urls import path
 from rest_framework_simplejwt.views import (
-    TokenObtainPairView,
+    TokenBlacklistView,
     TokenRefreshView,
     TokenVerifyView,
 )
 
-from user.views import CreateUserView, ManageUserView
+from user.views import (
+    BulkUserImportView,
+    CreateUserView,
+    LoginView,
+    ManageUserView,
+    MyTripsView,
+)
 
 app_name = "user"
 
 urlpatterns = [
     path("register/", CreateUserView.as_view(), name="create"),
-    path("token/", TokenObtainPairView.as_view(), name="token_obtain_pair"),
+    path("bulk/", BulkUserImportView.as_view(), name="bulk_import"),
+    path("token/", LoginView.as_view(), name="token_obtain_pair"),
     path("token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
     path("token/verify/", TokenVerifyView.as_view(), name="token_verify"),
+    path("token/revoke/", TokenBlacklistView.as_view(), name="token_revoke"),
     path("me/", ManageUserView.as_view(), name="manage"),
+    path("me/trips/", MyTripsView.as_view(), name="trips"),
 ]
@@ -1,18 +1,96 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema
 from rest_framework import generics
-from rest_framework.permissions import IsAuthenticated
-from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework.exceptions import AuthenticationFailed, Throttled
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.throttling import BaseThrottle
+from rest_framework.views import APIView
+from rest_framework_simplejwt.views import TokenObtainPairView
 
-from user.serializers import UserSerializer
+from airport.trips import get_trips
+from user.authentication import RevocableJWTAuthentication
+from user.bulk import import_users
+from user.login import (
+    clear_login_failures,
+    get_hash_pool,
+    login_blocked,
+    record_login_failure,
+)
+from user.serializers import BulkUserImportSerializer, UserSerializer
 
 
 class CreateUserView(generics.CreateAPIView):
     serializer_class = UserSerializer
 
 
+class BulkUserImportView(APIView):
+    """Staff import of many users at once, reporting the rows skipped.
+
+    Runs within the request, hashing on the login hashing threads, so the
+    rows are capped at BULK_USER_IMPORT_MAX_ROWS; larger files go through
+    `manage.py import_users`.
+    """
+
+    authentication_classes = (RevocableJWTAuthentication,)
+    permission_classes = (IsAdminUser,)
+
+    @extend_schema(
+        request=BulkUserImportSerializer,
+        responses={200: OpenApiTypes.OBJECT},
+    )
+    def post(self, request):
+        serializer = BulkUserImportSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return Response(
+            import_users(
+                serializer.validated_data["users"], pool=get_hash_pool()
+            )
+        )
+
+
+class LoginView(TokenObtainPairView):
+    """TokenObtainPairView that refuses accounts and addresses failing often.
+
+    Failures are counted per account and per client address in the shared
+    cache, so every worker sees the same counters.
+    """
+
+    def post(self, request, *args, **kwargs):
+        username = request.data.get(get_user_model().USERNAME_FIELD, "")
+        # REMOTE_ADDR, or X-Forwarded-For as set by NUM_PROXIES proxies
+        ip = BaseThrottle().get_ident(request)
+        if login_blocked(username, ip):
+            raise Throttled(
+                wait=settings.LOGIN_FAILURE_WINDOW,
+                detail="Too many failed logins, try again later.",
+            )
+        try:
+            response = super().post(request, *args, **kwargs)
+        except AuthenticationFailed:
+            record_login_failure(username, ip)
+            raise
+        clear_login_failures(username)
+        return response
+
+
 class ManageUserView(generics.RetrieveUpdateAPIView):
     serializer_class = UserSerializer
-    authentication_classes = (JWTAuthentication,)
+    authentication_classes = (RevocableJWTAuthentication,)
     permission_classes = (IsAuthenticated,)
 
     def get_object(self):
         return self.request.user
+
+
+class MyTripsView(APIView):
+    """Upcoming flights of the current user, soonest first, with counts."""
+
+    authentication_classes = (RevocableJWTAuthentication,)
+    permission_classes = (IsAuthenticated,)
+
+    @extend_schema(responses={200: OpenApiTypes.OBJECT})
+    def get(self, request):
+        return Response(get_trips(request.user.id))